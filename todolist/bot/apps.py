@@ -7,3 +7,6 @@ class BotConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bot'
+
+    def ready(self):
+        from bot import signals  # noqa: F401
@@ -0,0 +1,91 @@
+import time
+
+from django.core.cache import cache
+
+from goals.models import Goal
+
+GOALS_PAGE_SIZE = 10
+GOALS_CACHE_TIMEOUT = 60
+
+NEXT_COMMAND = '/goals_next_'
+PREV_COMMAND = '/goals_prev_'
+
+
+def _version_key(user_id: int) -> str:
+    return f'bot:goals:version:{user_id}'
+
+
+def invalidate_goals(user_ids) -> None:
+    """
+    Сбрасывает закешированные страницы целей пользователей: меняет версию в ключе кеша
+    """
+    version = time.time_ns()
+    cache.set_many({_version_key(user_id): version for user_id in user_ids}, timeout=None)
+
+
+async def get_goals_page(user_id: int, after: int | None = None, before: int | None = None) -> dict:
+    """
+    Страница активных целей пользователя по возрастанию id (keyset по первичному ключу).
+    after - id последней цели предыдущей страницы, before - id первой цели следующей.
+    Результат кешируется на GOALS_CACHE_TIMEOUT секунд до изменения целей пользователя
+    """
+    version = await cache.aget(_version_key(user_id), 0)
+    key = f'bot:goals:{user_id}:{version}:{after}:{before}'
+    page = await cache.aget(key)
+    if page is not None:
+        return page
+
+    qs = Goal.objects.filter(
+        category__is_deleted=False, category__board__participants__user_id=user_id
+    ).exclude(status=Goal.Status.archived)
+    if before is not None:
+        qs = qs.filter(id__lt=before).order_by('-id')
+    elif after is not None:
+        qs = qs.filter(id__gt=after).order_by('id')
+    else:
+        qs = qs.order_by('id')
+    goals = [goal async for goal in qs.values_list('id', 'title')[:GOALS_PAGE_SIZE + 1]]
+    has_more = len(goals) > GOALS_PAGE_SIZE
+    goals = goals[:GOALS_PAGE_SIZE]
+
+    if before is not None:
+        page = {'goals': goals[::-1], 'has_prev': has_more, 'has_next': True}
+    else:
+        page = {'goals': goals, 'has_prev': after is not None, 'has_next': has_more}
+
+    await cache.aset(key, page, GOALS_CACHE_TIMEOUT)
+    return page
+
+
+def render_goals_page(page: dict) -> str:
+    """
+    Текст страницы целей с командами навигации
+    """
+    goals = page['goals']
+    if not goals:
+        return 'Нет целей'
+
+    lines = [f'{goal_id} - {title}' for goal_id, title in goals]
+    navigation = []
+    if page['has_prev']:
+        navigation.append(f'Назад: {PREV_COMMAND}{goals[0][0]}')
+    if page['has_next']:
+        navigation.append(f'Дальше: {NEXT_COMMAND}{goals[-1][0]}')
+    if navigation:
+        lines.append('')
+        lines.extend(navigation)
+    return '\n'.join(lines)
+
+
+def parse_goals_command(text: str) -> tuple[int | None, int | None] | None:
+    """
+    Разбирает команды /goals, /goals_next_<id>, /goals_prev_<id> в (after, before).
+    Для остальных сообщений возвращает None
+    """
+    if text == '/goals':
+        return None, None
+    for prefix in (NEXT_COMMAND, PREV_COMMAND):
+        if text.startswith(prefix) and text[len(prefix):].isdigit():
+            cursor = int(text[len(prefix):])
+            return (cursor, None) if prefix == NEXT_COMMAND else (None, cursor)
+    return None
@@ -0,0 +1,111 @@
+from bot.goals_list import get_goals_page, parse_goals_command, render_goals_page
+from bot.models import TgUser
+from bot.state import StateStore, get_state_store
+from bot.tg.schemas import Message
+from bot.tg_users import tg_user_cache
+from goals.models import Goal, GoalCategory
+
+
+class BotHandler:
+    """
+    Логика диалога бота.
+    Обрабатывает сообщение и возвращает список ответов по порядку,
+    отправкой ответов занимается вызывающий код (команда runbot).
+    Работает через асинхронный ORM, поэтому подходит и для синхронного, и для асинхронного режимов.
+    Состояние диалога создания цели хранится в StateStore (по умолчанию из настройки BOT_STATE_STORE)
+    """
+
+    commands: list = ['/goals', '/create', '/cancel']
+
+    def __init__(self, state: StateStore | None = None):
+        self.state = state or get_state_store()
+
+    async def handle_message(self, msg: Message) -> list[str]:
+        """
+        Обработка сообщения пользователя.
+            - Если пользователь не авторизован передает сообщение в функцию handle_unauthorized_user
+            - Если пользователь авторизован передает сообщение в функцию handle_authorized_user
+        """
+        tg_user = await tg_user_cache.resolve(msg.chat.id)
+
+        if tg_user.user_id:
+            return await self.handle_authorized_user(tg_user, msg)
+        return await self.handle_unauthorized_user(tg_user, msg)
+
+    async def handle_authorized_user(self, tg_user: TgUser, msg: Message) -> list[str]:
+        """
+        Функция обработки сообщений авторизованных пользователей.
+        Реагирует на три команды:
+            - '/goals'  показать цели постранично (/goals_next_<id>, /goals_prev_<id> - соседние страницы)
+            - '/create' создать новую цель в существующей категории
+            - '/cancel' отменить текущую операцию
+        """
+        replies = ['Доступные команды:\n/goals\n/create\n/cancel ']
+        create_chat: dict | None = await self.state.get(msg.chat.id)
+        goals_page = parse_goals_command(msg.text)
+        is_command = msg.text in self.commands or goals_page is not None
+
+        if msg.text == '/cancel':
+            await self.state.pop(msg.chat.id)
+            create_chat = None
+            replies.append('Операция отменена')
+
+        if is_command and not create_chat:
+            if goals_page is not None:
+                after, before = goals_page
+                replies.append(render_goals_page(await get_goals_page(tg_user.user_id, after, before)))
+
+            if msg.text == '/create':
+                categories_qs = GoalCategory.objects.filter(
+                    board__participants__user_id=tg_user.user_id, is_deleted=False
+                )
+
+                categories = []
+                categories_id = []
+                async for category in categories_qs:
+                    categories.append(f'{category.id} - {category.title}')
+                    categories_id.append(str(category.id))
+
+                replies.append('Выберите номер категории:\n' + '\n'.join(categories))
+                await self.state.set(msg.chat.id, {
+                    'categories': categories,
+                    'categories_id': categories_id,
+                    'category_id': '',
+                    'goal_title': '',
+                    'stage': 1,
+                })
+
+        if not is_command and create_chat:
+            if create_chat['stage'] == 2:
+                if state := await self.state.pop(msg.chat.id, stage=2):
+                    await Goal.objects.acreate(
+                        user_id=tg_user.user_id,
+                        category_id=int(state['category_id']),
+                        title=msg.text,
+                    )
+                    replies.append('Цель сохранена')
+
+            elif create_chat['stage'] == 1:
+                if msg.text in create_chat.get('categories_id', []):
+                    if await self.state.transition(msg.chat.id, 1, {'category_id': msg.text, 'stage': 2}):
+                        replies.append('Введите название цели')
+                else:
+                    replies.append(
+                        'Введен неправильный номер категории\n' + '\n'.join(create_chat.get('categories', []))
+                    )
+
+        if not is_command and not create_chat:
+            replies.append('Неизвестная команда')
+
+        return replies
+
+    async def handle_unauthorized_user(self, tg_user: TgUser, msg: Message) -> list[str]:
+        """
+        Функция обработки сообщений не авторизованных пользователей
+        Генерирует код для верификации на сайте
+        """
+        code = tg_user.generate_verification_code()
+        tg_user.verification_code = code
+        await tg_user.asave()
+
+        return [f'Ваш код верификации: {code}']
@@ -0,0 +1,73 @@
+import logging
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.functions import Abs, Mod
+from django.utils import timezone
+from pydantic import ValidationError
+
+from bot.handlers import BotHandler
+from bot.models import TgUpdate
+from bot.outbox import OutboxThread
+from bot.tg.schemas import UpdateObj
+
+logger = logging.getLogger(__name__)
+
+
+def pending_updates(shard: int = 0, shards: int = 1) -> QuerySet[TgUpdate]:
+    """
+    Необработанные обновления шарда по порядку получения.
+    Чат всегда попадает в один шард, поэтому его сообщения обрабатывает один воркер
+    """
+    qs = TgUpdate.objects.filter(processed__isnull=True)
+    if shards > 1:
+        qs = qs.alias(shard=Mod(Abs('chat_id'), shards)).filter(shard=shard)
+    return qs.order_by('update_id')
+
+
+def drain_batch(
+    handler: BotHandler, outbox: OutboxThread, batch_size: int = 100, shard: int = 0, shards: int = 1
+) -> int:
+    """
+    Обрабатывает пачку обновлений из inbox и возвращает их количество.
+    Строки блокируются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько воркеров
+    не возьмут одно обновление дважды. Каждое обновление обрабатывается в своей точке сохранения:
+    ошибка (в том числе ошибка базы) откатывает только его, логируется и не блокирует очередь.
+    Ответы уходят в outbox после коммита, поэтому при откате пачки они не будут отправлены повторно
+    """
+    with transaction.atomic():
+        updates = list(pending_updates(shard, shards).select_for_update(skip_locked=True)[:batch_size])
+        for update in updates:
+            try:
+                with transaction.atomic():
+                    handle_update(handler, outbox, update)
+            except Exception:
+                logger.exception('Failed to handle update %d', update.update_id)
+                mark_processed(update)
+    return len(updates)
+
+
+def handle_update(handler: BotHandler, outbox: OutboxThread, update: TgUpdate) -> None:
+    try:
+        msg = UpdateObj.parse_obj(update.data).message
+    except ValidationError:
+        logger.warning('Skip invalid update %d', update.update_id)
+    else:
+        texts = async_to_sync(handler.handle_message)(msg)
+        transaction.on_commit(partial(outbox.send, msg.chat.id, texts))
+    mark_processed(update)
+
+
+def mark_processed(update: TgUpdate) -> None:
+    TgUpdate.objects.filter(pk=update.pk).update(processed=timezone.now())
+
+
+def purge_processed(keep: timedelta) -> int:
+    """
+    Удаляет обработанные обновления старше keep
+    """
+    deleted, _ = TgUpdate.objects.filter(processed__lt=timezone.now() - keep).delete()
+    return deleted
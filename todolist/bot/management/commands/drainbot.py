@@ -0,0 +1,70 @@
+import signal
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from bot.handlers import BotHandler
+from bot.inbox import drain_batch, purge_processed
+from bot.outbox import OutboxThread
+from bot.tg.client import AsyncTgClient, TgClient
+
+
+class Command(BaseCommand):
+    """
+    Обработка обновлений, полученных через webhook.
+    Воркеров можно запускать несколько: с --shards каждый обрабатывает свою часть чатов
+    """
+
+    help = "drain bot webhook inbox"
+    # Сколько секунд ждать отправки очереди ответов при остановке
+    shutdown_timeout = 30
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Обновлений за одну транзакцию')
+        parser.add_argument('--shard', type=int, default=0, help='Номер шарда этого воркера')
+        parser.add_argument('--shards', type=int, default=1, help='Общее количество шардов')
+        parser.add_argument('--interval', type=float, default=1, help='Пауза в секундах, когда inbox пуст')
+        parser.add_argument('--keep-hours', type=int, default=24, help='Сколько хранить обработанные обновления')
+        parser.add_argument('--once', action='store_true', help='Обработать inbox и завершиться')
+        parser.add_argument('--set-webhook', metavar='URL', help='Зарегистрировать webhook и завершиться')
+
+    def handle(self, *args, **options):
+        if options['set_webhook'] is not None:
+            if not settings.BOT_WEBHOOK_SECRET:
+                raise CommandError('BOT_WEBHOOK_SECRET is not set')
+            if not TgClient().set_webhook(options['set_webhook'], settings.BOT_WEBHOOK_SECRET):
+                raise CommandError('Failed to set webhook')
+            return
+
+        if not 0 <= options['shard'] < options['shards']:
+            raise CommandError('--shard must be in range [0, --shards)')
+
+        handler = BotHandler()
+        outbox = OutboxThread(AsyncTgClient())
+        keep = timedelta(hours=options['keep_hours'])
+        signal.signal(signal.SIGTERM, self.terminate)
+        try:
+            while True:
+                count = drain_batch(handler, outbox, options['batch_size'], options['shard'], options['shards'])
+                if count:
+                    continue
+                if options['once']:
+                    break
+                purge_processed(keep)
+                async_to_sync(handler.state.purge)()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # Ответы на уже обработанные обновления отправляются до выхода: поток outbox фоновый
+            try:
+                outbox.join(self.shutdown_timeout)
+            except TimeoutError:
+                self.stderr.write('Не все ответы отправлены до остановки')
+
+    @staticmethod
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
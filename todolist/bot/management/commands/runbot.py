@@ -1,10 +1,14 @@
-from django.core.management import BaseCommand
+import asyncio
+import signal
 
+from asgiref.sync import async_to_sync
+from django.core.management import BaseCommand
 
-from bot.models import TgUser
-from bot.tg.client import TgClient
+from bot.handlers import BotHandler
+from bot.outbox import OutboxThread
+from bot.runner import AsyncBotRunner
+from bot.tg.client import AsyncTgClient, TgClient
 from bot.tg.schemas import Message
-from goals.models import Goal, GoalCategory
 
 
 class Command(BaseCommand):
@@ -13,17 +17,52 @@ class Command(BaseCommand):
     """
 
     help = "run bot"
+    # Сколько секунд ждать отправки очереди ответов при остановке
+    shutdown_timeout = 30
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.tg_client = TgClient()
-        self.users_data = {}
+        self.handler = BotHandler()
+        self.outbox: OutboxThread | None = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--async', action='store_true', dest='use_async',
+            help='Асинхронный режим: чаты обрабатываются параллельно',
+        )
+        parser.add_argument(
+            '--max-in-flight', type=int, default=100,
+            help='Максимум одновременно обрабатываемых обновлений в асинхронном режиме',
+        )
 
     def handle(self, *args, **options):
         """
         Основная функция работы бота, работает через бесконечный цикл.
         Каждое новое сообщение получает индекс + 1
         """
+        if options['use_async']:
+            runner = AsyncBotRunner(AsyncTgClient(), self.handler, max_in_flight=options['max_in_flight'])
+            asyncio.run(runner.run())
+            return
+
+        signal.signal(signal.SIGTERM, self.terminate)
+        try:
+            self.poll()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # Обновления уже подтверждены Telegram, а поток outbox фоновый: ответы отправляются до выхода
+            if self.outbox is not None:
+                try:
+                    self.outbox.join(self.shutdown_timeout)
+                except TimeoutError:
+                    self.stderr.write('Не все ответы отправлены до остановки')
+
+    def poll(self):
+        """
+        Синхронный long polling: обновление подтверждается следующим getUpdates со сдвинутым offset
+        """
         offset = 0
         while True:
             res = self.tg_client.get_updates(offset=offset)
@@ -33,102 +72,12 @@ class Command(BaseCommand):
 
     def handle_message(self, msg: Message):
         """
-        Обработка сообщения пользователя.
-            - Если пользователь не авторизован передает сообщение в функцию handle_unauthorized_user
-            - Если пользователь авторизован передает сообщение в функцию handle_authorized_user
-
-        """
-        tg_user, created = TgUser.objects.get_or_create(chat_id=msg.chat.id)
-
-        if tg_user.user:
-            self.handle_authorized_user(tg_user, msg)
-        else:
-            self.handle_unauthorized_user(tg_user, msg)
-
-    def handle_authorized_user(self, tg_user: TgUser, msg: Message):
-        """
-        Функция обработки сообщений авторизованных пользователей.
-        Реагирует на три команды:
-            - '/goals'  показать все цели
-            - '/create' создать новую цель в существующей категории
-            - '/cancel' отменить текущую операцию
-        """
-        commands: list = ['/goals', '/create', '/cancel']
-        create_chat: dict | None = self.users_data.get(msg.chat.id, None)
-        self.tg_client.send_message(
-            chat_id=msg.chat.id,
-            text=f'Доступные команды:\n/goals\n/create\n/cancel '
-        )
-
-        if msg.text == '/cancel':
-            self.users_data.pop(msg.chat.id, None)
-            create_chat = None
-            self.tg_client.send_message(chat_id=msg.chat.id, text='Операция отменена')
-
-        if msg.text in commands and not create_chat:
-            if msg.text == '/goals':
-                qs = Goal.objects.filter(
-                    category__is_deleted=False, category__board__participants__user_id=tg_user.user.id
-                ).exclude(status=Goal.Status.archived)
-                goals = [f'{goal.id} - {goal.title}' for goal in qs]
-                self.tg_client.send_message(chat_id=msg.chat.id, text='Нет целей' if not goals else '\n'.join(goals))
-
-            if msg.text == '/create':
-                categories_qs = GoalCategory.objects.filter(
-                    board__participants__user_id=tg_user.user.id, is_deleted=False
-                )
-
-                categories = []
-                categories_id = []
-                for category in categories_qs:
-                    categories.append(f'{category.id} - {category.title}')
-                    categories_id.append(str(category.id))
-
-                self.tg_client.send_message(
-                    chat_id=msg.chat.id, text=f'Выберите номер категории:\n' + '\n'.join(categories)
-                )
-                self.users_data[msg.chat.id] = {
-                    'categories': categories,
-                    'categories_id': categories_id,
-                    'category_id': '',
-                    'goal_title': '',
-                    'stage': 1,
-                }
-        if msg.text not in commands and create_chat:
-            if create_chat['stage'] == 2:
-                Goal.objects.create(
-                    user_id=tg_user.user.id,
-                    category_id=int(self.users_data[msg.chat.id]['category_id']),
-                    title=msg.text,
-                )
-                self.tg_client.send_message(chat_id=msg.chat.id, text='Цель сохранена')
-                self.users_data.pop(msg.chat.id, None)
-
-            elif create_chat['stage'] == 1:
-                if msg.text == '/cancel':
-                    self.users_data.pop(msg.chat.id, None)
-                    create_chat = None
-                    self.tg_client.send_message(chat_id=msg.chat.id, text='Операция отменена')
-
-                if msg.text in create_chat.get('categories_id', []):
-                    self.tg_client.send_message(chat_id=msg.chat.id, text='Введите название цели')
-                    self.users_data[msg.chat.id] = {'category_id': msg.text, 'stage': 2}
-                else:
-                    self.tg_client.send_message(
-                        chat_id=msg.chat.id,
-                        text='Введен неправильный номер категории\n' + '\n'.join(create_chat.get('категории', [])),
-                    )
-
-        if msg.text not in commands and not create_chat:
-            self.tg_client.send_message(chat_id=msg.chat.id, text=f'Неизвестная команда')
-
-    def handle_unauthorized_user(self, tg_user: TgUser, msg: Message):
-        """
-        Функция обработки сообщений ек авторизованных пользователей
-        Генерирует код для верификации на сайте
+        Обработка сообщения пользователя. Ответы уходят в фоновую очередь отправки
         """
-        code = tg_user.generate_verification_code()
-        tg_user.verification_code = code
-        tg_user.save()
+        if self.outbox is None:
+            self.outbox = OutboxThread(AsyncTgClient())
+        self.outbox.send(msg.chat.id, async_to_sync(self.handler.handle_message)(msg))
 
-        self.tg_client.send_message(chat_id=msg.chat.id, text=f'Ваш код верификации: {code}')
+    @staticmethod
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.3 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tguser',
+            name='chat_id',
+            field=models.BigIntegerField(editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+        migrations.CreateModel(
+            name='TgUpdate',
+            fields=[
+                ('update_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('chat_id', models.BigIntegerField()),
+                ('data', models.JSONField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('processed', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('processed__isnull', True)), fields=['update_id'], name='tgupdate_pending')],
+            },
+        ),
+    ]
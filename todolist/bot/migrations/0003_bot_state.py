@@ -0,0 +1,22 @@
+# Generated by Django 4.2.3 on 2026-10-18 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0002_tg_update'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotState',
+            fields=[
+                ('chat_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('stage', models.PositiveSmallIntegerField()),
+                ('data', models.JSONField()),
+                ('updated', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
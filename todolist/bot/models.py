@@ -26,3 +26,38 @@ class TgUser(models.Model):
 
     def __str__(self):
         return f'{self.__class__.__name__} ({self.chat_id})'
+
+
+class TgUpdate(models.Model):
+    """
+    Входящее обновление Telegram, полученное через webhook.
+    Хранится до обработки командой drainbot; update_id защищает от повторной доставки
+    """
+    update_id = models.BigIntegerField(primary_key=True)
+    chat_id = models.BigIntegerField()
+    data = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True)
+    processed = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['update_id'], name='tgupdate_pending', condition=models.Q(processed__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.__class__.__name__} ({self.update_id})'
+
+
+class BotState(models.Model):
+    """
+    Состояние диалога чата для хранилища DbStateStore
+    """
+    chat_id = models.BigIntegerField(primary_key=True)
+    stage = models.PositiveSmallIntegerField()
+    data = models.JSONField()
+    updated = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} ({self.chat_id})'
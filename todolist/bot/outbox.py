@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+from bot.tg.client import AsyncTgClient
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096
+
+
+def merge_texts(texts: list[str], limit: int = MESSAGE_LIMIT) -> list[str]:
+    """
+    Склеивает ответы на одно обновление в одно сообщение.
+    Если сообщение длиннее лимита Telegram, оно делится по строкам (или жестко, если строка длиннее лимита)
+    """
+    messages, current = [], ''
+    for line in '\n\n'.join(text for text in texts if text).split('\n'):
+        while len(line) > limit:
+            if current:
+                messages.append(current)
+                current = ''
+            messages.append(line[:limit])
+            line = line[limit:]
+        candidate = f'{current}\n{line}' if current else line
+        if len(candidate) > limit:
+            messages.append(current)
+            candidate = line
+        current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: rate токенов в секунду, не более capacity токенов в запасе
+    """
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """
+        Через сколько секунд будет доступен токен
+        """
+        self._refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+class Outbox:
+    """
+    Очередь исходящих сообщений бота с ограничением частоты.
+    send() не ждет сети: ответы на одно обновление склеиваются в одно сообщение
+    и отправляются фоновыми задачами с учетом общего лимита и лимита на чат
+    (для групповых чатов, у которых chat_id < 0, лимит ниже).
+    Сообщения одного чата отправляются строго по порядку:
+    чат находится в очереди готовых не более одного раза и обслуживается одной задачей
+    """
+    global_rate: float = 30
+    chat_rate: float = 1
+    group_chat_rate: float = 20 / 60
+    chat_burst: float = 3
+    workers_count: int = 4
+    max_idle_buckets: int = 10_000
+
+    def __init__(self, client: AsyncTgClient):
+        self.client = client
+        self.global_bucket = TokenBucket(self.global_rate, self.global_rate)
+        self.chat_buckets: dict[int, TokenBucket] = {}
+        self.pending: dict[int, deque[str]] = {}
+        self.ready: asyncio.Queue | None = None
+        self.workers: list[asyncio.Task] = []
+        self.unsent = 0
+        self.idle: asyncio.Event | None = None
+
+    def send(self, chat_id: int, texts: list[str]) -> None:
+        """
+        Ставит ответы в очередь чата. Должна вызываться из потока event loop
+        """
+        messages = merge_texts(texts)
+        if not messages:
+            return
+        self._start()
+        self.unsent += len(messages)
+        self.idle.clear()
+
+        if chat_id in self.pending:
+            self.pending[chat_id].extend(messages)
+        else:
+            self.pending[chat_id] = deque(messages)
+            self.ready.put_nowait(chat_id)
+
+    def _start(self) -> None:
+        if self.ready is None:
+            self.ready = asyncio.Queue()
+            self.idle = asyncio.Event()
+            self.workers = [asyncio.create_task(self._worker()) for _ in range(self.workers_count)]
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        if chat_id not in self.chat_buckets:
+            rate = self.group_chat_rate if chat_id < 0 else self.chat_rate
+            self.chat_buckets[chat_id] = TokenBucket(rate, self.chat_burst)
+        return self.chat_buckets[chat_id]
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self.ready.get()
+            try:
+                await self._send_next(chat_id)
+            except Exception:
+                logger.exception('Failed to send message to chat %d', chat_id)
+
+    async def _send_next(self, chat_id: int) -> None:
+        """
+        Отправляет следующее сообщение чата. Если лимит чата исчерпан,
+        чат возвращается в очередь позже, не занимая задачу ожиданием
+        """
+        bucket = self._chat_bucket(chat_id)
+        if delay := bucket.wait_time():
+            asyncio.get_running_loop().call_later(delay, self.ready.put_nowait, chat_id)
+            return
+        while delay := self.global_bucket.wait_time():
+            await asyncio.sleep(delay)
+
+        bucket.consume()
+        self.global_bucket.consume()
+        try:
+            await self.client.send_message(chat_id=chat_id, text=self.pending[chat_id].popleft())
+        finally:
+            self.unsent -= 1
+            if self.pending[chat_id]:
+                self.ready.put_nowait(chat_id)
+            else:
+                del self.pending[chat_id]
+                self._prune_buckets()
+            if not self.unsent:
+                self.idle.set()
+
+    def _prune_buckets(self) -> None:
+        """
+        Удаляет лимиты неактивных чатов, у которых запас токенов полностью восстановился
+        """
+        if len(self.chat_buckets) <= self.max_idle_buckets:
+            return
+        for chat_id, bucket in list(self.chat_buckets.items()):
+            if chat_id not in self.pending and bucket.wait_time() == 0 and bucket.tokens >= bucket.capacity:
+                del self.chat_buckets[chat_id]
+
+    async def join(self) -> None:
+        """
+        Ждет отправки всех сообщений из очереди
+        """
+        if self.idle is not None:
+            await self.idle.wait()
+
+
+class OutboxThread:
+    """
+    Outbox для синхронного кода: event loop с фоновыми задачами отправки работает в отдельном потоке
+    """
+    def __init__(self, client: AsyncTgClient):
+        self.loop = asyncio.new_event_loop()
+        self.outbox = Outbox(client)
+        threading.Thread(target=self.loop.run_forever, name='bot-outbox', daemon=True).start()
+
+    def send(self, chat_id: int, texts: list[str]) -> None:
+        self.loop.call_soon_threadsafe(self.outbox.send, chat_id, texts)
+
+    def join(self, timeout: float | None = None) -> None:
+        """
+        Ждет отправки всех поставленных в очередь сообщений
+        """
+        asyncio.run_coroutine_threadsafe(self.outbox.join(), self.loop).result(timeout)
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+from bot.handlers import BotHandler
+from bot.outbox import Outbox
+from bot.tg.client import AsyncTgClient
+from bot.tg.schemas import Message
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBotRunner:
+    """
+    Асинхронный режим работы бота.
+    Обновления разных чатов обрабатываются параллельно, внутри одного чата строго по порядку:
+    у каждого активного чата своя очередь и задача-обработчик, которая завершается, когда очередь пуста.
+    Количество одновременно обрабатываемых обновлений ограничено max_in_flight,
+    при достижении лимита получение новых обновлений ждет освобождения места.
+    Ответы отправляются через Outbox, обработка обновления не ждет сети
+    """
+
+    def __init__(
+        self, client: AsyncTgClient, handler: BotHandler, max_in_flight: int = 100, outbox: Outbox | None = None
+    ):
+        self.client = client
+        self.handler = handler
+        self.outbox = outbox or Outbox(client)
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.chats: dict[int, asyncio.Queue] = {}
+        self.workers: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        """
+        Основной цикл: long polling обновлений и раздача их по очередям чатов
+        """
+        offset = 0
+        try:
+            while True:
+                res = await self.client.get_updates(offset=offset)
+                for item in res.result:
+                    offset = item.update_id + 1
+                    await self.dispatch(item.message)
+        finally:
+            await self.client.aclose()
+
+    async def dispatch(self, msg: Message) -> None:
+        """
+        Кладет сообщение в очередь его чата, при необходимости запускает обработчик чата
+        """
+        await self.in_flight.acquire()
+        queue = self.chats.get(msg.chat.id)
+        if queue is None:
+            queue = self.chats[msg.chat.id] = asyncio.Queue()
+            worker = asyncio.create_task(self.chat_worker(msg.chat.id, queue))
+            self.workers.add(worker)
+            worker.add_done_callback(self.workers.discard)
+        queue.put_nowait(msg)
+
+    async def chat_worker(self, chat_id: int, queue: asyncio.Queue) -> None:
+        """
+        Последовательно обрабатывает сообщения одного чата
+        """
+        try:
+            while not queue.empty():
+                msg = queue.get_nowait()
+                try:
+                    await self.process(msg)
+                except Exception:
+                    logger.exception('Failed to handle message %d in chat %d', msg.message_id, chat_id)
+                finally:
+                    self.in_flight.release()
+        finally:
+            del self.chats[chat_id]
+
+    async def process(self, msg: Message) -> None:
+        self.outbox.send(msg.chat.id, await self.handler.handle_message(msg))
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bot.goals_list import invalidate_goals
+from goals.models import BoardParticipant, Goal, GoalCategory
+from goals.signals import boards_changed, goal_board_ids
+
+
+def invalidate_board_goals(board_filter: dict) -> None:
+    invalidate_goals(BoardParticipant.objects.filter(**board_filter).values_list('user_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Goal)
+def goal_changed(sender, instance: Goal, **kwargs) -> None:
+    """
+    Изменение цели сбрасывает кеш списка целей у всех участников ее доски (и прежней доски при переносе)
+    """
+    invalidate_board_goals({'board_id__in': goal_board_ids(instance)})
+
+
+@receiver([post_save, post_delete], sender=GoalCategory)
+def category_changed(sender, instance: GoalCategory, **kwargs) -> None:
+    invalidate_board_goals({'board_id': instance.board_id})
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def participant_changed(sender, instance: BoardParticipant, **kwargs) -> None:
+    invalidate_goals([instance.user_id])
+
+
+@receiver(boards_changed)
+def boards_bulk_changed(sender, board_ids, **kwargs) -> None:
+    invalidate_board_goals({'board_id__in': board_ids})
@@ -0,0 +1,170 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from bot.models import BotState
+
+
+class StateStore(ABC):
+    """
+    Хранилище состояния диалога бота (этап создания цели и его данные) по chat_id.
+    Состояние - словарь с обязательным ключом 'stage'.
+    Переходы между этапами выполняются условно (transition, pop с ожидаемым этапом),
+    поэтому повторно доставленное сообщение не выполнит этап дважды.
+    Состояние старше ttl секунд считается брошенным и не возвращается
+    """
+    ttl: float = 60 * 60
+
+    @abstractmethod
+    async def get(self, chat_id: int) -> dict | None:
+        ...
+
+    @abstractmethod
+    async def set(self, chat_id: int, state: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def transition(self, chat_id: int, stage: int, state: dict) -> bool:
+        """
+        Заменяет состояние, только если чат находится на этапе stage
+        """
+
+    @abstractmethod
+    async def pop(self, chat_id: int, stage: int | None = None) -> dict | None:
+        """
+        Удаляет и возвращает состояние (только на этапе stage, если он указан)
+        """
+
+    @abstractmethod
+    async def purge(self) -> int:
+        """
+        Удаляет просроченные состояния
+        """
+
+
+class MemoryStateStore(StateStore):
+    """
+    Состояние в памяти процесса: LRU с ограничением количества чатов и TTL.
+    Подходит, когда чат всегда обрабатывается одним процессом
+    """
+    max_entries: int = 10_000
+
+    def __init__(self):
+        self._data: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, chat_id: int) -> dict | None:
+        item = self._data.get(chat_id)
+        if item is None:
+            return None
+        if item[0] < time.monotonic():
+            del self._data[chat_id]
+            return None
+        self._data.move_to_end(chat_id)
+        return item[1]
+
+    def _set(self, chat_id: int, state: dict) -> None:
+        self._data[chat_id] = (time.monotonic() + self.ttl, state)
+        self._data.move_to_end(chat_id)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def get(self, chat_id: int) -> dict | None:
+        with self._lock:
+            return self._get(chat_id)
+
+    async def set(self, chat_id: int, state: dict) -> None:
+        with self._lock:
+            self._set(chat_id, state)
+
+    async def transition(self, chat_id: int, stage: int, state: dict) -> bool:
+        with self._lock:
+            current = self._get(chat_id)
+            if current is None or current['stage'] != stage:
+                return False
+            self._set(chat_id, state)
+            return True
+
+    async def pop(self, chat_id: int, stage: int | None = None) -> dict | None:
+        with self._lock:
+            current = self._get(chat_id)
+            if current is None or stage is not None and current['stage'] != stage:
+                return None
+            del self._data[chat_id]
+            return current
+
+    async def purge(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            expired = [chat_id for chat_id, (expires, _) in self._data.items() if expires < now]
+            for chat_id in expired:
+                del self._data[chat_id]
+            return len(expired)
+
+
+class DbStateStore(StateStore):
+    """
+    Состояние в таблице BotState: общее для всех воркеров бота,
+    поэтому чаты можно перераспределять между процессами
+    """
+
+    def _alive(self):
+        return BotState.objects.filter(updated__gte=timezone.now() - timedelta(seconds=self.ttl))
+
+    @sync_to_async
+    def get(self, chat_id: int) -> dict | None:
+        return self._alive().filter(chat_id=chat_id).values_list('data', flat=True).first()
+
+    @sync_to_async
+    def set(self, chat_id: int, state: dict) -> None:
+        BotState.objects.bulk_create(
+            [BotState(chat_id=chat_id, stage=state['stage'], data=state, updated=timezone.now())],
+            update_conflicts=True,
+            unique_fields=['chat_id'],
+            update_fields=['stage', 'data', 'updated'],
+        )
+
+    @sync_to_async
+    def transition(self, chat_id: int, stage: int, state: dict) -> bool:
+        return bool(
+            self._alive()
+            .filter(chat_id=chat_id, stage=stage)
+            .update(stage=state['stage'], data=state, updated=timezone.now())
+        )
+
+    @sync_to_async
+    def pop(self, chat_id: int, stage: int | None = None) -> dict | None:
+        qs = self._alive().filter(chat_id=chat_id)
+        if stage is not None:
+            qs = qs.filter(stage=stage)
+        with transaction.atomic():
+            state = qs.select_for_update().first()
+            if state is None:
+                return None
+            state.delete()
+        return state.data
+
+    @sync_to_async
+    def purge(self) -> int:
+        deleted, _ = BotState.objects.filter(updated__lt=timezone.now() - timedelta(seconds=self.ttl)).delete()
+        return deleted
+
+
+STATE_STORES = {
+    'memory': MemoryStateStore,
+    'db': DbStateStore,
+}
+
+
+def get_state_store() -> StateStore:
+    """
+    Хранилище, выбранное в настройке BOT_STATE_STORE
+    """
+    return STATE_STORES[settings.BOT_STATE_STORE]()
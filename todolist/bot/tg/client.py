@@ -1,10 +1,18 @@
+import asyncio
+import functools
+import json
 import logging
+import time
+import weakref
 from typing import TypeVar, Type
 
+import httpx
 import requests
 from django.conf import settings
 from pydantic import ValidationError
 from pydantic.main import BaseModel
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, NameResolutionError, NewConnectionError
 
 from bot.tg.schemas import GetUpdatesResponse, SendMessageResponse
 
@@ -15,55 +23,166 @@ T = TypeVar('T', bound=BaseModel)
 
 class TgClient:
     """
-    Класс взаимодействия с api.telegram.org/bot
+    Класс взаимодействия с api.telegram.org/bot.
+    Запросы идут через одну сессию с пулом keep-alive соединений.
+    connect_timeout и read_timeout - сетевые таймауты соединения и чтения ответа.
+    При ответах 429 и 5xx, а также при сетевых ошибках запрос повторяется до max_retries раз
+    с экспоненциальной задержкой; для 429 используется retry_after из ответа Telegram,
+    если он не превышает max_retry_delay.
+    Методы не из idempotent_methods (sendMessage) повторяются только при 429 и если соединение
+    не было установлено (запрос заведомо не дошел до Telegram): после таймаута чтения или 5xx сообщение могло быть
+    уже доставлено, и повтор отправил бы его дважды
     """
-    def __init__(self, token: str | None = None):
-        self.__token = token if token else settings.BOT_TOKEN
-        self.__url = f'https://api.telegram.org/bot{self.__token}/'
+    connect_timeout: float = 5
+    read_timeout: float = 15
+    max_retries: int = 3
+    backoff: float = 0.5
+    max_retry_delay: float = 30
+    pool_size: int = 10
+    idempotent_methods = frozenset({'getUpdates', 'setWebhook'})
 
-    def __get_url(self, method: str) -> str:
+    def __init__(
+        self,
+        token: str | None = None,
+        max_retries: int | None = None,
+        read_timeout: float | None = None,
+        max_retry_delay: float | None = None,
+    ):
+        if max_retries is not None:
+            self.max_retries = max_retries
+        if read_timeout is not None:
+            self.read_timeout = read_timeout
+        if max_retry_delay is not None:
+            self.max_retry_delay = max_retry_delay
+        self._token = token if token else settings.BOT_TOKEN
+        self._url = f'{settings.BOT_API_URL}/bot{self._token}/'
+        self._session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        return session
+
+    def _get_url(self, method: str) -> str:
         """
         Автоматически подставляет под url команду
         """
-        return f'{self.__url}{method}'
+        return f'{self._url}{method}'
 
     def get_updates(self, offset: int = 0, timeout: int = 60, **kwargs) -> GetUpdatesResponse:
         """
         Функция обновления чата бота
         По истечении времени timeout перестает получать обновления
         """
-        url = self.__get_url('getUpdates')
-        response = requests.get(url, params={'timeout': timeout, 'offset': offset, 'allowed_updates': ['message']})
-
-        if response.ok:
-            data = response.json()
-        else:
-            logger.error('Bad request getUpdates, %d', response.status_code)
+        data = self._get(
+            'getUpdates',
+            read_timeout=timeout + self.read_timeout,
+            timeout=timeout,
+            offset=offset,
+            allowed_updates=['message'],
+        )
+        if not data.get('ok'):
             data = {'ok': False, 'result': []}
 
-        return self.__serialize_tg_response(GetUpdatesResponse, data)
+        return self._serialize_tg_response(GetUpdatesResponse, data)
 
     def send_message(self, chat_id: int, text: str, **kwargs) -> SendMessageResponse:
         """
         Функция отправки сообщений бота
         """
         data = self._get('sendMessage', chat_id=chat_id, text=text, **kwargs)
-        return self.__serialize_tg_response(SendMessageResponse, data)
+        return self._serialize_tg_response(SendMessageResponse, data)
+
+    def set_webhook(self, url: str, secret_token: str, **kwargs) -> bool:
+        """
+        Регистрирует webhook. Пустой url отключает webhook и возвращает бота к long polling
+        """
+        data = self._get('setWebhook', url=url, secret_token=secret_token, allowed_updates=['message'], **kwargs)
+        return bool(data.get('ok'))
+
+    def _get(self, method: str, read_timeout: float | None = None, **params) -> dict:
+        """
+        Вспомогательная функция для выполнения запроса к api с повторами.
+        Возвращает разобранный JSON ответа или {'ok': False}, если запрос так и не удался
+        """
+        url = self._get_url(method)
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+
+        for attempt in range(self.max_retries + 1):
+            reached = True
+            try:
+                response = self._session.get(url, params=params, timeout=timeout)
+                status, data = response.status_code, self._decode(response.content)
+            except requests.RequestException as e:
+                logger.warning('Request %s failed: %s', method, e)
+                status, data = None, {'ok': False}
+                reached = not self._not_connected(e)
+
+            delay = self._retry_delay(method, status, data, attempt, reached)
+            if delay is None:
+                return data
+            time.sleep(delay)
+
+        return data
+
+    @staticmethod
+    def _not_connected(error: requests.RequestException) -> bool:
+        """
+        Соединение не было установлено, поэтому запрос заведомо не дошел до Telegram.
+        Обрыв соединения после отправки (ProtocolError, RemoteDisconnected) - тоже ConnectionError,
+        но запрос мог быть уже обработан
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if not isinstance(error, requests.ConnectionError) or not error.args:
+            return False
+        reason = error.args[0]
+        if isinstance(reason, MaxRetryError):
+            reason = reason.reason
+        return isinstance(reason, (NewConnectionError, NameResolutionError))
 
-    def _get(self, method: str, **params) -> dict:
+    @staticmethod
+    def _decode(content: bytes) -> dict:
         """
-        Вспомогательная функция для получения запроса из сообщения
+        Разбирает тело ответа один раз; не-JSON ответ (например, от прокси) считается ошибкой
         """
-        url = self.__get_url(method)
-        params.setdefault('timeout', 10)
-        response = requests.get(url, params=params)
-        if not response.ok:
-            logger.warning('Invalid status code %d from command %s', response.status_code, method)
-        response.json()
-        return response.json()
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return {'ok': False}
+        return data if isinstance(data, dict) else {'ok': False}
+
+    def _retry_delay(
+        self, method: str, status: int | None, data: dict, attempt: int, reached: bool = True
+    ) -> float | None:
+        """
+        Задержка перед повтором запроса или None, если повторять не нужно.
+        reached - запрос мог дойти до Telegram (получен ответ или соединение оборвалось после отправки)
+        """
+        if status is not None and status < 400:
+            return None
+        if status is not None:
+            logger.warning('Invalid status code %d from command %s', status, method)
+        if status is not None and status != 429 and status < 500:
+            return None
+        if status != 429 and reached and method not in self.idempotent_methods:
+            logger.error('Command %s is not retried: request may have been delivered', method)
+            return None
+        if attempt >= self.max_retries:
+            logger.error('Command %s failed after %d retries', method, attempt)
+            return None
+
+        delay = self.backoff * 2 ** attempt
+        if status == 429:
+            delay = max(delay, data.get('parameters', {}).get('retry_after', 0))
+        if delay > self.max_retry_delay:
+            logger.error('Command %s: retry delay %.1fs exceeds limit', method, delay)
+            return None
+        return delay
 
     @staticmethod
-    def __serialize_tg_response(serializer_class: Type[T], data: dict) -> T:
+    def _serialize_tg_response(serializer_class: Type[T], data: dict) -> T:
         """
         Вспомогательная функция. Подставляет сериализатор с данными пришедшими на вход
         """
@@ -71,3 +190,93 @@ class TgClient:
             return serializer_class(**data)
         except ValidationError:
             logger.error(f'Failed to serialize JSON response: {data}')
+
+
+# Веб-запрос не должен ждать Telegram дольше нескольких секунд: один повтор, короткие таймаут чтения
+# и допустимая задержка перед повтором
+WEB_CLIENT_LIMITS = {'max_retries': 1, 'read_timeout': 5, 'max_retry_delay': 2}
+
+
+@functools.cache
+def get_tg_client() -> TgClient:
+    """
+    Общий клиент процесса, чтобы веб-запросы переиспользовали пул соединений.
+    Повторы ограничены WEB_CLIENT_LIMITS
+    """
+    return TgClient(**WEB_CLIENT_LIMITS)
+
+
+class AsyncTgClient(TgClient):
+    """
+    Асинхронный клиент api.telegram.org/bot на httpx.
+    Пул соединений, таймауты и политика повторов те же, что у TgClient.
+    Соединения закрываются через aclose()
+    """
+    def _create_session(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(max_connections=self.pool_size),
+        )
+
+    async def get_updates(self, offset: int = 0, timeout: int = 60, **kwargs) -> GetUpdatesResponse:
+        """
+        Long polling обновлений. Таймаут чтения увеличивается на время ожидания Telegram
+        """
+        data = await self._get(
+            'getUpdates',
+            read_timeout=timeout + self.read_timeout,
+            timeout=timeout,
+            offset=offset,
+            allowed_updates=['message'],
+        )
+        if not data.get('ok'):
+            data = {'ok': False, 'result': []}
+
+        return self._serialize_tg_response(GetUpdatesResponse, data)
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> SendMessageResponse:
+        """
+        Функция отправки сообщений бота
+        """
+        data = await self._get('sendMessage', chat_id=chat_id, text=text, **kwargs)
+        return self._serialize_tg_response(SendMessageResponse, data)
+
+    async def _get(self, method: str, read_timeout: float | None = None, **params) -> dict:
+        url = self._get_url(method)
+        timeout = httpx.Timeout(read_timeout or self.read_timeout, connect=self.connect_timeout)
+
+        for attempt in range(self.max_retries + 1):
+            reached = True
+            try:
+                response = await self._session.get(url, params=params, timeout=timeout)
+                status, data = response.status_code, self._decode(response.content)
+            except httpx.HTTPError as e:
+                logger.warning('Request %s failed: %s', method, e)
+                status, data = None, {'ok': False}
+                reached = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+            delay = self._retry_delay(method, status, data, attempt, reached)
+            if delay is None:
+                return data
+            await asyncio.sleep(delay)
+
+        return data
+
+    async def aclose(self) -> None:
+        await self._session.aclose()
+
+
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncTgClient] = weakref.WeakKeyDictionary()
+
+
+def get_async_tg_client() -> AsyncTgClient:
+    """
+    Общий асинхронный клиент текущего event loop: пул соединений httpx привязан к циклу, в котором создан,
+    поэтому асинхронные веб-запросы одного процесса переиспользуют его, а не открывают соединение каждый раз.
+    Повторы ограничены WEB_CLIENT_LIMITS
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncTgClient(**WEB_CLIENT_LIMITS)
+    return client
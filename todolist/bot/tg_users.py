@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from bot.models import TgUser
+
+
+def _version_key(chat_id: int) -> str:
+    return f'bot:tg_user:version:{chat_id}'
+
+
+class TgUserCache:
+    """
+    Кеш верифицированных пользователей телеграмм в памяти процесса: chat_id -> (tg_user, user_id).
+    Неверифицированные чаты не кешируются: для них бот все равно обновляет код верификации,
+    а после верификации запись появится в кеше при следующем сообщении.
+    Перепривязка чата происходит в веб-процессе, поэтому запись сверяется с версией чата в общем кеше
+    Django: invalidate меняет версию, и бот перечитывает пользователя при следующем сообщении
+    """
+    ttl: float = 5 * 60
+    max_entries: int = 10_000
+
+    def __init__(self):
+        self._data: OrderedDict[int, tuple[float, TgUser, int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: int, version: int = 0) -> tuple[TgUser, int] | None:
+        with self._lock:
+            item = self._data.get(chat_id)
+            if item is None:
+                return None
+            if item[0] < time.monotonic() or item[3] != version:
+                del self._data[chat_id]
+                return None
+            self._data.move_to_end(chat_id)
+            return item[1], item[2]
+
+    def set(self, tg_user: TgUser, version: int = 0) -> None:
+        if not tg_user.user_id:
+            return
+        with self._lock:
+            self._data[tg_user.chat_id] = (time.monotonic() + self.ttl, tg_user, tg_user.user_id, version)
+            self._data.move_to_end(tg_user.chat_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, chat_id: int) -> None:
+        """
+        Сбрасывает запись во всех процессах. Версия хранится ttl секунд: записи старше сбрасываются сами
+        """
+        with self._lock:
+            self._data.pop(chat_id, None)
+        cache.set(_version_key(chat_id), time.time_ns(), self.ttl)
+
+    async def ainvalidate(self, chat_id: int) -> None:
+        with self._lock:
+            self._data.pop(chat_id, None)
+        await cache.aset(_version_key(chat_id), time.time_ns(), self.ttl)
+
+    async def resolve(self, chat_id: int) -> TgUser:
+        """
+        Пользователь телеграмм по chat_id: из кеша или из базы (с созданием при первом сообщении).
+        Версия читается до загрузки из базы: перепривязка во время загрузки сбросит запись
+        """
+        version = await cache.aget(_version_key(chat_id), 0)
+        if cached := self.get(chat_id, version):
+            return cached[0]
+        tg_user, _ = await TgUser.objects.aget_or_create(chat_id=chat_id)
+        self.set(tg_user, version)
+        return tg_user
+
+
+tg_user_cache = TgUserCache()
@@ -1,9 +1,11 @@
 from django.urls import path
 
 from bot import views
+from core.async_views import select_view
 
 app_name = 'bot'
 
 urlpatterns = [
-    path('verify', views.VerificationCodeView.as_view(), name='verify'),
+    path('verify', select_view(views.VerificationCodeView, views.AsyncVerificationCodeView), name='verify'),
+    path('webhook', views.WebhookView.as_view(), name='webhook'),
 ]
@@ -1,13 +1,20 @@
 from typing import Any
 
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from pydantic import ValidationError
 from rest_framework import generics, permissions
-from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from bot.models import TgUser
+from bot.models import TgUpdate, TgUser
 from bot.serializers import TgUserSerializer
-from bot.tg.client import TgClient
+from bot.tg.client import get_async_tg_client, get_tg_client
+from bot.tg.schemas import UpdateObj
+from bot.tg_users import tg_user_cache
+from core.async_views import AsyncAPIViewMixin
 
 
 class VerificationCodeView(generics.UpdateAPIView):
@@ -30,5 +37,52 @@ class VerificationCodeView(generics.UpdateAPIView):
 
         tg_user.user = request.user
         tg_user.save()
-        TgClient().send_message(chat_id=tg_user.chat_id, text='Бот верифицирован')
+        tg_user_cache.invalidate(tg_user.chat_id)
+        get_tg_client().send_message(chat_id=tg_user.chat_id, text='Бот верифицирован')
         return Response(TgUserSerializer(tg_user).data)
+
+
+class AsyncVerificationCodeView(AsyncAPIViewMixin, VerificationCodeView):
+    """
+    VerificationCodeView для ASGI: база через async ORM, сообщение в Telegram через httpx,
+    поэтому ожидание ответа Telegram не занимает воркер
+    """
+
+    async def patch(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        try:
+            tg_user = await self.get_queryset().aget(verification_code=request.data.get('verification_code'))
+        except TgUser.DoesNotExist:
+            raise AuthenticationFailed
+
+        tg_user.user = request.user
+        await tg_user.asave()
+        await tg_user_cache.ainvalidate(tg_user.chat_id)
+        await get_async_tg_client().send_message(chat_id=tg_user.chat_id, text='Бот верифицирован')
+        return Response(TgUserSerializer(tg_user).data)
+
+
+class WebhookView(APIView):
+    """
+    Прием обновлений Telegram через webhook.
+    Проверяет секрет из заголовка X-Telegram-Bot-Api-Secret-Token, сохраняет обновление в inbox
+    и сразу отвечает, обработкой занимается команда drainbot.
+    Обновления не из сообщений подтверждаются без сохранения, чтобы Telegram не повторял их
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        secret = settings.BOT_WEBHOOK_SECRET
+        if not secret or not constant_time_compare(request.headers.get('X-Telegram-Bot-Api-Secret-Token', ''), secret):
+            raise PermissionDenied
+
+        try:
+            update = UpdateObj.parse_obj(request.data)
+        except ValidationError:
+            return Response({'ok': True})
+
+        TgUpdate.objects.bulk_create(
+            [TgUpdate(update_id=update.update_id, chat_id=update.message.chat.id, data=request.data)],
+            ignore_conflicts=True,
+        )
+        return Response({'ok': True})
@@ -7,3 +7,10 @@ class CoreConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from core.timing import instrument
+        if settings.SERVER_TIMING_SAMPLE_RATE > 0:
+            instrument()
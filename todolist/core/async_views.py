@@ -0,0 +1,70 @@
+from typing import Callable
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db.models import Model
+from django.http import Http404
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIViewMixin:
+    """
+    Асинхронный dispatch для представлений DRF (ASGI).
+    Аутентификация и проверка прав выполняются в потоке: сессия, пользователь и роли читаются синхронным ORM.
+    Асинхронные обработчики (async def get) вызываются в event loop, синхронные (запись) - целиком в потоке,
+    поэтому представление можно собрать из обычного generic view, переопределив только чтение.
+    Django 4.2 выполняет запросы async ORM в потоке запроса, воркер при этом не блокируется
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncRetrieveMixin(AsyncAPIViewMixin):
+    """
+    Асинхронный GET детального представления: объект загружается через async ORM.
+    Проверка прав на объект выполняется в потоке, так как может обращаться к связанным объектам и ролям
+    """
+
+    async def aget_object(self) -> Model:
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def get(self, request: Request, *args, **kwargs) -> Response:
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+
+def select_view(view: type[APIView], async_view: type[APIView], **initkwargs) -> Callable:
+    """
+    Представление для маршрута: асинхронная версия при развертывании под ASGI (settings.ASYNC_VIEWS)
+    """
+    return (async_view if settings.ASYNC_VIEWS else view).as_view(**initkwargs)
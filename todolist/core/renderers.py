@@ -0,0 +1,46 @@
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Вывод совпадает с JSONRenderer при настройках DRF по умолчанию
+    (компактный UTF-8, U+2028 и U+2029 экранируются), но кодирование в несколько раз быстрее.
+    Типы, которых нет в orjson (Decimal, ленивые строки), кодируются JSONEncoder DRF,
+    запрос с отступами (application/json; indent=4) отдается стандартным JSONRenderer
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.dumps(data)
+
+    def dumps(self, data) -> bytes:
+        """
+        Компактный JSON без отступов (используется и для построчной отдачи списков)
+        """
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        # Как и JSONRenderer: эти символы допустимы в JSON, но не в JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    text/event-stream (Server-Sent Events). Сами события отдаются потоком из представления,
+    через рендерер проходят только ответы с ошибками - одним событием error
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        return self.event('error', data)
+
+    @staticmethod
+    def event(event_type: str, data) -> bytes:
+        """
+        Событие в формате SSE: тип и данные в JSON одной строкой
+        """
+        return b'event: %s\ndata: %s\n\n' % (event_type.encode(), ORJSONRenderer().dumps(data))
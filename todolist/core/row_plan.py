@@ -0,0 +1,133 @@
+import functools
+from typing import Any, Callable, Iterable
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.renderers import ORJSONRenderer
+
+# Поля, у которых to_representation не меняет значение, прочитанное из базы
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+def _utc_isoformat(value) -> str:
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class RowPlan:
+    """
+    План сборки ответа сериализатора из строки queryset.values().
+    Поля сериализатора один раз сопоставляются с путями values() и преобразованиями значений,
+    после чего строка собирается без создания моделей и без обхода полей DRF, а результат
+    совпадает с serializer.data. Поддерживаются простые поля моделей, первичные ключи связей
+    и вложенные ModelSerializer по внешнему ключу; для остальных полей план не строится (ImproperlyConfigured)
+    """
+
+    def __init__(self, serializer: serializers.ModelSerializer, prefix: str = ''):
+        model = serializer.Meta.model
+        # (ключ ответа, путь в values(), преобразование или вложенный план)
+        self.entries: list[tuple[str, str, Callable | RowPlan | None]] = []
+        self.lookups: list[str] = []
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            source = field.source
+            try:
+                model._meta.get_field(source)
+            except FieldDoesNotExist:
+                if self._skipped(model, field):
+                    continue
+                raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name}: unsupported source')
+
+            lookup = f'{prefix}{source}'
+            self.lookups.append(lookup)
+            if isinstance(field, serializers.ModelSerializer):
+                nested = RowPlan(field, prefix=f'{lookup}__')
+                self.lookups.extend(nested.lookups)
+                self.entries.append((field.field_name, lookup, nested))
+            else:
+                self.entries.append((field.field_name, lookup, self._converter(serializer, field)))
+
+    @staticmethod
+    def _skipped(model, field: serializers.Field) -> bool:
+        """
+        Поле без атрибута у модели DRF пропускает (SkipField), если у него нет default и null не разрешен
+        """
+        return (
+            field.source_attrs == [field.source] and not hasattr(model, field.source)
+            and field.default is empty and not field.allow_null and not field.required
+        )
+
+    @staticmethod
+    def _converter(serializer: serializers.Serializer, field: serializers.Field) -> Callable | None:
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return None
+        if isinstance(field, serializers.DateTimeField):
+            # ISO 8601 в UTC - то же, что DateTimeField.to_representation, без перевода в текущий часовой пояс
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            is_iso = isinstance(output_format, str) and output_format.lower() == ISO_8601
+            if is_iso and str(field_timezone) == 'UTC':
+                return _utc_isoformat
+            return field.to_representation
+        if isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(field, serializers.MultipleChoiceField):
+            return None
+        raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name}: unsupported field')
+
+    @classmethod
+    @functools.cache
+    def for_serializer(cls, serializer_class: type[serializers.ModelSerializer]) -> 'RowPlan':
+        return cls(serializer_class())
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """
+        Queryset строк для плана. Аннотации (например, релевантность поиска) сохраняются для пагинации по ключу
+        """
+        return queryset.values(*self.lookups, *queryset.query.annotations)
+
+    def row(self, values: dict) -> dict:
+        ret = {}
+        for key, lookup, convert in self.entries:
+            value = values[lookup]
+            if value is None or convert is None:
+                ret[key] = value
+            elif isinstance(convert, RowPlan):
+                ret[key] = convert.row(values)
+            else:
+                ret[key] = convert(value)
+        return ret
+
+    def rows(self, values: Iterable[dict]) -> list[dict]:
+        return [self.row(row) for row in values]
+
+
+class FastListMixin:
+    """
+    Быстрое чтение для списков с CachedListMixin: страница выбирается через values() и собирается по RowPlan
+    сериализатора, JSON кодируется orjson. Ответ побайтно совпадает с обычным ListModelMixin.list
+    """
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def get_row_plan(self) -> RowPlan:
+        return RowPlan.for_serializer(self.get_serializer_class())
+
+    def get_list_data(self, request: Request, *args, **kwargs) -> Any:
+        plan = self.get_row_plan()
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return plan.rows(queryset)
+        return self.get_paginated_response(plan.rows(page)).data
@@ -0,0 +1,88 @@
+from itertools import islice
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIViewMixin
+from core.renderers import ORJSONRenderer
+from core.row_plan import RowPlan
+
+
+class StreamingListMixin:
+    """
+    Потоковая отдача всего списка без постраничного вывода (?stream=true) для представлений с FastListMixin.
+    Строки читаются из базы через queryset.iterator() курсором на стороне сервера по stream_chunk_size штук,
+    собираются по RowPlan и сразу отправляются клиенту, поэтому память воркера не зависит от размера списка.
+    Ответ - JSON-массив строк в том же виде и порядке, что и results при обходе страниц.
+    Кеш списков не используется, ETag и If-None-Match поддерживаются
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 2000
+
+    def is_streaming(self, request: Request) -> bool:
+        return request.query_params.get(self.stream_query_param, '').lower() in ('1', 'true')
+
+    def list(self, request: Request, *args, **kwargs) -> Response | HttpResponseBase:
+        if self.is_streaming(request):
+            return self.stream_list(request)
+        return super().list(request, *args, **kwargs)
+
+    def get_stream_queryset(self) -> QuerySet:
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        # id в том же направлении, что и первое поле сортировки, - тот же порядок, что и при обходе страниц
+        first = ordering[0] if ordering else ''
+        descending = first.startswith('-') if isinstance(first, str) else getattr(first, 'descending', False)
+        return self.get_row_plan().values(queryset.order_by(*ordering, '-pk' if descending else 'pk'))
+
+    def stream_list(self, request: Request) -> HttpResponseBase:
+        etag = self.get_list_etag(request)
+        if not_modified := get_conditional_response(request._request, etag=etag):
+            return self.set_list_etag(not_modified, etag)
+
+        plan, queryset = self.get_row_plan(), self.get_stream_queryset()
+        if getattr(self, 'view_is_async', False):
+            content = self.aencode_rows(plan, queryset.aiterator(chunk_size=self.stream_chunk_size))
+        else:
+            content = self.encode_rows(plan, queryset.iterator(chunk_size=self.stream_chunk_size))
+        return self.set_list_etag(StreamingHttpResponse(content, content_type='application/json'), etag)
+
+    def encode_rows(self, plan: RowPlan, rows: Iterator[dict]) -> Iterator[bytes]:
+        renderer = ORJSONRenderer()
+        yield b'['
+        separator = b''
+        while chunk := list(islice(rows, self.stream_chunk_size)):
+            yield separator + renderer.dumps(plan.rows(chunk))[1:-1]
+            separator = b','
+        yield b']'
+
+    async def aencode_rows(self, plan: RowPlan, rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+        renderer = ORJSONRenderer()
+        yield b'['
+        separator, chunk = b'', []
+        async for row in rows:
+            chunk.append(plan.row(row))
+            if len(chunk) == self.stream_chunk_size:
+                yield separator + renderer.dumps(chunk)[1:-1]
+                separator, chunk = b',', []
+        if chunk:
+            yield separator + renderer.dumps(chunk)[1:-1]
+        yield b']'
+
+
+class AsyncStreamingListMixin(AsyncAPIViewMixin):
+    """
+    Асинхронный GET для представлений со StreamingListMixin: строки читаются через aiterator(),
+    и ответ отдается асинхронным итератором, без буферизации всего списка сервером ASGI
+    """
+
+    async def get(self, request: Request, *args, **kwargs) -> Response | HttpResponseBase:
+        if self.is_streaming(request):
+            return await sync_to_async(self.stream_list)(request)
+        return await super().get(request, *args, **kwargs)
@@ -0,0 +1,206 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial, wraps
+from typing import Callable, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+
+logger = logging.getLogger(__name__)
+
+# Замеры текущего запроса; None - запрос не попал в выборку
+_current: ContextVar['RequestTimings | None'] = ContextVar('request_timings', default=None)
+
+# Метрики в порядке вывода и их описания для Server-Timing
+METRICS = {
+    'db': 'Database',
+    'perm': 'Permissions',
+    'ser': 'Serialization',
+    'render': 'Rendering',
+}
+
+
+class RequestTimings:
+    """
+    Время запроса по этапам в миллисекундах и количество запросов к базе.
+    Этапы могут пересекаться: запросы к базе при проверке прав входят и в db, и в perm
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(METRICS, 0.0)
+        self.queries = 0
+        self._active: set[str] = set()
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        # Вложенные вызовы (сериализатор внутри сериализатора) не считаются повторно
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] += (time.perf_counter() - started) * 1000
+            self._active.discard(name)
+
+    def total(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self, total: float) -> str:
+        descriptions = {**METRICS, 'db': f'{METRICS["db"]} ({self.queries} queries)'}
+        metrics = [f'{name};dur={self.durations[name]:.2f};desc="{descriptions[name]}"' for name in METRICS]
+        return ', '.join([*metrics, f'total;dur={total:.2f}'])
+
+
+def query_timer(execute: Callable, sql: str, params, many: bool, context: dict):
+    """
+    Обертка выполнения запросов (connection.execute_wrapper), которую получает каждое соединение.
+    Вне замеряемого запроса только проверяет контекст
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    timings.queries += 1
+    with timings.measure('db'):
+        return execute(sql, params, many, context)
+
+
+def _add_query_timer(connection, **kwargs) -> None:
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def timed(name: str, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return func(*args, **kwargs)
+        with timings.measure(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# Замененные instrument атрибуты: (класс, имя, исходное значение)
+_patches: list[tuple[type, str, object]] = []
+
+
+def _patch(owner: type, name: str, wrap: Callable) -> None:
+    original = owner.__dict__[name]
+    _patches.append((owner, name, original))
+    setattr(owner, name, wrap(original))
+
+
+def _timed_property(name: str) -> Callable[[property], property]:
+    return lambda prop: property(timed(name, prop.fget))
+
+
+def instrument() -> None:
+    """
+    Подключает замеры: обертку запросов к соединениям, проверку прав DRF (perm), Serializer.data
+    и RowPlan.rows (ser), Response.rendered_content (render). Вызывается при запуске,
+    если замеры включены (SERVER_TIMING_SAMPLE_RATE > 0); повторный вызов ничего не меняет.
+    Замеры снимаются uninstrument
+    """
+    if _patches:
+        return
+
+    from rest_framework.response import Response
+    from rest_framework.serializers import ListSerializer, Serializer
+    from rest_framework.views import APIView
+
+    from core.row_plan import RowPlan
+
+    connection_created.connect(_add_query_timer)
+    for connection in connections.all(initialized_only=True):
+        _add_query_timer(connection)
+
+    for method in ('check_permissions', 'check_object_permissions'):
+        _patch(APIView, method, partial(timed, 'perm'))
+    for serializer_class in (Serializer, ListSerializer):
+        _patch(serializer_class, 'data', _timed_property('ser'))
+    _patch(RowPlan, 'rows', partial(timed, 'ser'))
+    _patch(Response, 'rendered_content', _timed_property('render'))
+
+
+def uninstrument() -> None:
+    """
+    Возвращает исходные методы и убирает обертку запросов из соединений текущего потока
+    (в соединениях других потоков она остается, но вне замеряемого запроса ничего не делает)
+    """
+    connection_created.disconnect(_add_query_timer)
+    for connection in connections.all(initialized_only=True):
+        if query_timer in connection.execute_wrappers:
+            connection.execute_wrappers.remove(query_timer)
+    while _patches:
+        owner, name, original = _patches.pop()
+        setattr(owner, name, original)
+
+
+class ServerTimingMiddleware:
+    """
+    Разбивка времени запроса (Server-Timing и строка лога core.timing): запросы к базе (количество и время),
+    проверка прав, сериализация и рендеринг ответа DRF, общее время.
+    Замеряется доля запросов SERVER_TIMING_SAMPLE_RATE (0 - выключено, 1 - все запросы),
+    остальные проходят без замеров. Время потоковых ответов учитывается до начала отдачи
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request: HttpRequest):
+        if not self.sampled():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, timings)
+
+    @staticmethod
+    def sampled() -> bool:
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def report(request: HttpRequest, response: HttpResponseBase, timings: RequestTimings) -> HttpResponseBase:
+        total = timings.total()
+        response['Server-Timing'] = timings.header(total)
+        values = {name: round(duration, 2) for name, duration in timings.durations.items()}
+        logger.info(
+            'method=%s path=%s status=%d total=%.2f queries=%d %s',
+            request.method, request.path, response.status_code, total, timings.queries,
+            ' '.join(f'{name}={value}' for name, value in values.items()),
+            extra={'timing': {'total': round(total, 2), 'queries': timings.queries, **values}},
+        )
+        return response
@@ -1,7 +1,9 @@
 from rest_framework import generics, status, exceptions, permissions
+from rest_framework.request import Request
 from rest_framework.response import Response
 from django.contrib.auth import authenticate, login, logout
 
+from core.async_views import AsyncAPIViewMixin
 from core.models import User
 from core.serializers import CreateUserSerializer, LoginSerializer, ProfileSerializer, UpdatePasswordSerializer
 
@@ -54,6 +56,15 @@ class ProfileView(generics.RetrieveUpdateDestroyAPIView):
         logout(self.request)
 
 
+class AsyncProfileView(AsyncAPIViewMixin, ProfileView):
+    """
+    ProfileView для ASGI: пользователь уже загружен при аутентификации, поэтому GET не обращается к базе
+    """
+
+    async def get(self, request: Request, *args, **kwargs) -> Response:
+        return Response(self.get_serializer(request.user).data)
+
+
 class UpdatePasswordView(generics.GenericAPIView):
     """
     Представление для обновления пароля
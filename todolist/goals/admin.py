@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from goals.models import GoalCategory, Goal
+from goals.models import ArchiveJob, GoalCategory, Goal
 
 
 @admin.register(GoalCategory)
@@ -19,3 +19,12 @@ class GoalAdmin(admin.ModelAdmin):
     """
     list_display = ("title", "user", "created", "updated")
     search_fields = ["title"]
+
+
+@admin.register(ArchiveJob)
+class ArchiveJobAdmin(admin.ModelAdmin):
+    """
+    Класс админ панели для фоновой архивации
+    """
+    list_display = ("board", "category", "user", "done", "total", "created", "finished")
+    readonly_fields = ("done", "total", "finished")
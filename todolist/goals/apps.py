@@ -7,3 +7,6 @@ class GoalsConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'goals'
+
+    def ready(self):
+        from goals import checks, signals  # noqa: F401
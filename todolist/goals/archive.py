@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import User
+from goals.models import ArchiveJob, Board, Goal, GoalCategory
+from goals.signals import boards_changed
+
+
+def schedule_archive(instance: Board | GoalCategory, user: User) -> ArchiveJob:
+    """
+    Помечает доску (вместе с ее категориями) или категорию удаленной и ставит архивацию целей в очередь.
+    Транзакция короткая: категорий на доске немного, а цели не затрагиваются.
+    Цели удаленных категорий уже не попадают в списки, поэтому до архивации их не видно
+    """
+    with transaction.atomic():
+        instance.is_deleted = True
+        instance.save()
+        if isinstance(instance, Board):
+            instance.categories.update(is_deleted=True, updated=timezone.now())
+            job = ArchiveJob(user=user, board=instance)
+        else:
+            job = ArchiveJob(user=user, board_id=instance.board_id, category=instance)
+        job.total = job.goals().count()
+        job.save()
+    return job
+
+
+def archive_batch(batch_size: int = 1000) -> ArchiveJob | None:
+    """
+    Архивирует следующую пачку целей первой незавершенной задачи и возвращает задачу
+    (None, если очередь пуста). Каждая пачка - отдельная короткая транзакция:
+    задача блокируется через SELECT ... FOR UPDATE SKIP LOCKED, поэтому воркеры не мешают друг другу,
+    а прогресс фиксируется вместе с изменением целей и не теряется при сбое воркера
+    """
+    with transaction.atomic():
+        pending = ArchiveJob.objects.filter(finished__isnull=True).order_by('id')
+        job = pending.select_for_update(skip_locked=True).first()
+        if job is None:
+            return None
+
+        now = timezone.now()
+        ids = list(job.goals().values_list('id', flat=True)[:batch_size])
+        archived = Goal.objects.filter(id__in=ids).update(status=Goal.Status.archived, updated=now)
+        job.done = F('done') + archived
+        if len(ids) < batch_size:
+            job.finished = now
+        job.save()
+        job.refresh_from_db(fields=['done'])
+
+    if archived:
+        boards_changed.send(sender=ArchiveJob, board_ids=[job.board_id])
+    return job
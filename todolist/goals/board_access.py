@@ -0,0 +1,45 @@
+from typing import Iterable
+
+from rest_framework.request import Request
+
+from goals.models import BoardParticipant
+
+WRITE_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+OWNER_ROLES = (BoardParticipant.Role.owner,)
+
+_CACHE_ATTR = '_board_roles'
+
+
+def get_board_roles(request: Request) -> dict[int, int]:
+    """
+    Роли пользователя на досках в виде {board_id: role}.
+    Загружаются одним запросом и запоминаются на объекте запроса,
+    поэтому все проверки доступа в рамках одного запроса используют одну выборку
+    """
+    user_id = request.user.pk
+    cached = getattr(request, _CACHE_ATTR, None)
+    if cached is not None and cached[0] == user_id:
+        return cached[1]
+
+    roles = dict(BoardParticipant.objects.filter(user_id=user_id).values_list('board_id', 'role'))
+    setattr(request, _CACHE_ATTR, (user_id, roles))
+    return roles
+
+
+def reset_board_roles(request: Request) -> None:
+    """
+    Сбрасывает запомненные роли, если участники досок изменились в ходе запроса
+    """
+    if hasattr(request, _CACHE_ATTR):
+        delattr(request, _CACHE_ATTR)
+
+
+def has_board_access(request: Request, board_id: int, roles: Iterable[int] | None = None) -> bool:
+    """
+    Проверяет, что пользователь участвует в доске.
+    Если переданы roles, роль пользователя должна входить в этот список
+    """
+    role = get_board_roles(request).get(board_id)
+    if role is None:
+        return False
+    return roles is None or role in roles
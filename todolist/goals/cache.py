@@ -0,0 +1,155 @@
+import hashlib
+import time
+from typing import Any, Callable, Iterable
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework.mixins import ListModelMixin
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIViewMixin
+from goals.board_access import get_board_roles
+from goals.conditional import ConditionalListMixin
+
+
+def _board_version_key(board_id: int) -> str:
+    return f'goals:board:{board_id}:version'
+
+
+def get_board_versions(board_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Текущие версии досок. Отсутствующая в кеше версия заводится заново по текущему времени,
+    поэтому после вытеснения из кеша она не совпадет ни с одной прежней
+    """
+    keys = {_board_version_key(board_id): board_id for board_id in board_ids}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_board_versions(board_ids: Iterable[int]) -> None:
+    """
+    Меняет версии досок, сбрасывая закешированные списки всех их участников.
+    Версия меняется сразу и еще раз после коммита транзакции: иначе параллельный запрос
+    мог бы закешировать под новой версией данные, которые транзакция еще не зафиксировала
+    """
+    board_ids = set(board_ids)
+    if not board_ids:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({_board_version_key(board_id): version for board_id in board_ids}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_or_build(key: str, build: Callable[[], Any], timeout: float, lock_timeout: float = 10) -> Any:
+    """
+    Значение из кеша или результат build() с защитой от лавины запросов:
+    при промахе значение строит только запрос, захвативший блокировку в кеше,
+    остальные ждут его результат не дольше lock_timeout секунд
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, lock_timeout):
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = cache.get(key)
+            if value is not None:
+                return value
+            if cache.get(lock_key) is None:
+                break
+
+    try:
+        value = build()
+        cache.set(key, value, timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+class CachedListMixin(ConditionalListMixin):
+    """
+    Кеш ответов списков. Ключ - пользователь, полный URL запроса и версии всех досок пользователя,
+    поэтому любое изменение на доске сбрасывает кеш у всех ее участников. Версии входят и в ETag:
+    изменение профиля автора меняет версию доски, но не строки выборки.
+    Вместе с ответом хранится его ETag: попадание в кеш не обращается к базе,
+    кроме загрузки ролей пользователя
+    """
+    list_cache_timeout: float = 5 * 60
+
+    def get_list_etag_scope(self, request: Request) -> str:
+        """
+        Версии всех досок пользователя. Запоминаются, поэтому ключ кеша и ETag строятся по одним версиям
+        """
+        if not hasattr(self, '_board_scope'):
+            versions = get_board_versions(get_board_roles(request))
+            self._board_scope = ':'.join(f'{board_id}.{version}' for board_id, version in sorted(versions.items()))
+        return self._board_scope
+
+    def get_list_cache_key(self, request: Request) -> str:
+        scope = self.get_list_etag_scope(request)
+        digest = hashlib.md5(f'{request.user.pk}:{request.build_absolute_uri()}:{scope}'.encode()).hexdigest()
+        return f'goals:list:{self.__class__.__name__}:{digest}'
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        key = self.get_list_cache_key(request)
+        entry = cache.get(key)
+
+        if entry is None:
+            etag = self.get_list_etag(request)
+            if not_modified := get_conditional_response(request._request, etag=etag):
+                return self.set_list_etag(not_modified, etag)
+
+            def build() -> dict:
+                return {'etag': etag, 'data': self.get_list_data(request, *args, **kwargs)}
+
+            entry = get_or_build(key, build, self.list_cache_timeout)
+
+        response = get_conditional_response(request._request, etag=entry['etag']) or Response(entry['data'])
+        return self.set_list_etag(response, entry['etag'])
+
+    def get_list_data(self, request: Request, *args, **kwargs) -> Any:
+        """
+        Данные ответа списка для кеша
+        """
+        return ListModelMixin.list(self, request, *args, **kwargs).data
+
+
+class AsyncCachedListMixin(AsyncAPIViewMixin):
+    """
+    Асинхронный GET для представлений с CachedListMixin.
+    Попадание в кеш обходится загрузкой ролей и чтением кеша; при промахе ETag считается через async ORM,
+    а страница строится и сериализуется в потоке, так как пагинация и фильтры работают с синхронным ORM
+    """
+
+    async def get(self, request: Request, *args, **kwargs) -> Response:
+        key = await sync_to_async(self.get_list_cache_key)(request)
+        entry = await cache.aget(key)
+
+        if entry is None:
+            etag = await self.aget_list_etag(request)
+            if not_modified := get_conditional_response(request._request, etag=etag):
+                return self.set_list_etag(not_modified, etag)
+
+            def build() -> dict:
+                return {'etag': etag, 'data': self.get_list_data(request, *args, **kwargs)}
+
+            entry = await sync_to_async(get_or_build)(key, build, self.list_cache_timeout)
+
+        response = get_conditional_response(request._request, etag=entry['etag']) or Response(entry['data'])
+        return self.set_list_etag(response, entry['etag'])
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs) -> list[Error]:
+    """
+    Кеш списков сбрасывается сменой версий досок в кеше. Бот, drainbot и archivegoals работают
+    в отдельных процессах, поэтому с кешем в памяти процесса веб не видит их изменений до истечения кеша.
+    Такой кеш допустим только при DEBUG (разработка в одном процессе)
+    """
+    if settings.DEBUG or not isinstance(caches['default'], LocMemCache):
+        return []
+    return [Error(
+        'The default cache is process-local, list caches would not be invalidated by other processes.',
+        hint='Set CACHE_URL to a shared cache, e.g. dbcache://django_cache (run createcachetable).',
+        id='goals.E001',
+    )]
+
+
+@register()
+def board_events_backend_check(app_configs, **kwargs) -> list[Error]:
+    """
+    События публикуют и веб-воркеры, и бот, и archivegoals, а local доставляет их
+    только подписчикам своего процесса. Такая доставка допустима только при DEBUG
+    """
+    if settings.DEBUG or settings.BOARD_EVENTS_BACKEND != 'local':
+        return []
+    return [Error(
+        'Board events are delivered within one process, subscribers would miss events from other processes.',
+        hint='Set BOARD_EVENTS_BACKEND=postgres.',
+        id='goals.E002',
+    )]
@@ -0,0 +1,143 @@
+import hashlib
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max, Model, QuerySet
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from core.async_views import AsyncRetrieveMixin
+from core.serializers import ProfileSerializer
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    etag = quote_etag(hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest())
+    return f'W/{etag}' if weak else etag
+
+
+class ConditionalDetailMixin:
+    """
+    Условные запросы для детальных представлений.
+    ETag считается по полю updated объекта и профилям пользователей в ответе, Last-Modified - по updated:
+    GET с совпавшим If-None-Match / If-Modified-Since получает 304 без сериализации,
+    PUT/PATCH с устаревшим If-Match получает 412, чтобы не затереть чужие изменения
+    """
+
+    def get_object(self) -> Model:
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def get_profiles(self, instance: Model) -> list[Model]:
+        """
+        Пользователи, чьи профили входят в ответ (по умолчанию автор объекта, загруженный через select_related)
+        """
+        return [instance.user]
+
+    def get_validators(self, instance: Model) -> tuple[str, datetime]:
+        """
+        ETag по updated объекта и полям профилей из ответа: изменение профиля не меняет updated объекта,
+        но меняет его представление. Last-Modified - updated объекта
+        """
+        profiles = sorted(
+            [getattr(user, field) for field in ProfileSerializer.Meta.fields] for user in self.get_profiles(instance)
+        )
+        return make_etag(instance._meta.label, instance.pk, instance.updated.isoformat(), profiles), instance.updated
+
+    def check_preconditions(self, request: Request) -> HttpResponseBase | None:
+        etag, last_modified = self._validators = self.get_validators(self.get_object())
+        return get_conditional_response(request._request, etag=etag, last_modified=int(last_modified.timestamp()))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Заголовки по валидаторам, посчитанным в обработчике: в асинхронных представлениях
+        finalize_response выполняется в event loop, где загрузка участников доски невозможна
+        """
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code in (200, 304) and hasattr(self, '_validators'):
+            etag, last_modified = self._validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return self.check_preconditions(request) or super().retrieve(request, *args, **kwargs)
+
+    def update(self, request: Request, *args, **kwargs) -> Response:
+        if failed := self.check_preconditions(request):
+            return failed
+        response = super().update(request, *args, **kwargs)
+        self._validators = self.get_validators(self._object)
+        return response
+
+
+class AsyncConditionalDetailMixin(AsyncRetrieveMixin):
+    """
+    Асинхронный GET для представлений с ConditionalDetailMixin.
+    Загруженный объект запоминается, поэтому проверка предусловий и заголовки ответа не обращаются к базе
+    """
+
+    async def get(self, request: Request, *args, **kwargs) -> Response:
+        self._object = await self.aget_object()
+        return self.check_preconditions(request) or Response(self.get_serializer(self._object).data)
+
+
+class ConditionalListMixin:
+    """
+    Условные GET для списков.
+    Слабый ETag строится по дешевому агрегату отфильтрованного queryset (количество строк и max(updated)),
+    пользователю, параметрам запроса и get_list_etag_scope, поэтому 304 возвращается без выборки
+    и сериализации страницы.
+    Last-Modified для списков не отдается: строки могут исчезнуть из выборки без роста max(updated)
+    """
+
+    list_etag_aggregate = {'count': Count('pk'), 'updated': Max('updated')}
+
+    def get_list_etag_scope(self, request: Request) -> str:
+        """
+        Часть ETag для изменений, которые не видны в агрегате выборки
+        """
+        return ''
+
+    def get_list_etag(self, request: Request) -> str:
+        queryset = self.filter_queryset(self.get_queryset())
+        aggregate = queryset.aggregate(**self.list_etag_aggregate)
+        return self.make_list_etag(request, queryset, aggregate, self.get_list_etag_scope(request))
+
+    async def aget_list_etag(self, request: Request) -> str:
+        """
+        get_list_etag для асинхронных представлений. Фильтры строят queryset в потоке:
+        django-filter при проверке параметров может обращаться к базе
+        """
+        queryset, scope = await sync_to_async(
+            lambda: (self.filter_queryset(self.get_queryset()), self.get_list_etag_scope(request))
+        )()
+        aggregate = await queryset.aaggregate(**self.list_etag_aggregate)
+        return self.make_list_etag(request, queryset, aggregate, scope)
+
+    @staticmethod
+    def make_list_etag(request: Request, queryset: QuerySet, aggregate: dict, scope: str = '') -> str:
+        return make_etag(
+            queryset.model._meta.label,
+            request.user.pk,
+            request.get_full_path(),
+            aggregate['count'],
+            aggregate['updated'].isoformat() if aggregate['updated'] else '',
+            scope,
+            weak=True,
+        )
+
+    @staticmethod
+    def set_list_etag(response: HttpResponseBase, etag: str) -> HttpResponseBase:
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        etag = self.get_list_etag(request)
+        response = get_conditional_response(request._request, etag=etag) or super().list(request, *args, **kwargs)
+        return self.set_list_etag(response, etag)
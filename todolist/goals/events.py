@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from functools import cache
+
+import psycopg2
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Служебное событие: подписчик пропустил события (переполнен буфер, потеряно соединение с базой).
+# Поток после него закрывается, клиент переподключается и догоняет изменения через goals/sync
+RESYNC = {'type': 'resync'}
+
+
+class Subscription:
+    """
+    Подписка на события одной доски с буфером не более чем на buffer_size событий.
+    Если клиент не успевает читать, буфер сбрасывается и подписка завершается событием RESYNC,
+    поэтому медленный клиент не копит память процесса.
+    События добавляются из любого потока (push), читаются синхронно (get) или из event loop (aget)
+    """
+
+    def __init__(self, board_id: int, user_id: int, buffer_size: int, loop: asyncio.AbstractEventLoop | None = None):
+        self.board_id = board_id
+        self.user_id = user_id
+        self.buffer_size = buffer_size
+        self.closed = False
+        self._events: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._loop = loop
+        self._aready = asyncio.Event() if loop is not None else None
+
+    def push(self, event: dict) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            if len(self._events) >= self.buffer_size:
+                self._events.clear()
+                event = RESYNC
+            if event is RESYNC:
+                self.closed = True
+            self._events.append(event)
+        if self._loop is None:
+            self._ready.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._aready.set)
+        except RuntimeError:
+            # Цикл событий уже закрыт: клиент отключился, подписка будет удалена
+            pass
+
+    def _pop(self) -> list[dict]:
+        with self._lock:
+            self._ready.clear()
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def get(self, timeout: float) -> list[dict] | None:
+        """
+        Накопленные события; None, если за timeout секунд событий не было.
+        Пустой список возможен при одновременном чтении и добавлении
+        """
+        if not self._ready.wait(timeout):
+            return None
+        return self._pop()
+
+    async def aget(self, timeout: float) -> list[dict] | None:
+        try:
+            await asyncio.wait_for(self._aready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._aready.clear()
+        return self._pop()
+
+
+class Broadcaster:
+    """
+    Раздача событий подписчикам досок внутри процесса
+    """
+    buffer_size: int = 100
+
+    def __init__(self):
+        self._subscribers: defaultdict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, board_id: int, user_id: int, loop: asyncio.AbstractEventLoop | None = None) -> Subscription:
+        subscription = Subscription(board_id, user_id, self.buffer_size, loop)
+        with self._lock:
+            self._subscribers[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.board_id]
+
+    def dispatch(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(event['board'], ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def resync_all(self) -> None:
+        with self._lock:
+            subscribers = [subscription for group in self._subscribers.values() for subscription in group]
+        for subscription in subscribers:
+            subscription.push(RESYNC)
+
+
+broadcaster = Broadcaster()
+
+
+class EventBackend(ABC):
+    """
+    Доставка зафиксированных событий до раздачи (Broadcaster) в процессах, где открыты подписки
+    """
+
+    def __init__(self, broadcaster: Broadcaster):
+        self.broadcaster = broadcaster
+
+    @abstractmethod
+    def publish(self, event: dict) -> None:
+        """
+        Доставляет событие подписчикам. Вызывается после коммита транзакции
+        """
+
+    def start(self) -> None:
+        """
+        Начинает прием событий, если он нужен. Вызывается при каждой подписке
+        """
+
+    def stop(self) -> None:
+        """
+        Останавливает прием событий
+        """
+
+
+class LocalEventBackend(EventBackend):
+    """
+    Событие раздается в том же процессе, где произошло изменение.
+    Подходит для одного процесса (runserver, один воркер uvicorn)
+    """
+
+    def publish(self, event: dict) -> None:
+        self.broadcaster.dispatch(event)
+
+
+class PostgresEventBackend(EventBackend):
+    """
+    Событие отправляется через NOTIFY, и его получают все процессы, слушающие канал.
+    Прием идет в фоновом потоке с отдельным соединением (LISTEN), поток запускается при первой подписке.
+    После потери соединения подписчики получают RESYNC: события за время переподключения не приходят
+    """
+    channel = 'goals_board_events'
+    poll_timeout: float = 5
+    reconnect_delay: float = 1
+
+    def __init__(self, broadcaster: Broadcaster):
+        super().__init__(broadcaster)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def publish(self, event: dict) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps(event)])
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._listen, name='board-events', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopping.set()
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    def _listen(self) -> None:
+        reconnect = False
+        while not self._stopping.is_set():
+            try:
+                listener = psycopg2.connect(**connections['default'].get_connection_params())
+            except psycopg2.Error:
+                logger.exception('Board events: connection failed')
+                reconnect = True
+                self._stopping.wait(self.reconnect_delay)
+                continue
+            try:
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                if reconnect:
+                    self.broadcaster.resync_all()
+                while not self._stopping.is_set():
+                    if select.select([listener], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        self.broadcaster.dispatch(json.loads(listener.notifies.pop(0).payload))
+            except psycopg2.Error:
+                logger.exception('Board events: connection lost')
+            finally:
+                listener.close()
+            reconnect = True
+            self._stopping.wait(self.reconnect_delay)
+
+
+EVENT_BACKENDS = {
+    'local': LocalEventBackend,
+    'postgres': PostgresEventBackend,
+}
+
+
+@cache
+def get_event_backend() -> EventBackend:
+    """
+    Доставка событий, выбранная в настройке BOARD_EVENTS_BACKEND (одна на процесс)
+    """
+    return EVENT_BACKENDS[settings.BOARD_EVENTS_BACKEND](broadcaster)
+
+
+def publish(event_type: str, board_ids, object_id: int | None = None, **data) -> None:
+    """
+    Отправляет событие event_type (например, goal.updated) подписчикам досок board_ids после коммита транзакции.
+    При откате транзакции событие не отправляется, ошибка доставки не влияет на сохранение
+    """
+    backend = get_event_backend()
+    for board_id in set(board_ids):
+        event = {'type': event_type, 'board': board_id, 'id': object_id, **data}
+        transaction.on_commit(lambda event=event: backend.publish(event), robust=True)
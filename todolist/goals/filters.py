@@ -1,8 +1,12 @@
 import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db import models
+from django.db.models.functions import Cast, Coalesce
 from django_filters import rest_framework
+from rest_framework import filters
+from rest_framework.settings import api_settings
 
-from goals.models import Goal
+from goals.models import Goal, GoalComments
 
 
 class GoalDateFilter(rest_framework.FilterSet):
@@ -26,3 +30,39 @@ class GoalDateFilter(rest_framework.FilterSet):
         models.DateTimeField: {"filter_class": django_filters.IsoDateTimeFilter},
     }
 
+
+class GoalFullTextSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск целей по параметру search.
+    Ищет по search_vector (название и описание) через GIN индекс,
+    с параметром search_comments=true - и по тексту комментариев.
+    Без явного параметра ordering результаты сортируются по релевантности
+    """
+    config = 'russian'
+    rank_field = 'search_rank'
+    search_comments_param = 'search_comments'
+
+    def get_search_query(self, request) -> SearchQuery | None:
+        terms = ' '.join(self.get_search_terms(request))
+        if not terms:
+            return None
+        return SearchQuery(terms, config=self.config, search_type='websearch')
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if query is None:
+            return queryset
+
+        condition = models.Q(search_vector=query)
+        if request.query_params.get(self.search_comments_param, '').lower() in ('1', 'true'):
+            condition |= models.Exists(
+                GoalComments.objects.filter(goal=models.OuterRef('pk'), search_vector=query)
+            )
+
+        # ts_rank возвращает real; приводим к double precision, чтобы значение в курсоре пагинации
+        # без потерь совпадало со значением в базе
+        rank = Cast(SearchRank(models.F('search_vector'), query), models.FloatField())
+        queryset = queryset.filter(condition).annotate(**{self.rank_field: Coalesce(rank, 0.0)})
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by(f'-{self.rank_field}', '-pk')
+        return queryset
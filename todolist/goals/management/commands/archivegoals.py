@@ -0,0 +1,33 @@
+import time
+
+from django.core.management import BaseCommand
+
+from goals.archive import archive_batch
+
+
+class Command(BaseCommand):
+    """
+    Фоновая архивация целей удаленных досок и категорий (settings.GOALS_ARCHIVE_IN_BACKGROUND).
+    Воркеров можно запускать несколько: каждый берет свою задачу. Прерванная задача продолжается
+    с неархивированных целей при следующем запуске
+    """
+
+    help = "archive goals of deleted boards and categories in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Целей за одну транзакцию')
+        parser.add_argument('--pause', type=float, default=0, help='Пауза в секундах между пачками')
+        parser.add_argument('--interval', type=float, default=5, help='Пауза в секундах, когда очередь пуста')
+        parser.add_argument('--once', action='store_true', help='Обработать очередь и завершиться')
+
+    def handle(self, *args, **options):
+        while True:
+            job = archive_batch(options['batch_size'])
+            if job is not None:
+                state = 'finished' if job.finished else 'in progress'
+                self.stdout.write(f'archive job {job.pk}: {job.done}/{job.total} {state}')
+                time.sleep(options['pause'])
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,139 @@
+import random
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from core.models import User
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComments
+
+
+class Command(BaseCommand):
+    """
+    Бенчмарк горячих запросов списков целей, категорий, досок и комментариев.
+    Наполняет базу тестовыми данными и выводит планы выполнения (EXPLAIN ANALYZE).
+    Для сравнения планов запустите команду до и после миграции с индексами:
+        python manage.py migrate goals 0007 && python manage.py benchmark_queries --seed 1000000
+        python manage.py migrate goals && python manage.py benchmark_queries
+    """
+
+    help = "seed database and explain goal/board hot queries"
+
+    batch_size = 10_000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Количество целей для генерации')
+        parser.add_argument('--users', type=int, default=1_000, help='Количество пользователей для генерации')
+        parser.add_argument('--boards-per-user', type=int, default=3)
+        parser.add_argument('--categories-per-board', type=int, default=5)
+        parser.add_argument('--comments-per-goal', type=float, default=0.5)
+        parser.add_argument('--repeat', type=int, default=20, help='Количество прогонов для замера времени')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        user = User.objects.filter(participants__isnull=False).order_by('?').first()
+        if user is None:
+            self.stderr.write('Нет данных: запустите команду с параметром --seed')
+            return
+
+        for name, qs in self.hot_queries(user).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(qs.explain(analyze=True))
+            self.stdout.write(f'avg: {self.timeit(qs, options["repeat"]):.2f} ms\n')
+
+    @staticmethod
+    def hot_queries(user: User) -> dict[str, QuerySet]:
+        """
+        Запросы списков в том виде, в котором их строят представления goals/views
+        """
+        goal = Goal.objects.filter(category__board__participants__user=user).first()
+        board_ids = list(BoardParticipant.objects.filter(user=user).values_list('board_id', flat=True))
+        return {
+            'board/list': Board.objects.filter(participants__user=user, is_deleted=False).order_by('title')[:100],
+            'goal_category/list': GoalCategory.objects.filter(
+                board__participants__user=user, is_deleted=False
+            ).order_by('title')[:100],
+            'goal/list': Goal.objects.filter(
+                category__board__participants__user=user, category__is_deleted=False
+            ).exclude(status=Goal.Status.archived).order_by('title')[:100],
+            'goal_comment/list': GoalComments.objects.filter(
+                board_id__in=board_ids, goal=goal
+            ).order_by('-created')[:100],
+            'goal_comment/list (all)': GoalComments.objects.filter(board_id__in=board_ids).order_by('-created')[:100],
+        }
+
+    @staticmethod
+    def timeit(qs: QuerySet, repeat: int) -> float:
+        """
+        Среднее время выполнения запроса в миллисекундах
+        """
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(qs.all())
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    def seed(self, options: dict) -> None:
+        """
+        Генерация пользователей, досок, категорий, целей и комментариев пачками через bulk_create
+        """
+        now = timezone.now()
+        dates = {'created': now, 'updated': now}
+        run = int(time.time())
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                [User(username=f'bench_{run}_{i}') for i in range(options['users'])],
+                batch_size=self.batch_size,
+            )
+            boards = Board.objects.bulk_create(
+                [Board(title=f'Board {i}', **dates) for i in range(len(users) * options['boards_per_user'])],
+                batch_size=self.batch_size,
+            )
+            participants = []
+            for i, board in enumerate(boards):
+                owner = users[i // options['boards_per_user']]
+                participants.append(BoardParticipant(board=board, user=owner, **dates))
+                guest = random.choice(users)
+                if guest != owner:
+                    participants.append(BoardParticipant(
+                        board=board, user=guest, role=BoardParticipant.Role.writer, **dates
+                    ))
+            BoardParticipant.objects.bulk_create(participants, batch_size=self.batch_size)
+
+            categories = GoalCategory.objects.bulk_create(
+                [
+                    GoalCategory(board=board, user=users[i // options['boards_per_user']], title=f'Category {j}',
+                                 is_deleted=random.random() < 0.1, **dates)
+                    for i, board in enumerate(boards)
+                    for j in range(options['categories_per_board'])
+                ],
+                batch_size=self.batch_size,
+            )
+
+        for start in range(0, options['seed'], self.batch_size):
+            with transaction.atomic():
+                goals = Goal.objects.bulk_create([
+                    Goal(
+                        title=f'Goal {start + i}',
+                        description='benchmark',
+                        category=(category := random.choice(categories)),
+                        user_id=category.user_id,
+                        status=random.choice(Goal.Status.values),
+                        priority=random.choice(Goal.Priority.values),
+                        **dates,
+                    )
+                    for i in range(min(self.batch_size, options['seed'] - start))
+                ])
+                GoalComments.objects.bulk_create([
+                    GoalComments(goal=goal, user_id=goal.user_id, text='benchmark', **dates)
+                    for goal in goals
+                    if random.random() < options['comments_per_goal']
+                ])
+            self.stdout.write(f'seeded {start + len(goals)} goals')
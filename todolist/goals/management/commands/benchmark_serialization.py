@@ -0,0 +1,88 @@
+import time
+from typing import Callable
+
+from django.core.management import BaseCommand
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer
+
+from core.models import User
+from core.renderers import ORJSONRenderer
+from core.row_plan import RowPlan
+from goals.models import GoalCategory, Goal, GoalComments
+from goals.serializers import GoalCategorySerializer, GoalCommentSerializer, GoalSerializer
+
+
+class Command(BaseCommand):
+    """
+    Бенчмарк сборки страниц списков целей, категорий и комментариев.
+    Сравнивает процессорное время на строку: модели + сериализатор + JSONRenderer
+    и values() + RowPlan + ORJSONRenderer (FastListMixin). Данные берутся из базы,
+    наполненной benchmark_queries --seed
+    """
+
+    help = "measure per-row CPU time of list serialization"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000, help='Количество строк на страницу')
+        parser.add_argument('--repeat', type=int, default=20, help='Количество прогонов для замера времени')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(participants__isnull=False).order_by('?').first()
+        if user is None:
+            self.stderr.write('Нет данных: запустите benchmark_queries с параметром --seed')
+            return
+
+        for name, (qs, serializer_class) in self.lists(user).items():
+            qs = qs[:options['rows']]
+            rows = len(qs.values_list('id'))
+            if not rows:
+                continue
+            plan = RowPlan.for_serializer(serializer_class)
+
+            def slow() -> bytes:
+                return JSONRenderer().render(serializer_class(list(qs.all()), many=True).data)
+
+            def fast() -> bytes:
+                return ORJSONRenderer().render(plan.rows(plan.values(qs)))
+
+            assert slow() == fast(), name
+            before, after = (self.timeit(func, options['repeat']) * 1_000_000 / rows for func in (slow, fast))
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name} ({rows} rows)'))
+            self.stdout.write(f'serializer: {before:.1f} us/row, row plan: {after:.1f} us/row, x{before / after:.1f}\n')
+
+    @staticmethod
+    def lists(user: User) -> dict[str, tuple[QuerySet, type[ModelSerializer]]]:
+        """
+        Запросы списков в том виде, в котором их строят представления goals/views
+        """
+        return {
+            'goal_category/list': (
+                GoalCategory.objects.select_related('user').filter(
+                    board__participants__user=user, is_deleted=False
+                ).order_by('title', 'id'),
+                GoalCategorySerializer,
+            ),
+            'goal/list': (
+                Goal.objects.select_related('user').defer('search_vector').filter(
+                    category__board__participants__user=user, category__is_deleted=False
+                ).exclude(status=Goal.Status.archived).order_by('title', 'id'),
+                GoalSerializer,
+            ),
+            'goal_comment/list': (
+                GoalComments.objects.select_related('user').defer('search_vector').filter(
+                    board__participants__user=user
+                ).order_by('-created', '-id'),
+                GoalCommentSerializer,
+            ),
+        }
+
+    @staticmethod
+    def timeit(func: Callable, repeat: int) -> float:
+        """
+        Среднее процессорное время вызова в секундах (без ожидания базы)
+        """
+        started = time.process_time()
+        for _ in range(repeat):
+            func()
+        return (time.process_time() - started) / repeat
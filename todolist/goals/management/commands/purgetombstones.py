@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from goals.models import Tombstone
+
+
+class Command(BaseCommand):
+    """
+    Удаляет записи об удалениях старше SYNC_TOMBSTONE_DAYS: клиенты с более старым курсором
+    все равно получают полный снимок. Запускается периодически (например, раз в сутки)
+    """
+
+    help = "delete sync tombstones older than SYNC_TOMBSTONE_DAYS"
+
+    def handle(self, *args, **options):
+        border = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        deleted, _ = Tombstone.objects.filter(created__lt=border).delete()
+        self.stdout.write(f'deleted {deleted} tombstones')
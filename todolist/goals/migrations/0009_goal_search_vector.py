@@ -0,0 +1,79 @@
+# Generated by Django 4.2.3 on 2026-10-18 08:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+GOAL_TRIGGER = """
+CREATE FUNCTION goals_goal_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector_update();
+
+UPDATE goals_goal SET search_vector =
+    setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce(description, '')), 'B');
+"""
+
+GOAL_TRIGGER_REVERSE = """
+DROP TRIGGER goals_goal_search_vector_trigger ON goals_goal;
+DROP FUNCTION goals_goal_search_vector_update();
+"""
+
+COMMENT_TRIGGER = """
+CREATE FUNCTION goals_goalcomments_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_tsvector('russian', coalesce(NEW.text, ''));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcomments_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF text ON goals_goalcomments
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcomments_search_vector_update();
+
+UPDATE goals_goalcomments SET search_vector = to_tsvector('russian', coalesce(text, ''));
+"""
+
+COMMENT_TRIGGER_REVERSE = """
+DROP TRIGGER goals_goalcomments_search_vector_trigger ON goals_goalcomments;
+DROP FUNCTION goals_goalcomments_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='goalcomments',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='goal_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomments',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='comment_search_vector'),
+        ),
+        migrations.RunSQL(GOAL_TRIGGER, GOAL_TRIGGER_REVERSE),
+        migrations.RunSQL(COMMENT_TRIGGER, COMMENT_TRIGGER_REVERSE),
+    ]
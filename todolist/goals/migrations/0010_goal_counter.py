@@ -0,0 +1,69 @@
+# Generated by Django 4.2.3 on 2026-10-18 09:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+COUNTER_TRIGGER = """
+CREATE FUNCTION goals_goal_counter_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE goals_goalcounter SET count = count - 1
+        WHERE category_id = OLD.category_id AND status = OLD.status AND priority = OLD.priority;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO goals_goalcounter (category_id, status, priority, count)
+        VALUES (NEW.category_id, NEW.status, NEW.priority, 1)
+        ON CONFLICT (category_id, status, priority) DO UPDATE SET count = goals_goalcounter.count + 1;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_counter_trigger
+    AFTER INSERT OR DELETE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_counter_update();
+
+CREATE TRIGGER goals_goal_counter_update_trigger
+    AFTER UPDATE OF category_id, status, priority ON goals_goal
+    FOR EACH ROW
+    WHEN ((OLD.category_id, OLD.status, OLD.priority) IS DISTINCT FROM (NEW.category_id, NEW.status, NEW.priority))
+    EXECUTE FUNCTION goals_goal_counter_update();
+
+INSERT INTO goals_goalcounter (category_id, status, priority, count)
+SELECT category_id, status, priority, count(*) FROM goals_goal GROUP BY category_id, status, priority;
+"""
+
+COUNTER_TRIGGER_REVERSE = """
+DROP TRIGGER goals_goal_counter_update_trigger ON goals_goal;
+DROP TRIGGER goals_goal_counter_trigger ON goals_goal;
+DROP FUNCTION goals_goal_counter_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0009_goal_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счетчик целей',
+                'verbose_name_plural': 'Счетчики целей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='goalcounter',
+            constraint=models.UniqueConstraint(fields=('category', 'status', 'priority'), name='goal_counter_unique'),
+        ),
+        migrations.RunSQL(COUNTER_TRIGGER, COUNTER_TRIGGER_REVERSE),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+BOARD_TRIGGERS = """
+CREATE FUNCTION goals_goal_board_update() RETURNS trigger AS $$
+BEGIN
+    NEW.board_id := (SELECT board_id FROM goals_goalcategory WHERE id = NEW.category_id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_board_trigger
+    BEFORE INSERT OR UPDATE OF category_id, board_id ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_board_update();
+
+CREATE FUNCTION goals_goalcomments_board_update() RETURNS trigger AS $$
+BEGIN
+    NEW.board_id := (SELECT board_id FROM goals_goal WHERE id = NEW.goal_id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcomments_board_trigger
+    BEFORE INSERT OR UPDATE OF goal_id, board_id ON goals_goalcomments
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcomments_board_update();
+
+CREATE FUNCTION goals_goal_board_cascade() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_goalcomments SET board_id = NEW.board_id WHERE goal_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_board_cascade_trigger
+    AFTER UPDATE ON goals_goal
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_goal_board_cascade();
+
+CREATE FUNCTION goals_goalcategory_board_cascade() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_goal SET board_id = NEW.board_id WHERE category_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcategory_board_cascade_trigger
+    AFTER UPDATE ON goals_goalcategory
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_goalcategory_board_cascade();
+"""
+
+BOARD_TRIGGERS_REVERSE = """
+DROP TRIGGER goals_goalcategory_board_cascade_trigger ON goals_goalcategory;
+DROP FUNCTION goals_goalcategory_board_cascade();
+DROP TRIGGER goals_goal_board_cascade_trigger ON goals_goal;
+DROP FUNCTION goals_goal_board_cascade();
+DROP TRIGGER goals_goalcomments_board_trigger ON goals_goalcomments;
+DROP FUNCTION goals_goalcomments_board_update();
+DROP TRIGGER goals_goal_board_trigger ON goals_goal;
+DROP FUNCTION goals_goal_board_update();
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    Поле board у целей и комментариев и триггеры, которые его поддерживают.
+    Существующие строки заполняются пачками в следующей миграции
+    """
+
+    dependencies = [
+        ('goals', '0010_goal_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomments',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.RunSQL(BOARD_TRIGGERS, BOARD_TRIGGERS_REVERSE),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations, models, transaction
+import django.db.models.deletion
+
+BATCH_SIZE = 10_000
+
+BACKFILL = {
+    'goals_goal': """
+        UPDATE goals_goal SET board_id = goals_goalcategory.board_id
+        FROM goals_goalcategory
+        WHERE goals_goalcategory.id = goals_goal.category_id
+            AND goals_goal.id >= %s AND goals_goal.id < %s AND goals_goal.board_id IS NULL
+    """,
+    'goals_goalcomments': """
+        UPDATE goals_goalcomments SET board_id = goals_goal.board_id
+        FROM goals_goal
+        WHERE goals_goal.id = goals_goalcomments.goal_id
+            AND goals_goalcomments.id >= %s AND goals_goalcomments.id < %s AND goals_goalcomments.board_id IS NULL
+    """,
+}
+
+
+def backfill_board(apps, schema_editor):
+    """
+    Заполняет board пачками по диапазонам id, каждая пачка - отдельная короткая транзакция.
+    Уже заполненные строки пропускаются, поэтому прерванную миграцию можно запустить повторно
+    """
+    connection = schema_editor.connection
+    for table, sql in BACKFILL.items():
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT min(id), max(id) FROM {table} WHERE board_id IS NULL')
+            min_id, max_id = cursor.fetchone()
+        if min_id is None:
+            continue
+        for start in range(min_id, max_id + 1, BATCH_SIZE):
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(sql, [start, start + BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('goals', '0011_goal_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_board, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AlterField(
+            model_name='goalcomments',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+    ]
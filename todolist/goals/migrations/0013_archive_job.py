@@ -0,0 +1,60 @@
+# Generated by Django 4.2.3 on 2026-10-18 09:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0012_backfill_goal_board'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего целей')),
+                ('done', models.PositiveIntegerField(default=0, verbose_name='Заархивировано')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+            ],
+            options={
+                'verbose_name': 'Архивация',
+                'verbose_name_plural': 'Архивации',
+            },
+        ),
+        # Составной индекс создается до удаления индекса внешнего ключа
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'status'], name='goal_board_status'),
+        ),
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='archivejob',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='archivejob',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='goals.goalcategory', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='archivejob',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL, verbose_name='Инициатор'),
+        ),
+        migrations.AddIndex(
+            model_name='archivejob',
+            index=models.Index(condition=models.Q(('finished__isnull', True)), fields=['id'], name='archivejob_pending'),
+        ),
+    ]
@@ -0,0 +1,139 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+TOUCHED_TABLES = ['goals_board', 'goals_boardparticipant', 'goals_goalcategory', 'goals_goal', 'goals_goalcomments']
+TOMBSTONE_TABLES = {'goals_goalcategory': 'category', 'goals_goal': 'goal', 'goals_goalcomments': 'comment'}
+
+# Дата обновления ставится и при изменениях в обход save(): queryset.update(), bulk_update
+# без поля updated и каскадные обновления триггерами (перенос целей и комментариев на другую доску)
+TOUCH_FUNCTION = """
+CREATE FUNCTION goals_touch_updated() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated IS NOT DISTINCT FROM OLD.updated THEN
+        NEW.updated := clock_timestamp();
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TOMBSTONE_FUNCTIONS = """
+CREATE FUNCTION goals_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO goals_tombstone (kind, object_id, board_id, created)
+        VALUES (TG_ARGV[0], OLD.id, OLD.board_id, clock_timestamp());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_participant_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO goals_tombstone (kind, object_id, board_id, user_id, created)
+        VALUES ('board', OLD.board_id, OLD.board_id, OLD.user_id, clock_timestamp());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_boardparticipant_tombstone_trigger
+    AFTER DELETE ON goals_boardparticipant
+    FOR EACH ROW EXECUTE FUNCTION goals_participant_tombstone();
+"""
+
+SYNC_TRIGGERS = TOUCH_FUNCTION + TOMBSTONE_FUNCTIONS + "".join(
+    f"""
+CREATE TRIGGER {table}_touch_trigger
+    BEFORE UPDATE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION goals_touch_updated();
+"""
+    for table in TOUCHED_TABLES
+) + "".join(
+    f"""
+CREATE TRIGGER {table}_tombstone_trigger
+    AFTER DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION goals_tombstone('{kind}');
+
+CREATE TRIGGER {table}_moved_tombstone_trigger
+    AFTER UPDATE ON {table}
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_tombstone('{kind}');
+"""
+    for table, kind in TOMBSTONE_TABLES.items()
+)
+
+SYNC_TRIGGERS_REVERSE = "".join(
+    f"""
+DROP TRIGGER {table}_moved_tombstone_trigger ON {table};
+DROP TRIGGER {table}_tombstone_trigger ON {table};
+"""
+    for table in TOMBSTONE_TABLES
+) + "".join(
+    f"DROP TRIGGER {table}_touch_trigger ON {table};\n" for table in TOUCHED_TABLES
+) + """
+DROP TRIGGER goals_boardparticipant_tombstone_trigger ON goals_boardparticipant;
+DROP FUNCTION goals_participant_tombstone();
+DROP FUNCTION goals_tombstone();
+DROP FUNCTION goals_touch_updated();
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    Синхронизация клиентов: индексы по дате обновления в пределах доски, таблица удалений
+    и триггеры, которые поддерживают дату обновления и записывают удаления
+    """
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0013_archive_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('board', 'Доска'), ('category', 'Категория'), ('goal', 'Цель'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор')),
+                ('created', models.DateTimeField(verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удаление',
+                'verbose_name_plural': 'Удаления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'updated'], name='goal_board_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(fields=['board', 'updated'], name='category_board_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomments',
+            index=models.Index(fields=['board', 'updated'], name='comment_board_updated'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['board', 'created'], name='tombstone_board_created'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(condition=models.Q(('user__isnull', False)), fields=['user', 'created'], name='tombstone_user_created'),
+        ),
+        migrations.RunSQL(SYNC_TRIGGERS, SYNC_TRIGGERS_REVERSE),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 
@@ -18,6 +20,7 @@ class DatesModelMixin(models.Model):
         if not self.id:
             self.created = timezone.now()
         self.updated = timezone.now()
+        # При save(update_fields=...) без updated дату обновления в базе ставит триггер goals_touch_updated
         return super().save(*args, **kwargs)
 
 
@@ -31,6 +34,9 @@ class Board(DatesModelMixin):
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["title"], name="board_active_title", condition=models.Q(is_deleted=False)),
+        ]
 
 
 class BoardParticipant(DatesModelMixin):
@@ -67,6 +73,9 @@ class BoardParticipant(DatesModelMixin):
         unique_together = ("board", "user")
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
+        indexes = [
+            models.Index(fields=["user", "board", "role"], name="participant_user_board_role"),
+        ]
 
 
 class GoalCategory(DatesModelMixin):
@@ -81,6 +90,14 @@ class GoalCategory(DatesModelMixin):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(
+                fields=["board", "title"],
+                name="category_active_board_title",
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(fields=["board", "updated"], name="category_board_updated"),
+        ]
 
 
 class Goal(DatesModelMixin):
@@ -110,6 +127,11 @@ class Goal(DatesModelMixin):
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
     description = models.TextField(verbose_name="Описание", blank=True)
     category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.PROTECT)
+    # Доска категории. Заполняется триггером в базе при создании цели и при смене категории.
+    # Отдельный индекс не нужен: поиск по доске покрывает индекс goal_board_status
+    board = models.ForeignKey(
+        Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="goals", editable=False, db_index=False
+    )
     due_date = models.DateTimeField(verbose_name="Дата выполнения", null=True, blank=True)
     status = models.PositiveSmallIntegerField(
         verbose_name="Статус", choices=Status.choices, default=Status.to_do
@@ -117,10 +139,24 @@ class Goal(DatesModelMixin):
     priority = models.PositiveSmallIntegerField(
         verbose_name="Приоритет", choices=Priority.choices, default=Priority.medium
     )
+    # Заполняется триггером в базе из title и description
+    search_vector = SearchVectorField(verbose_name="Поисковый вектор", null=True, editable=False)
 
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        indexes = [
+            models.Index(fields=["category", "status"], name="goal_category_status"),
+            models.Index(fields=["board", "status"], name="goal_board_status"),
+            models.Index(fields=["board", "updated"], name="goal_board_updated"),
+            models.Index(
+                fields=["category", "title"],
+                name="goal_active_category_title",
+                # Архивные цели (Status.archived) в списки не попадают
+                condition=~models.Q(status=4),
+            ),
+            GinIndex(fields=["search_vector"], name="goal_search_vector"),
+        ]
 
 
 class GoalComments(DatesModelMixin):
@@ -130,8 +166,99 @@ class GoalComments(DatesModelMixin):
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
     text = models.TextField(verbose_name="Текст")
     goal = models.ForeignKey(Goal, verbose_name="Цель", on_delete=models.PROTECT)
+    # Доска цели. Заполняется триггером в базе при создании комментария и при переносе цели
+    board = models.ForeignKey(
+        Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="comments", editable=False
+    )
+    # Заполняется триггером в базе из text
+    search_vector = SearchVectorField(verbose_name="Поисковый вектор", null=True, editable=False)
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(fields=["goal", "-created"], name="comment_goal_created"),
+            models.Index(fields=["board", "updated"], name="comment_board_updated"),
+            GinIndex(fields=["search_vector"], name="comment_search_vector"),
+        ]
+
+
+class GoalCounter(models.Model):
+    """
+    Количество целей категории по статусу и приоритету.
+    Поддерживается триггером в базе при изменении целей, поэтому статистика доски
+    читается из этих строк без подсчета самих целей
+    """
+    category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.CASCADE)
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    count = models.IntegerField(verbose_name="Количество", default=0)
+
+    class Meta:
+        verbose_name = "Счетчик целей"
+        verbose_name_plural = "Счетчики целей"
+        constraints = [
+            models.UniqueConstraint(fields=["category", "status", "priority"], name="goal_counter_unique"),
+        ]
+
+
+class ArchiveJob(DatesModelMixin):
+    """
+    Фоновая архивация целей удаленной доски или категории (для категории заполнены оба поля).
+    Доска или категория помечается удаленной сразу, а цели архивируются воркером archivegoals
+    небольшими пачками. Прогресс - done из total; после сбоя воркер продолжает с неархивированных целей
+    """
+    user = models.ForeignKey(User, verbose_name="Инициатор", on_delete=models.PROTECT)
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT)
+    category = models.ForeignKey(
+        GoalCategory, verbose_name="Категория", on_delete=models.PROTECT, null=True, blank=True
+    )
+    total = models.PositiveIntegerField(verbose_name="Всего целей", default=0)
+    done = models.PositiveIntegerField(verbose_name="Заархивировано", default=0)
+    finished = models.DateTimeField(verbose_name="Дата завершения", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Архивация"
+        verbose_name_plural = "Архивации"
+        indexes = [
+            models.Index(fields=["id"], name="archivejob_pending", condition=models.Q(finished__isnull=True)),
+        ]
+
+    def goals(self) -> models.QuerySet[Goal]:
+        """
+        Еще не заархивированные цели задачи
+        """
+        qs = Goal.objects.filter(board_id=self.board_id).exclude(status=Goal.Status.archived)
+        if self.category_id:
+            qs = qs.filter(category_id=self.category_id)
+        return qs
 
+
+class Tombstone(models.Model):
+    """
+    Запись об удалении объекта для синхронизации клиентов (goals/sync).
+    Создается триггерами в базе: при удалении категории, цели или комментария, при переносе их
+    на другую доску (для участников прежней доски) и при исключении пользователя из доски (kind=board, user).
+    Удаленные доски и категории (is_deleted) и архивные цели синхронизация берет из самих таблиц
+    """
+    class Kind(models.TextChoices):
+        board = "board", "Доска"
+        category = "category", "Категория"
+        goal = "goal", "Цель"
+        comment = "comment", "Комментарий"
+
+    kind = models.CharField(verbose_name="Тип", max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="Идентификатор")
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.CASCADE, db_index=False)
+    user = models.ForeignKey(User, verbose_name="Пользователь", on_delete=models.CASCADE, null=True, db_index=False)
+    created = models.DateTimeField(verbose_name="Дата удаления")
+
+    class Meta:
+        verbose_name = "Удаление"
+        verbose_name_plural = "Удаления"
+        indexes = [
+            models.Index(fields=["board", "created"], name="tombstone_board_created"),
+            models.Index(
+                fields=["user", "created"], name="tombstone_user_created", condition=models.Q(user__isnull=False)
+            ),
+        ]
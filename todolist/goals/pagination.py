@@ -0,0 +1,141 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import GenericAPIView
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Постраничный вывод по ключу (ordering поле, id).
+    Курсор хранит значение поля сортировки и id последней записи страницы,
+    поэтому следующая страница выбирается условием по индексу, а не через OFFSET,
+    и глубокие страницы стоят столько же, сколько первая.
+
+    Если клиент передал offset, используется прежний LimitOffsetPagination
+    с тем же ограничением на размер страницы.
+    """
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 200
+    ordering = '-created'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: GenericAPIView | None = None):
+        if 'offset' in request.query_params:
+            self.legacy = LimitOffsetPagination()
+            self.legacy.default_limit = self.page_size
+            self.legacy.max_limit = self.max_page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+        self.legacy = None
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'offset')
+        self.field, descending = self.get_keyset_field(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor['reverse'])
+        # Для обратного прохода сортируем в противоположную сторону, а затем разворачиваем страницу
+        desc = descending != reverse
+        direction = '-' if desc else ''
+        queryset = queryset.order_by(f'{direction}{self.key_name}', f'{direction}pk')
+
+        if self.cursor:
+            queryset = queryset.filter(self.keyset_filter(self.cursor['value'], self.cursor['pk'], desc))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        return self.page
+
+    def get_keyset_field(self, request: Request, queryset: QuerySet, view: GenericAPIView | None):
+        """
+        Поле, по которому строится ключ, и направление сортировки.
+        Берется первое поле сортировки, уже примененной фильтрами к queryset.
+        Аннотации (например, релевантность поиска) тоже поддерживаются,
+        для связанных полей (через '__') используется сортировка по умолчанию
+        """
+        ordering = next(iter(queryset.query.order_by), None)
+        if not isinstance(ordering, str) or '__' in ordering:
+            ordering = self.get_ordering(request, queryset, view)[0]
+        if '__' in ordering:
+            ordering = (getattr(view, 'ordering', None) or [self.ordering])[0]
+
+        name = ordering.lstrip('-')
+        self.key_is_annotation = name in queryset.query.annotations
+        if self.key_is_annotation:
+            field = queryset.query.annotations[name].output_field
+        else:
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                name, ordering = self.ordering.lstrip('-'), self.ordering
+                field = queryset.model._meta.get_field(name)
+        self.key_name = name
+        return field, ordering.startswith('-')
+
+    def keyset_filter(self, value: Any, pk: int, desc: bool) -> Q:
+        """
+        Условие (field, id) > (value, pk) для прямой сортировки и < для обратной.
+        Дополнительное условие field >= value позволяет базе сузить диапазон по индексу
+        """
+        name = self.key_name
+        op = 'lt' if desc else 'gt'
+        bound = Q(**{f'{name}__{op}e': value})
+        return bound & (Q(**{f'{name}__{op}': value}) | Q(**{name: value, f'pk__{op}': pk}))
+
+    def decode_cursor(self, request: Request) -> dict | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            value, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            return {'value': self.field.to_python(value), 'pk': int(pk), 'reverse': bool(reverse)}
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance: Model | dict, reverse: bool) -> str:
+        if isinstance(instance, dict):
+            # Строка из queryset.values() (FastListMixin)
+            value, pk = instance[self.key_name], instance['id']
+            if not self.key_is_annotation:
+                value = self.field.value_to_string(self.field.model(**{self.field.attname: value}))
+        elif self.key_is_annotation:
+            value, pk = getattr(instance, self.key_name), instance.pk
+        else:
+            value, pk = self.field.value_to_string(instance), instance.pk
+        position = [value, pk, int(reverse)]
+        encoded = urlsafe_b64encode(json.dumps(position).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> str | None:
+        if self.legacy:
+            return self.legacy.get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if self.legacy:
+            return self.legacy.get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.legacy:
+            return self.legacy.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,11 +1,9 @@
-from typing import Any
-
-from django.db.models import Q, F
 from rest_framework import permissions
 from rest_framework.generics import GenericAPIView
 from rest_framework.request import Request
 
-from goals.models import BoardParticipant, Board, GoalCategory, Goal, GoalComments
+from goals.board_access import OWNER_ROLES, WRITE_ROLES, has_board_access
+from goals.models import Board, GoalCategory, Goal, GoalComments
 
 
 class BoardPermissions(permissions.IsAuthenticated):
@@ -16,11 +14,8 @@ class BoardPermissions(permissions.IsAuthenticated):
         - Если авторизован и является владельцем, то разрешить все доступные действия
     """
     def has_object_permission(self, request: Request, view: GenericAPIView, obj: Board) -> bool:
-        _filters: dict[str, Any] = {'user': request.user, 'board': obj}
-        if request.method not in permissions.SAFE_METHODS:
-            _filters['role'] = BoardParticipant.Role.owner
-
-        return BoardParticipant.objects.filter(**_filters).exists()
+        roles = None if request.method in permissions.SAFE_METHODS else OWNER_ROLES
+        return has_board_access(request, obj.id, roles)
 
 
 class GoalCategoryPermissions(permissions.IsAuthenticated):
@@ -32,11 +27,8 @@ class GoalCategoryPermissions(permissions.IsAuthenticated):
     """
 
     def has_object_permission(self, request: Request, view: GenericAPIView, obj: GoalCategory) -> bool:
-        _filters: dict[str, Any] = {'user': request.user, 'board': obj.board}
-        if request.method not in permissions.SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-
-        return BoardParticipant.objects.filter(**_filters).exists()
+        roles = None if request.method in permissions.SAFE_METHODS else WRITE_ROLES
+        return has_board_access(request, obj.board_id, roles)
 
 
 class GoalPermissions(permissions.IsAuthenticated):
@@ -48,11 +40,8 @@ class GoalPermissions(permissions.IsAuthenticated):
     """
 
     def has_object_permission(self, request: Request, view: GenericAPIView, obj: Goal) -> bool:
-        _filters: dict[str, Any] = {'user': request.user, 'board': obj.category.board}
-        if request.method not in permissions.SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-
-        return BoardParticipant.objects.filter(**_filters).exists()
+        roles = None if request.method in permissions.SAFE_METHODS else WRITE_ROLES
+        return has_board_access(request, obj.category.board_id, roles)
 
 
 class GoalCommentPermissions(permissions.IsAuthenticated):
@@ -1,10 +1,14 @@
-from django.db import transaction
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError, PermissionDenied
 
 from core.models import User
 from core.serializers import ProfileSerializer
-from goals.models import GoalCategory, GoalComments, Goal, Board, BoardParticipant
+from goals import events
+from goals.board_access import WRITE_ROLES, has_board_access, reset_board_roles
+from goals.models import ArchiveJob, GoalCategory, GoalComments, Goal, Board, BoardParticipant
+from goals.signals import boards_changed
 
 
 class GoalCreateCategorySerializer(serializers.ModelSerializer):
@@ -16,11 +20,7 @@ class GoalCreateCategorySerializer(serializers.ModelSerializer):
     def validate_board(self, board: Board) -> Board:
         if board.is_deleted:
             raise ValidationError('Board not exists')
-        if not BoardParticipant.objects.filter(
-            board_id=board.id,
-            user_id=self.context['request'].user.id,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ).exists():
+        if not has_board_access(self.context['request'], board.id, WRITE_ROLES):
             raise PermissionDenied
         return board
 
@@ -51,18 +51,14 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         """
         if category.is_deleted:
             raise ValidationError('Category not exists')
-        if not BoardParticipant.objects.filter(
-            board_id=category.board.id,
-            user_id=self.context['request'].user.id,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ).exists():
+        if not has_board_access(self.context['request'], category.board_id, WRITE_ROLES):
             raise PermissionDenied
         return category
 
     class Meta:
         model = Goal
         read_only_fields = ("id", "created", "updated", "user")
-        fields = "__all__"
+        exclude = ("search_vector", "board")
 
 
 class GoalSerializer(GoalCreateSerializer):
@@ -72,11 +68,116 @@ class GoalSerializer(GoalCreateSerializer):
     user = ProfileSerializer(read_only=True)
 
 
+class CategoryIdField(serializers.PrimaryKeyRelatedField):
+    """
+    Категория по id. При записи возвращает сам id, категории загружаются одним запросом в GoalBulkListSerializer
+    """
+    def to_internal_value(self, data) -> int:
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class GoalBulkListSerializer(serializers.ListSerializer):
+    """
+    Пакетное создание и изменение целей.
+    Категории и изменяемые цели (из queryset, переданного как instance) загружаются одним запросом каждые,
+    права на доски проверяются по ролям пользователя, загруженным один раз на запрос.
+    Ошибки возвращаются по каждому элементу, при любой ошибке ничего не записывается.
+    Запись - один bulk_create или bulk_update в транзакции
+    """
+    def to_internal_value(self, data) -> list[dict]:
+        items = [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+        category_ids = {str(item.get('category')) for item in items}
+        self.categories = GoalCategory.objects.filter(
+            id__in=[int(category_id) for category_id in category_ids if category_id.isdigit()], is_deleted=False
+        ).in_bulk()
+        self.goals = {}
+        if self.instance is not None:
+            # id приводятся так же, как при проверке элемента ("5" - это 5, true - ошибка)
+            id_field, goal_ids = self.child.fields['id'], set()
+            for item in items:
+                try:
+                    goal_ids.add(id_field.to_internal_value(item.get('id')))
+                except ValidationError:
+                    pass
+            self.goals = self.instance.filter(id__in=goal_ids).in_bulk()
+        return super().to_internal_value(data)
+
+    def create(self, validated_data: list[dict]) -> list[Goal]:
+        now = timezone.now()
+        with transaction.atomic():
+            goals = Goal.objects.bulk_create([
+                Goal(**{**item, 'id': None}, created=now, updated=now) for item in validated_data
+            ])
+            boards_changed.send(sender=Goal, board_ids={goal.category.board_id for goal in goals})
+        return goals
+
+    def update(self, instance, validated_data: list[dict]) -> list[Goal]:
+        now = timezone.now()
+        goals, fields, board_ids = {}, {'updated'}, set()
+        for item in validated_data:
+            goal = goals.setdefault(item['goal'].id, item.pop('goal'))
+            item.pop('id')
+            item.pop('user', None)
+            # Версии меняются и у прежней доски цели, и у новой, если цель перенесена в другую категорию
+            board_ids.add(goal.category.board_id)
+            for attr, value in item.items():
+                setattr(goal, attr, value)
+            goal.updated = now
+            fields.update(item)
+            board_ids.add(goal.category.board_id)
+
+        with transaction.atomic():
+            Goal.objects.bulk_update(goals.values(), fields)
+            boards_changed.send(sender=Goal, board_ids=board_ids)
+        return list(goals.values())
+
+
+class GoalBulkSerializer(GoalCreateSerializer):
+    """
+    Элемент пакетного запроса целей. Для изменения обязателен id
+    """
+    id = serializers.IntegerField(required=False)
+    category = CategoryIdField(queryset=GoalCategory.objects.all())
+
+    def validate_category(self, category_id: int) -> GoalCategory:
+        category = self.parent.categories.get(category_id)
+        if category is None:
+            raise ValidationError('Category not exists')
+        if not has_board_access(self.context['request'], category.board_id, WRITE_ROLES):
+            raise ValidationError(PermissionDenied.default_detail)
+        return category
+
+    def validate_id(self, goal_id: int) -> int:
+        if self.parent.instance is None:
+            return goal_id
+        goal = self.parent.goals.get(goal_id)
+        if goal is None:
+            raise ValidationError('Goal not exists')
+        if not has_board_access(self.context['request'], goal.category.board_id, WRITE_ROLES):
+            raise ValidationError(PermissionDenied.default_detail)
+        return goal_id
+
+    def validate(self, attrs: dict) -> dict:
+        if self.parent.instance is not None:
+            if 'id' not in attrs:
+                raise ValidationError({'id': self.fields['id'].error_messages['required']})
+            attrs['goal'] = self.parent.goals[attrs['id']]
+        return attrs
+
+    class Meta(GoalCreateSerializer.Meta):
+        read_only_fields = ("created", "updated", "user")
+        list_serializer_class = GoalBulkListSerializer
+
+
 class GoalCommentCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор создания комментариев
     """
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    goal = serializers.PrimaryKeyRelatedField(queryset=Goal.objects.select_related('category'))
 
     def validate_goal(self, goal: Goal) -> Goal:
         """
@@ -86,18 +187,14 @@ class GoalCommentCreateSerializer(serializers.ModelSerializer):
         """
         if goal.status == Goal.Status.archived:
             raise ValidationError('Goal not exists')
-        if not BoardParticipant.objects.filter(
-            board_id=goal.category.board.id,
-            user_id=self.context['request'].user.id,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ).exists():
+        if not has_board_access(self.context['request'], goal.category.board_id, WRITE_ROLES):
             raise PermissionDenied
         return goal
 
     class Meta:
         model = GoalComments
         read_only_fields = ("id", "created", "updated", "user")
-        fields = "__all__"
+        exclude = ("search_vector", "board")
 
 
 class GoalCommentSerializer(GoalCommentCreateSerializer):
@@ -130,17 +227,63 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         return board
 
 
+class UsernameField(serializers.SlugRelatedField):
+    """
+    Пользователь по username. При записи возвращает сам username,
+    пользователи загружаются одним запросом в BoardParticipantListSerializer
+    """
+    def to_internal_value(self, data) -> str:
+        if not isinstance(data, str) or not data:
+            self.fail('invalid')
+        return data
+
+
+class BoardParticipantListSerializer(serializers.ListSerializer):
+    """
+    Список участников доски. Все username проверяются одним запросом
+    """
+    def to_internal_value(self, data) -> list[dict]:
+        participants = super().to_internal_value(data)
+
+        usernames = {part['user'] for part in participants}
+        users = {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+        errors = []
+        for part in participants:
+            if part['user'] in users:
+                part['user'] = users[part['user']]
+                errors.append({})
+            else:
+                message = self.child.fields['user'].error_messages['does_not_exist']
+                errors.append({'user': [message.format(slug_name='username', value=part['user'])]})
+        if any(errors):
+            raise ValidationError(errors)
+
+        return participants
+
+    def to_representation(self, data) -> list[dict]:
+        """
+        Если участники не были загружены заранее (например, после обновления доски),
+        пользователи подгружаются тем же запросом
+        """
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        if isinstance(iterable, models.QuerySet) and iterable._result_cache is None:
+            iterable = iterable.select_related('user')
+        return super().to_representation(iterable)
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     """
     Сериализатор доски для участников
     """
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.editable_choices)
-    user = serializers.SlugRelatedField(slug_field="username", queryset=User.objects.all())
+    user = UsernameField(slug_field="username", queryset=User.objects.all())
 
     class Meta:
         model = BoardParticipant
         fields = "__all__"
         read_only_fields = ("id", "created", "updated", "board")
+        list_serializer_class = BoardParticipantListSerializer
 
 
 class BoardSerializer(serializers.ModelSerializer):
@@ -159,37 +302,72 @@ class BoardSerializer(serializers.ModelSerializer):
         """
         Сложная логика для обновления доски.
         Позволяет добавлять новых участников или выдавать права уже существующим,
-        не затрагивая старых участников
+        не затрагивая старых участников.
+        Участники синхронизируются пачкой: bulk_create новых, bulk_update измененных ролей
+        и один delete для удаленных. Владелец (текущий пользователь) не изменяется
         """
         owner = validated_data.pop("user")
-        new_participants = validated_data.pop("participants")
-        new_by_id = {part["user"].id: part for part in new_participants}
-
-        old_participants = instance.participants.exclude(user=owner)
+        new_by_id = {part["user"].id: part for part in validated_data.pop("participants")}
+        new_by_id.pop(owner.id, None)
+        now = timezone.now()
 
         with transaction.atomic():
+            old_participants = BoardParticipant.objects.filter(board=instance).exclude(user=owner).only(
+                "id", "user_id", "role"
+            )
+
+            to_delete, to_update = [], []
             for old_participant in old_participants:
-                if old_participant.user_id not in new_by_id:
-                    old_participant.delete()
-                else:
-                    if old_participant.role != new_by_id[old_participant.user_id]["role"]:
-                        old_participant.role = new_by_id[old_participant.user_id]["role"]
-                        old_participant.save()
-                    new_by_id.pop(old_participant.user_id)
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(board=instance, user=new_part["user"], role=new_part["role"])
+                new_part = new_by_id.pop(old_participant.user_id, None)
+                if new_part is None:
+                    to_delete.append(old_participant.id)
+                elif old_participant.role != new_part["role"]:
+                    old_participant.role = new_part["role"]
+                    old_participant.updated = now
+                    to_update.append(old_participant)
+
+            if to_delete:
+                BoardParticipant.objects.filter(id__in=to_delete).delete()
+            if to_update:
+                BoardParticipant.objects.bulk_update(to_update, ["role", "updated"])
+            added = []
+            if new_by_id:
+                added = BoardParticipant.objects.bulk_create([
+                    BoardParticipant(board=instance, user=part["user"], role=part["role"], created=now, updated=now)
+                    for part in new_by_id.values()
+                ])
+            # bulk_create и bulk_update не отправляют post_save, поэтому события участников отправляются здесь
+            for action, participants in (('added', added), ('updated', to_update)):
+                for participant in participants:
+                    events.publish(f'participant.{action}', [instance.id], participant.id, user=participant.user_id)
 
             if title := validated_data.get('title'):
                 instance.title = title
             instance.save()
 
+        reset_board_roles(self.context['request'])
+
         return instance
 
 
 class BoardListSerializer(serializers.ModelSerializer):
     """
-    Сериализатор отображения всех досок
+    Сериализатор отображения всех досок с количеством участников и ролью текущего пользователя
     """
+    members_count = serializers.IntegerField(read_only=True)
+    role = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Board
         fields = "__all__"
+
+
+class ArchiveJobSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор прогресса фоновой архивации
+    """
+
+    class Meta:
+        model = ArchiveJob
+        fields = ("id", "board", "category", "total", "done", "finished", "created", "updated")
+        read_only_fields = fields
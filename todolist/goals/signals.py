@@ -0,0 +1,109 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from core.models import User
+from core.serializers import ProfileSerializer
+from goals import events
+from goals.cache import bump_board_versions
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComments
+
+# Массовые изменения (bulk_create, bulk_update), для которых Django не отправляет post_save.
+# Аргумент board_ids - затронутые доски
+boards_changed = Signal()
+
+
+def _action(signal: Signal, created: bool = False, archived: bool = False) -> str:
+    """
+    Действие для события доски: created, updated, archived (архивная цель, удаленные доска или категория)
+    или deleted (удаление строки)
+    """
+    if signal is post_delete:
+        return 'deleted'
+    if archived:
+        return 'archived'
+    return 'created' if created else 'updated'
+
+
+@receiver([post_save, post_delete], sender=Board)
+def board_changed(sender, instance: Board, signal: Signal, created: bool = False, **kwargs) -> None:
+    """
+    Изменения досок и их содержимого меняют версию доски для кеша списков.
+    Массовые queryset.update() в perform_destroy выполняются в одной транзакции с save() доски или категории,
+    поэтому их покрывает повторная смена версии после коммита
+    """
+    bump_board_versions([instance.pk])
+    events.publish(f'board.{_action(signal, created, instance.is_deleted)}', [instance.pk], instance.pk)
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def participant_changed(sender, instance: BoardParticipant, signal: Signal, created: bool = False, **kwargs) -> None:
+    bump_board_versions([instance.board_id])
+    action = {'created': 'added', 'updated': 'updated', 'deleted': 'removed'}[_action(signal, created)]
+    events.publish(f'participant.{action}', [instance.board_id], instance.pk, user=instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=GoalCategory)
+def category_changed(sender, instance: GoalCategory, signal: Signal, created: bool = False, **kwargs) -> None:
+    bump_board_versions([instance.board_id])
+    events.publish(f'category.{_action(signal, created, instance.is_deleted)}', [instance.board_id], instance.pk)
+
+
+@receiver(pre_save, sender=Goal)
+def goal_board(sender, instance: Goal, **kwargs) -> None:
+    """
+    Запоминает доску, на которой цель была до сохранения, и выставляет доску ее категории (как триггер в базе),
+    чтобы при переносе цели на другую доску обработчики post_save затронули обе доски
+    """
+    instance._previous_board_id = instance.board_id
+    instance.board_id = GoalCategory.objects.filter(pk=instance.category_id).values_list('board_id', flat=True).first()
+
+
+def goal_board_ids(goal: Goal) -> set[int]:
+    """
+    Доски, которых касается изменение цели: текущая и прежняя, если цель перенесли
+    """
+    return {board_id for board_id in (goal.board_id, getattr(goal, '_previous_board_id', None)) if board_id}
+
+
+@receiver([post_save, post_delete], sender=Goal)
+def goal_changed(sender, instance: Goal, signal: Signal, created: bool = False, **kwargs) -> None:
+    board_ids = goal_board_ids(instance)
+    bump_board_versions(board_ids)
+    archived = instance.status == Goal.Status.archived
+    events.publish(f'goal.{_action(signal, created, archived)}', [instance.board_id], instance.pk)
+    # Подписчики прежней доски узнают, что цель (вместе с комментариями) ушла с нее
+    if signal is post_save and len(board_ids) > 1:
+        events.publish('goal.moved', board_ids - {instance.board_id}, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=GoalComments)
+def comment_changed(sender, instance: GoalComments, signal: Signal, created: bool = False, **kwargs) -> None:
+    board_ids = list(GoalCategory.objects.filter(goal=instance.goal_id).values_list('board_id', flat=True))
+    bump_board_versions(board_ids)
+    events.publish(f'comment.{_action(signal, created)}', board_ids, instance.pk)
+
+
+@receiver(boards_changed)
+def boards_bulk_changed(sender, board_ids, **kwargs) -> None:
+    """
+    О массовых изменениях подписчики узнают одним событием board.changed: клиент перечитывает списки доски
+    """
+    bump_board_versions(board_ids)
+    events.publish('board.changed', board_ids, source=sender._meta.model_name)
+
+
+@receiver(post_save, sender=User)
+def profile_changed(sender, instance: User, created: bool, update_fields=None, **kwargs) -> None:
+    """
+    Профиль входит в ответы целей, категорий, комментариев и досок: его изменение меняет версии досок,
+    где пользователь автор или участник (кеш и ETag списков). ETag детальных ответов учитывает поля профиля сам.
+    Сохранения без полей профиля (last_login при входе) пропускаются
+    """
+    if created or update_fields is not None and not set(update_fields) & set(ProfileSerializer.Meta.fields):
+        return
+    bump_board_versions(
+        BoardParticipant.objects.filter(user=instance).values_list('board_id', flat=True)
+        .union(GoalCategory.objects.filter(user=instance).values_list('board_id', flat=True))
+        .union(Goal.objects.filter(user=instance).values_list('board_id', flat=True))
+        .union(GoalComments.objects.filter(user=instance).values_list('board_id', flat=True))
+    )
@@ -0,0 +1,48 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from goals.models import BoardParticipant, Goal, GoalCounter
+
+
+def members_count() -> Coalesce:
+    """
+    Выражение для annotate досок: количество участников одним подзапросом
+    """
+    members = BoardParticipant.objects.filter(board=OuterRef('pk')).order_by().values('board').annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(Subquery(members, output_field=IntegerField()), 0)
+
+
+def board_stats(board_id: int, use_counters: bool = True) -> dict:
+    """
+    Количество целей доски по статусам, приоритетам и категориям (удаленные категории не учитываются).
+    Строится из одной выборки, сгруппированной по (категория, статус, приоритет):
+    при use_counters - из строк GoalCounter, которые поддерживает триггер, и тогда стоимость
+    не зависит от количества целей; иначе - группировкой самих целей
+    """
+    fields = ('category_id', 'category__title', 'status', 'priority', 'count')
+    if use_counters:
+        rows = GoalCounter.objects.filter(
+            category__board_id=board_id, category__is_deleted=False, count__gt=0
+        ).values_list(*fields)
+    else:
+        rows = Goal.objects.filter(
+            category__board_id=board_id, category__is_deleted=False
+        ).order_by().values(*fields[:-1]).annotate(count=Count('pk')).values_list(*fields)
+
+    by_status = dict.fromkeys(Goal.Status.values, 0)
+    by_priority = dict.fromkeys(Goal.Priority.values, 0)
+    by_category = {}
+    for category_id, title, status, priority, count in rows:
+        by_status[status] += count
+        by_priority[priority] += count
+        category = by_category.setdefault(category_id, {'id': category_id, 'title': title, 'goals': 0})
+        category['goals'] += count
+
+    return {
+        'goals': sum(by_status.values()),
+        'by_status': by_status,
+        'by_priority': by_priority,
+        'by_category': sorted(by_category.values(), key=lambda category: (category['title'], category['id'])),
+    }
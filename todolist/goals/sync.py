@@ -0,0 +1,139 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models import User
+from core.row_plan import RowPlan
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComments, Tombstone
+from goals.serializers import BoardCreateSerializer, GoalCategorySerializer, GoalCommentSerializer, GoalSerializer
+
+# Изменения перечитываются с запасом: транзакция могла взять дату обновления до прошлой синхронизации,
+# а зафиксироваться после нее. Повторно присланные объекты клиент просто перезаписывает
+CURSOR_OVERLAP = timedelta(seconds=30)
+
+# Ключ ответа для каждого типа объектов
+KEYS = {
+    Tombstone.Kind.board: 'boards',
+    Tombstone.Kind.category: 'categories',
+    Tombstone.Kind.goal: 'goals',
+    Tombstone.Kind.comment: 'comments',
+}
+
+
+def encode_cursor(moment: datetime) -> str:
+    return urlsafe_b64encode(json.dumps([moment.isoformat()]).encode('ascii')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> datetime:
+    """
+    Момент синхронизации из курсора. Для некорректного курсора - ValueError
+    """
+    try:
+        moment = parse_datetime(json.loads(urlsafe_b64decode(cursor.encode('ascii')))[0])
+    except (TypeError, ValueError, IndexError, UnicodeError):
+        raise ValueError('invalid cursor')
+    if moment is None or timezone.is_naive(moment):
+        raise ValueError('invalid cursor')
+    return moment
+
+
+def _changed(queryset: QuerySet, new_boards: set[int], old_boards: set[int], after: datetime | None) -> QuerySet:
+    """
+    Объекты досок new_boards целиком и объекты досок old_boards, измененные после after.
+    Второе условие выбирается по индексу (board, updated), поэтому стоимость зависит от количества изменений
+    """
+    condition = Q(board_id__in=new_boards)
+    if after is not None and old_boards:
+        condition |= Q(board_id__in=old_boards, updated__gt=after)
+    return queryset.filter(condition).order_by('pk')
+
+
+def sync_changes(user: User, since: datetime | None) -> dict:
+    """
+    Изменения досок, категорий, целей и комментариев пользователя после момента since
+    и удаления (deleted): удаленные доски и категории, архивные цели, цели удаленных категорий,
+    удаленные комментарии и объекты, перенесенные на другую доску, а также доски, из которых пользователь исключен.
+    Без since или с устаревшим since (старше SYNC_TOMBSTONE_DAYS) возвращается полный снимок (full),
+    и клиент заменяет им свои данные. Доски, в которые пользователь добавлен после since, приходят целиком.
+    Объект в deleted не повторяется среди измененных; цели и комментарии удаленных категорий и досок
+    клиент удаляет сам
+    """
+    now = timezone.now()
+    full = since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    after = None if full else since - CURSOR_OVERLAP
+
+    # Доски пользователя одним запросом: роль, дата добавления и состояние самой доски
+    roles, new_boards, old_boards, changed_boards, deleted_boards = {}, set(), set(), set(), set()
+    participants = BoardParticipant.objects.filter(user=user).values_list(
+        'board_id', 'role', 'created', 'updated', 'board__is_deleted', 'board__updated'
+    )
+    for board_id, role, created, updated, board_deleted, board_updated in participants:
+        board_changed = after is None or board_updated > after
+        if board_deleted:
+            if board_changed and not full:
+                deleted_boards.add(board_id)
+            continue
+        roles[board_id] = role
+        if after is None or created > after:
+            new_boards.add(board_id)
+        else:
+            old_boards.add(board_id)
+        if board_changed or updated > after:
+            changed_boards.add(board_id)
+
+    deleted = {key: set() for key in KEYS.values()}
+    deleted['boards'] = deleted_boards
+
+    plan = RowPlan.for_serializer(BoardCreateSerializer)
+    boards = plan.rows(plan.values(Board.objects.filter(id__in=changed_boards).order_by('pk')))
+    for board in boards:
+        board['role'] = roles[board['id']]
+
+    plan = RowPlan.for_serializer(GoalCategorySerializer)
+    categories = []
+    # В полном снимке удаления не нужны, удаленные и архивные объекты отсекаются в запросе
+    queryset = GoalCategory.objects.filter(is_deleted=False) if full else GoalCategory.objects
+    for row in plan.values(_changed(queryset, new_boards, old_boards, after)):
+        if not row['is_deleted']:
+            categories.append(plan.row(row))
+        elif not full:
+            deleted['categories'].add(row['id'])
+
+    plan = RowPlan.for_serializer(GoalSerializer)
+    goals = []
+    queryset = Goal.objects.annotate(category_deleted=F('category__is_deleted'))
+    if full:
+        queryset = queryset.filter(category__is_deleted=False).exclude(status=Goal.Status.archived)
+    for row in plan.values(_changed(queryset, new_boards, old_boards, after)):
+        if row['status'] != Goal.Status.archived and not row['category_deleted']:
+            goals.append(plan.row(row))
+        elif not full:
+            deleted['goals'].add(row['id'])
+
+    plan = RowPlan.for_serializer(GoalCommentSerializer)
+    comments = plan.rows(plan.values(_changed(GoalComments.objects, new_boards, old_boards, after)))
+
+    if not full:
+        tombstones = Tombstone.objects.filter(
+            Q(board_id__in=old_boards, user__isnull=True) | Q(user=user, kind=Tombstone.Kind.board),
+            created__gt=after,
+        ).values_list('kind', 'object_id')
+        for kind, object_id in tombstones:
+            deleted[KEYS[kind]].add(object_id)
+
+    changed = {'boards': boards, 'categories': categories, 'goals': goals, 'comments': comments}
+    for name, rows in changed.items():
+        # Объект мог вернуться на доску пользователя (или пользователь - в доску) после удаления
+        deleted[name] -= {row['id'] for row in rows}
+
+    return {
+        'cursor': encode_cursor(now),
+        'full': full,
+        **changed,
+        'deleted': {name: sorted(ids) for name, ids in deleted.items()},
+    }
@@ -1,27 +1,50 @@
 from django.urls import path
 
+from core.async_views import select_view
 from goals.apps import GoalsConfig
-from goals.views.board import BoardCreateView, BoardListView, BoardView
-from goals.views.category import GoalCategoryListView, GoalCategoryCreateView, GoalCategoryView
-from goals.views.comment import GoalCommentDetailView, GoalCommentListView, GoalCommentCreateView
-from goals.views.goals import GoalListView, GoalCreateView, GoalDetailView
+from goals.views.archive import ArchiveJobView
+from goals.views.board import (
+    AsyncBoardListView, AsyncBoardView, BoardCreateView, BoardListView, BoardStatsView, BoardView
+)
+from goals.views.category import (
+    AsyncGoalCategoryListView, AsyncGoalCategoryView, GoalCategoryListView, GoalCategoryCreateView, GoalCategoryView
+)
+from goals.views.comment import (
+    AsyncGoalCommentDetailView, AsyncGoalCommentListView, GoalCommentDetailView, GoalCommentListView,
+    GoalCommentCreateView,
+)
+from goals.views.events import AsyncBoardEventsView, BoardEventsView
+from goals.views.goals import (
+    AsyncGoalDetailView, AsyncGoalListView, GoalBulkView, GoalListView, GoalCreateView, GoalDetailView
+)
+from goals.views.sync import SyncView
 
 app_name = GoalsConfig.name
 
 urlpatterns = [
     path("board/create", BoardCreateView.as_view(), name='board-create'),
-    path("board/list", BoardListView.as_view(), name='board-list'),
-    path("board/<int:pk>", BoardView.as_view(), name='board-details'),
+    path("board/list", select_view(BoardListView, AsyncBoardListView), name='board-list'),
+    path("board/<int:pk>", select_view(BoardView, AsyncBoardView), name='board-details'),
+    path("board/<int:pk>/stats", BoardStatsView.as_view(), name='board-stats'),
+    path("board/<int:pk>/events", select_view(BoardEventsView, AsyncBoardEventsView), name='board-events'),
 
     path("goal_category/create", GoalCategoryCreateView.as_view(), name='create-category'),
-    path("goal_category/list", GoalCategoryListView.as_view(), name='categories-list'),
-    path("goal_category/<int:pk>", GoalCategoryView.as_view(), name='category-details'),
+    path("goal_category/list", select_view(GoalCategoryListView, AsyncGoalCategoryListView), name='categories-list'),
+    path("goal_category/<int:pk>", select_view(GoalCategoryView, AsyncGoalCategoryView), name='category-details'),
 
     path("goal/create", GoalCreateView.as_view(), name='create-goal'),
-    path("goal/list", GoalListView.as_view(), name='goal-list'),
-    path("goal/<int:pk>", GoalDetailView.as_view(), name='goal-detail'),
+    path("goal/bulk", GoalBulkView.as_view(), name='goal-bulk'),
+    path("goal/list", select_view(GoalListView, AsyncGoalListView), name='goal-list'),
+    path("goal/<int:pk>", select_view(GoalDetailView, AsyncGoalDetailView), name='goal-detail'),
 
     path("goal_comment/create", GoalCommentCreateView.as_view(), name='create-comment'),
-    path("goal_comment/list", GoalCommentListView.as_view(), name='comments-list'),
-    path("goal_comment/<int:pk>", GoalCommentDetailView.as_view(), name='comment-detail'),
+    path("goal_comment/list", select_view(GoalCommentListView, AsyncGoalCommentListView), name='comments-list'),
+    path(
+        "goal_comment/<int:pk>",
+        select_view(GoalCommentDetailView, AsyncGoalCommentDetailView),
+        name='comment-detail',
+    ),
+
+    path("archive/<int:pk>", ArchiveJobView.as_view(), name='archive-job'),
+    path("sync", SyncView.as_view(), name='sync'),
 ]
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import permissions, status
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from goals.archive import schedule_archive
+from goals.models import ArchiveJob
+from goals.serializers import ArchiveJobSerializer
+
+
+class BackgroundArchiveMixin:
+    """
+    Удаление доски или категории с фоновой архивацией целей (settings.GOALS_ARCHIVE_IN_BACKGROUND).
+    Объект помечается удаленным сразу, ответ 202 содержит задачу архивации и ссылку на ее прогресс.
+    Без настройки удаление архивирует все цели в одной транзакции (perform_destroy)
+    """
+
+    def destroy(self, request: Request, *args, **kwargs) -> Response:
+        if not settings.GOALS_ARCHIVE_IN_BACKGROUND:
+            return super().destroy(request, *args, **kwargs)
+        job = schedule_archive(self.get_object(), request.user)
+        return Response(
+            ArchiveJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse('goals:archive-job', kwargs={'pk': job.pk})},
+        )
+
+
+class ArchiveJobView(RetrieveAPIView):
+    """
+    Прогресс фоновой архивации. Доступен только инициатору удаления
+    """
+    serializer_class = ArchiveJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ArchiveJob.objects.filter(user=self.request.user)
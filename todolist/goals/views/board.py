@@ -1,11 +1,20 @@
 from django.db import transaction
+from django.db.models import F, Prefetch, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import permissions, filters
-from rest_framework.generics import RetrieveUpdateDestroyAPIView, CreateAPIView, ListAPIView
+from rest_framework.generics import RetrieveUpdateDestroyAPIView, CreateAPIView, GenericAPIView, ListAPIView
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
 
-from goals.models import Board, Goal
+from core.models import User
+from goals.cache import AsyncCachedListMixin, CachedListMixin
+from goals.conditional import AsyncConditionalDetailMixin, ConditionalDetailMixin
+from goals.models import Board, BoardParticipant, Goal
 from goals.permission_classes import BoardPermissions
 from goals.serializers import BoardSerializer, BoardCreateSerializer, BoardListSerializer
+from goals.stats import board_stats, members_count
+from goals.views.archive import BackgroundArchiveMixin
 
 
 class BoardCreateView(CreateAPIView):
@@ -16,7 +25,7 @@ class BoardCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class BoardListView(ListAPIView):
+class BoardListView(CachedListMixin, ListAPIView):
     """
     Представление для отображения всех досок
     """
@@ -28,12 +37,15 @@ class BoardListView(ListAPIView):
 
     def get_queryset(self):
         """
-        Фильтрация ответа идет через фильтр participants__user
+        Фильтрация ответа идет через фильтр participants__user.
+        Количество участников и роль пользователя добавляются в тот же запрос
         """
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.filter(participants__user=self.request.user, is_deleted=False).annotate(
+            members_count=members_count(), role=F('participants__role')
+        )
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(BackgroundArchiveMixin, ConditionalDetailMixin, RetrieveUpdateDestroyAPIView):
     """
     Представление для детального просмотра, изменения
     и удаления(архивации) доски
@@ -45,9 +57,24 @@ class BoardView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """
-        Фильтрация ответа идет через фильтр participants__user
+        Фильтрация ответа идет через фильтр participants__user.
+        Участники с пользователями загружаются одним дополнительным запросом
         """
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.filter(participants__user=self.request.user, is_deleted=False).prefetch_related(
+            self.participants_prefetch()
+        )
+
+    @staticmethod
+    def participants_prefetch() -> Prefetch:
+        return Prefetch('participants', queryset=BoardParticipant.objects.select_related('user'))
+
+    def get_profiles(self, instance: Board) -> list[User]:
+        """
+        В ответ входят имена всех участников доски. После изменения доски UpdateModelMixin
+        сбрасывает загруженных участников, тогда они загружаются заново
+        """
+        prefetch_related_objects([instance], self.participants_prefetch())
+        return [participant.user for participant in instance.participants.all()]
 
     def perform_destroy(self, instance: Board):
         """
@@ -56,6 +83,41 @@ class BoardView(RetrieveUpdateDestroyAPIView):
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(status=Goal.Status.archived)
+            now = timezone.now()
+            instance.categories.update(is_deleted=True, updated=now)
+            instance.goals.update(status=Goal.Status.archived, updated=now)
         return instance
+
+
+class AsyncBoardListView(AsyncCachedListMixin, BoardListView):
+    """
+    BoardListView для ASGI
+    """
+
+
+class AsyncBoardView(AsyncConditionalDetailMixin, BoardView):
+    """
+    BoardView для ASGI: чтение через async ORM, изменение и удаление в потоке
+    """
+
+
+class BoardStatsView(GenericAPIView):
+    """
+    Статистика доски: количество участников и целей по статусам, приоритетам и категориям.
+    При use_counters = True цели не подсчитываются, а читаются из счетчиков GoalCounter
+    """
+    permission_classes = [permissions.IsAuthenticated, BoardPermissions]
+    use_counters = True
+
+    def get_queryset(self):
+        return Board.objects.filter(participants__user=self.request.user, is_deleted=False).annotate(
+            members_count=members_count()
+        )
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        board = self.get_object()
+        return Response({
+            'id': board.id,
+            'members_count': board.members_count,
+            **board_stats(board.id, self.use_counters),
+        })
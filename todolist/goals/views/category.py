@@ -1,11 +1,16 @@
 from django.db import transaction
+from django.utils import timezone
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework import permissions, filters
-from rest_framework.pagination import LimitOffsetPagination
 
+from core.row_plan import FastListMixin
+from goals.cache import AsyncCachedListMixin, CachedListMixin
+from goals.conditional import AsyncConditionalDetailMixin, ConditionalDetailMixin
 from goals.models import GoalCategory, Goal
+from goals.pagination import KeysetPagination
 from goals.permission_classes import GoalCategoryPermissions
 from goals.serializers import GoalCreateCategorySerializer, GoalCategorySerializer
+from goals.views.archive import BackgroundArchiveMixin
 
 
 class GoalCategoryCreateView(CreateAPIView):
@@ -17,14 +22,14 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class = GoalCreateCategorySerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(FastListMixin, CachedListMixin, ListAPIView):
     """
     Представление для отображения всех категорий
     """
     model = GoalCategory
     permission_classes = [permissions.IsAuthenticated, GoalCategoryPermissions]
     serializer_class = GoalCategorySerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     filter_backends = [
         filters.OrderingFilter,
         filters.SearchFilter,
@@ -37,13 +42,13 @@ class GoalCategoryListView(ListAPIView):
         """
         Ответ фильтруется по списку участников
         """
-        return GoalCategory.objects.filter(
+        return GoalCategory.objects.select_related('user').filter(
             board__participants__user=self.request.user,
             is_deleted=False,
         )
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(BackgroundArchiveMixin, ConditionalDetailMixin, RetrieveUpdateDestroyAPIView):
     """
     Представление для детального просмотра, обновления и удаления категории
     """
@@ -55,7 +60,7 @@ class GoalCategoryView(RetrieveUpdateDestroyAPIView):
         """
         Удаленные категории не отображаются
         """
-        return GoalCategory.objects.filter(is_deleted=False)
+        return GoalCategory.objects.select_related('user').filter(is_deleted=False)
 
     def perform_destroy(self, instance: GoalCategory):
         """
@@ -65,5 +70,17 @@ class GoalCategoryView(RetrieveUpdateDestroyAPIView):
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            instance.goal_set.update(status=Goal.Status.archived)
+            instance.goal_set.update(status=Goal.Status.archived, updated=timezone.now())
             return instance
+
+
+class AsyncGoalCategoryListView(AsyncCachedListMixin, GoalCategoryListView):
+    """
+    GoalCategoryListView для ASGI
+    """
+
+
+class AsyncGoalCategoryView(AsyncConditionalDetailMixin, GoalCategoryView):
+    """
+    GoalCategoryView для ASGI: чтение через async ORM, изменение и удаление в потоке
+    """
@@ -2,7 +2,13 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, filters
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
 
+from core.row_plan import FastListMixin
+from core.streaming import AsyncStreamingListMixin, StreamingListMixin
+from goals.board_access import get_board_roles
+from goals.cache import AsyncCachedListMixin, CachedListMixin
+from goals.conditional import AsyncConditionalDetailMixin, ConditionalDetailMixin
 from goals.models import GoalComments
+from goals.pagination import KeysetPagination
 from goals.permission_classes import GoalCommentPermissions
 from goals.serializers import GoalCommentCreateSerializer, GoalCommentSerializer
 
@@ -16,27 +22,29 @@ class GoalCommentCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GoalCommentListView(ListAPIView):
+class GoalCommentListView(FastListMixin, StreamingListMixin, CachedListMixin, ListAPIView):
     """
     Представление для отображения всех комментариев
     Сортируется по дате создания от новых к старым
+    С ?stream=true весь список отдается потоком без постраничного вывода
     """
     serializer_class = GoalCommentSerializer
     permission_classes = [permissions.IsAuthenticated, GoalCommentPermissions]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['goal']
     ordering = ['-created']
 
     def get_queryset(self):
         """
-        Фильтрация по списку участников
+        Фильтрация по доскам пользователя (поле board комментария, роли уже загружены для ключа кеша)
         """
-        return GoalComments.objects.filter(
-            goal__category__board__participants__user=self.request.user
+        return GoalComments.objects.select_related('user').defer('search_vector').filter(
+            board_id__in=list(get_board_roles(self.request))
         )
 
 
-class GoalCommentDetailView(RetrieveUpdateDestroyAPIView):
+class GoalCommentDetailView(ConditionalDetailMixin, RetrieveUpdateDestroyAPIView):
     """
     Представление для детального отображения, обновления и удаления комментариев
     """
@@ -45,8 +53,18 @@ class GoalCommentDetailView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """
-        Фильтрация по списку участников
+        Фильтрация по списку участников доски комментария (поле board, без join через цель и категорию)
         """
-        return GoalComments.objects.select_relatied('user').filter(
-            goal__category__board__participants__user=self.request.user
-        )
+        return GoalComments.objects.select_related('user').filter(board__participants__user=self.request.user)
+
+
+class AsyncGoalCommentListView(AsyncStreamingListMixin, AsyncCachedListMixin, GoalCommentListView):
+    """
+    GoalCommentListView для ASGI
+    """
+
+
+class AsyncGoalCommentDetailView(AsyncConditionalDetailMixin, GoalCommentDetailView):
+    """
+    GoalCommentDetailView для ASGI: чтение через async ORM, изменение и удаление в потоке
+    """
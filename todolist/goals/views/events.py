@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+
+from core.async_views import AsyncAPIViewMixin
+from core.renderers import EventStreamRenderer, ORJSONRenderer
+from goals.events import Subscription, broadcaster, get_event_backend
+from goals.models import Board
+
+
+class EventsUnavailable(APIException):
+    status_code = 501
+    default_detail = 'Поток событий доступен только при развертывании под ASGI.'
+    default_code = 'events_unavailable'
+
+
+class BoardEventsView(GenericAPIView):
+    """
+    Поток событий доски (Server-Sent Events) для ее участников: создание, изменение, архивация и удаление
+    целей, категорий, комментариев и участников после коммита транзакции, перенос цели на другую доску
+    (goal.moved на прежней доске). Событие содержит тип, доску и id объекта, сами данные клиент получает
+    через goals/sync, с которого начинает и после каждого переподключения.
+    Пока событий нет, раз в heartbeat секунд отправляется комментарий, чтобы прокси не закрывали соединение.
+    Поток закрывается после resync (клиент не успевал читать), архивации доски, исключения пользователя
+    и через lifetime секунд: Django 4.2 не замечает отключения клиента во время потоковой отдачи,
+    поэтому поток не должен жить бесконечно. EventSource переподключается сам через retry миллисекунд.
+    Подписка держит соединение открытым, под WSGI она занимала бы поток воркера на все это время,
+    поэтому поток отдает только AsyncBoardEventsView (ASYNC_VIEWS), а синхронная версия отвечает 501
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+    heartbeat: float = 15
+    lifetime: float = 5 * 60
+    retry: int = 3000
+
+    def check_board(self, board_id: int) -> None:
+        if not Board.objects.filter(id=board_id, is_deleted=False, participants__user=self.request.user).exists():
+            raise NotFound
+
+    def subscribe(self, board_id: int, loop: asyncio.AbstractEventLoop | None = None) -> Subscription:
+        get_event_backend().start()
+        return broadcaster.subscribe(board_id, self.request.user.pk, loop)
+
+    def get(self, request: Request, pk: int, *args, **kwargs) -> StreamingHttpResponse:
+        raise EventsUnavailable
+
+    @staticmethod
+    def stream_response(content: AsyncIterator[bytes]) -> StreamingHttpResponse:
+        response = StreamingHttpResponse(content, content_type=EventStreamRenderer.media_type)
+        response['Cache-Control'] = 'no-cache'
+        # nginx не должен буферизовать поток
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def is_last(subscription: Subscription, event: dict) -> bool:
+        return event['type'] in ('resync', 'board.archived', 'board.deleted') or (
+            event['type'] == 'participant.removed' and event['user'] == subscription.user_id
+        )
+
+    def encode(self, subscription: Subscription, events: list[dict] | None) -> tuple[bytes, bool]:
+        """
+        Часть потока для прочитанных событий (None - heartbeat) и признак закрытия потока
+        """
+        if events is None:
+            return b': heartbeat\n\n', False
+        chunk = []
+        for event in events:
+            chunk.append(EventStreamRenderer.event(event['type'], event))
+            if self.is_last(subscription, event):
+                return b''.join(chunk), True
+        return b''.join(chunk), False
+
+
+class AsyncBoardEventsView(AsyncAPIViewMixin, BoardEventsView):
+    """
+    Поток событий доски под ASGI: ожидание событий не занимает поток воркера
+    """
+
+    async def get(self, request: Request, pk: int, *args, **kwargs) -> StreamingHttpResponse:
+        await sync_to_async(self.check_board)(pk)
+        return self.stream_response(self.astream(self.subscribe(pk, asyncio.get_running_loop())))
+
+    async def astream(self, subscription: Subscription) -> AsyncIterator[bytes]:
+        deadline = time.monotonic() + self.lifetime
+        try:
+            yield b'retry: %d\n\n' % self.retry
+            while (timeout := min(self.heartbeat, deadline - time.monotonic())) > 0:
+                chunk, last = self.encode(subscription, await subscription.aget(timeout))
+                if chunk:
+                    yield chunk
+                if last:
+                    return
+        finally:
+            broadcaster.unsubscribe(subscription)
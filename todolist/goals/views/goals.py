@@ -1,12 +1,18 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework import permissions, filters
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework import permissions, filters, status
+from rest_framework.request import Request
+from rest_framework.response import Response
 
-from goals.filters import GoalDateFilter
+from core.row_plan import FastListMixin
+from core.streaming import AsyncStreamingListMixin, StreamingListMixin
+from goals.cache import AsyncCachedListMixin, CachedListMixin
+from goals.conditional import AsyncConditionalDetailMixin, ConditionalDetailMixin
+from goals.filters import GoalDateFilter, GoalFullTextSearchFilter
 from goals.models import Goal
+from goals.pagination import KeysetPagination
 from goals.permission_classes import GoalPermissions
-from goals.serializers import GoalSerializer, GoalCreateSerializer
+from goals.serializers import GoalBulkSerializer, GoalSerializer, GoalCreateSerializer
 
 
 class GoalCreateView(CreateAPIView):
@@ -18,27 +24,63 @@ class GoalCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GoalListView(ListAPIView):
+class GoalBulkView(GenericAPIView):
+    """
+    Пакетное создание (POST) и изменение (PATCH) целей.
+    Принимает список до max_batch_size целей, при ошибках возвращает их по каждому элементу списка
+    """
+    serializer_class = GoalBulkSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    max_batch_size = 100
+
+    def get_queryset(self):
+        """
+        Изменять можно только активные цели
+        """
+        return Goal.objects.select_related('category', 'user').filter(
+            category__is_deleted=False
+        ).exclude(
+            status=Goal.Status.archived
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, many=True, allow_empty=False, max_length=self.max_batch_size, **kwargs)
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        goals = serializer.save()
+        return Response(GoalSerializer(goals, many=True).data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(self.get_queryset(), data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        goals = serializer.save()
+        return Response(GoalSerializer(goals, many=True).data)
+
+
+class GoalListView(FastListMixin, StreamingListMixin, CachedListMixin, ListAPIView):
     """
     Представление для отображения всех целей.
     Сортируется по названию
-    Поиск происходит по названию и описанию
+    Поиск происходит по названию и описанию (полнотекстовый, с сортировкой по релевантности).
+    С ?search_comments=true в поиск включается текст комментариев
+    С ?stream=true весь список отдается потоком без постраничного вывода
     """
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated, GoalPermissions]
-    pagination_class = LimitOffsetPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, GoalFullTextSearchFilter]
     filterset_class = GoalDateFilter
     ordering_fields = ['title', 'description']
     ordering = ['title']
-    search_fields = ['title', 'description']
 
     def get_queryset(self):
         """
         Ответ фильтруется по списку участников
         Удаленные(архивированные) цели не видны
         """
-        return Goal.objects.filter(
+        return Goal.objects.select_related('user').defer('search_vector').filter(
             category__board__participants__user=self.request.user,
             category__is_deleted=False
         ).exclude(
@@ -46,7 +88,7 @@ class GoalListView(ListAPIView):
         )
 
 
-class GoalDetailView(RetrieveUpdateDestroyAPIView):
+class GoalDetailView(ConditionalDetailMixin, RetrieveUpdateDestroyAPIView):
     """
     Представление для детального просмотра, обновления и удаления(архивации) целей
     """
@@ -57,7 +99,7 @@ class GoalDetailView(RetrieveUpdateDestroyAPIView):
         """
         Удаленные(архивированные) цели не видны
         """
-        return Goal.objects.filter(
+        return Goal.objects.select_related('category', 'user').filter(
             category__is_deleted=False
         ).exclude(
             status=Goal.Status.archived)
@@ -69,3 +111,15 @@ class GoalDetailView(RetrieveUpdateDestroyAPIView):
         """
         instance.status = Goal.Status.archived
         instance.save()
+
+
+class AsyncGoalListView(AsyncStreamingListMixin, AsyncCachedListMixin, GoalListView):
+    """
+    GoalListView для ASGI
+    """
+
+
+class AsyncGoalDetailView(AsyncConditionalDetailMixin, GoalDetailView):
+    """
+    GoalDetailView для ASGI: чтение через async ORM, изменение и удаление в потоке
+    """
@@ -0,0 +1,27 @@
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from core.renderers import ORJSONRenderer
+from goals.sync import decode_cursor, sync_changes
+
+
+class SyncView(GenericAPIView):
+    """
+    Синхронизация клиента: изменения досок, категорий, целей и комментариев после курсора
+    и удаленные объекты. Без курсора - полный снимок. В ответе новый курсор для следующего запроса
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        since = None
+        if cursor := request.query_params.get('cursor'):
+            try:
+                since = decode_cursor(cursor)
+            except ValueError:
+                raise ValidationError({'cursor': 'Invalid cursor'})
+        return Response(sync_changes(request.user, since))
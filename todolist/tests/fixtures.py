@@ -1,6 +1,9 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from bot.tg_users import tg_user_cache
+
 
 @pytest.fixture
 def client() -> APIClient:
@@ -11,3 +14,10 @@ def client() -> APIClient:
 def auto_login_user(client: APIClient, user) -> APIClient:
     client.force_authenticate(user)
     return client
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    cache.clear()
+    tg_user_cache._data.clear()
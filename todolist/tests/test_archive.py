@@ -0,0 +1,79 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from goals.archive import archive_batch
+from goals.models import ArchiveJob, Goal
+
+
+@pytest.mark.django_db
+class TestBackgroundArchive:
+
+    @pytest.fixture(autouse=True)
+    def background(self, settings):
+        settings.GOALS_ARCHIVE_IN_BACKGROUND = True
+
+    @pytest.fixture
+    def goals(self, board_participant, goal_category, goal_category_factory, goal_factory) -> list[Goal]:
+        board_participant.role = 1
+        board_participant.save(update_fields=['role'])
+        other_category = goal_category_factory.create(board=goal_category.board)
+        return [
+            *goal_factory.create_batch(3, category=goal_category, status=1),
+            *goal_factory.create_batch(2, category=other_category, status=2),
+        ]
+
+    def statuses(self) -> list[int]:
+        return list(Goal.objects.order_by('id').values_list('status', flat=True))
+
+    def test_board_delete(self, auto_login_user, board, goals):
+        """
+        Доска и категории помечаются удаленными сразу, цели архивируются воркером пачками
+        """
+        response = auto_login_user.delete(reverse('goals:board-details', kwargs={'pk': board.id}))
+
+        assert response.status_code == 202
+        assert response.data['total'] == 5
+        assert response.data['done'] == 0
+        board.refresh_from_db()
+        assert board.is_deleted
+        assert not board.categories.filter(is_deleted=False).exists()
+        assert self.statuses() == [1, 1, 1, 2, 2]
+
+        job = archive_batch(batch_size=2)
+        assert (job.done, job.finished) == (2, None)
+
+        call_command('archivegoals', batch_size=2, once=True)
+
+        assert self.statuses() == [Goal.Status.archived] * 5
+        progress = auto_login_user.get(response['Location'])
+        assert progress.status_code == 200
+        assert progress.data['done'] == 5
+        assert progress.data['finished'] is not None
+
+    def test_category_delete(self, auto_login_user, goal_category, goals):
+        response = auto_login_user.delete(reverse('goals:category-details', kwargs={'pk': goal_category.id}))
+
+        assert response.status_code == 202
+        assert response.data['category'] == goal_category.id
+        call_command('archivegoals', once=True)
+        assert self.statuses() == [Goal.Status.archived] * 3 + [2, 2]
+
+    def test_resume(self, user, board, goals):
+        """
+        Задача без сохраненной позиции продолжается с неархивированных целей:
+        цели, заархивированные до сбоя, повторно не обрабатываются
+        """
+        job = ArchiveJob.objects.create(user=user, board=board, total=5)
+        Goal.objects.filter(id__in=[goal.id for goal in goals[:2]]).update(status=Goal.Status.archived)
+
+        job = archive_batch(batch_size=10)
+
+        assert job.done == 3
+        assert job.finished is not None
+        assert archive_batch() is None
+
+    def test_progress_only_for_owner(self, client, user_factory, user, board):
+        job = ArchiveJob.objects.create(user=user, board=board)
+        client.force_authenticate(user_factory.create())
+        assert client.get(reverse('goals:archive-job', kwargs={'pk': job.id})).status_code == 404
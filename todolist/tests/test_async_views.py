@@ -0,0 +1,98 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from bot.models import TgUser
+from bot.tg.client import AsyncTgClient
+from bot.views import AsyncVerificationCodeView
+from core.views import AsyncProfileView, ProfileView
+from goals.views.board import AsyncBoardListView, AsyncBoardView, BoardListView, BoardView
+from goals.views.category import AsyncGoalCategoryListView, GoalCategoryListView
+from goals.views.comment import AsyncGoalCommentListView, GoalCommentListView
+from goals.views.goals import AsyncGoalDetailView, AsyncGoalListView, GoalDetailView, GoalListView
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    factory = APIRequestFactory()
+
+    @pytest.fixture
+    def goal(self, board_participant, goal_category, goal_factory, goal_comment_factory):
+        goal_factory.create(category=goal_category, status=1)
+        goal = goal_factory.create(category=goal_category, status=2)
+        goal_comment_factory.create(goal=goal)
+        return goal
+
+    def call(self, view_class, user, method: str = 'get', url: str = '/', data=None, headers=None, **kwargs):
+        request = getattr(self.factory, method)(url, data, format='json', **(headers or {}))
+        force_authenticate(request, user)
+        view = view_class.as_view()
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(request, **kwargs)
+        return response.render() if hasattr(response, 'render') else response
+
+    @pytest.mark.parametrize('view, async_view, url_name, lookup', [
+        (BoardListView, AsyncBoardListView, 'goals:board-list', None),
+        (BoardView, AsyncBoardView, 'goals:board-details', lambda goal: goal.category.board_id),
+        (GoalCategoryListView, AsyncGoalCategoryListView, 'goals:categories-list', None),
+        (GoalListView, AsyncGoalListView, 'goals:goal-list', None),
+        (GoalDetailView, AsyncGoalDetailView, 'goals:goal-detail', lambda goal: goal.id),
+        (GoalCommentListView, AsyncGoalCommentListView, 'goals:comments-list', None),
+        (ProfileView, AsyncProfileView, 'profile', None),
+    ])
+    def test_same_response(self, user, goal, view, async_view, url_name, lookup):
+        """
+        Асинхронная версия отдает тот же ответ и те же заголовки условных запросов
+        """
+        kwargs = {'pk': lookup(goal)} if lookup else {}
+        url = reverse(url_name, kwargs=kwargs)
+
+        expected = self.call(view, user, url=url, **kwargs)
+        response = self.call(async_view, user, url=url, **kwargs)
+
+        assert response.status_code == expected.status_code == 200
+        assert response.content == expected.content
+        assert response.get('ETag') == expected.get('ETag')
+
+    def test_list_not_modified(self, user, goal):
+        url = reverse('goals:goal-list')
+        etag = self.call(AsyncGoalListView, user, url=url)['ETag']
+        response = self.call(AsyncGoalListView, user, url=url, headers={'HTTP_IF_NONE_MATCH': etag})
+        assert response.status_code == 304
+
+    def test_detail_not_participant(self, user_factory, goal):
+        response = self.call(AsyncGoalDetailView, user_factory.create(), pk=goal.id)
+        assert response.status_code == 403
+
+    def test_write_in_thread(self, user, goal, board_participant):
+        """
+        Изменение в асинхронном представлении выполняется синхронным обработчиком
+        """
+        board_participant.role = 1
+        board_participant.save(update_fields=['role'])
+
+        response = self.call(AsyncGoalDetailView, user, method='patch', data={'title': 'Новая'}, pk=goal.id)
+
+        assert response.status_code == 200
+        goal.refresh_from_db()
+        assert goal.title == 'Новая'
+
+    def test_verification(self, user, monkeypatch):
+        sent = []
+
+        async def send_message(self, chat_id: int, text: str, **kwargs):
+            sent.append((chat_id, text))
+
+        monkeypatch.setattr(AsyncTgClient, 'send_message', send_message)
+        tg_user = TgUser.objects.create(chat_id=100)
+
+        response = self.call(
+            AsyncVerificationCodeView, user, method='patch', data={'verification_code': tg_user.verification_code}
+        )
+
+        assert response.status_code == 200
+        tg_user.refresh_from_db()
+        assert tg_user.user_id == user.id
+        assert sent == [(100, 'Бот верифицирован')]
@@ -54,3 +54,70 @@ class TestBoardCreated:
 
         assert response.status_code == 201
         assert current_user == owner.user
+
+
+@pytest.mark.django_db
+class TestBoardUpdate:
+
+    @pytest.fixture
+    def owner(self, board_participant):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        return board_participant
+
+    def put(self, client, board, participants):
+        return client.put(
+            reverse('goals:board-details', kwargs={'pk': board.pk}),
+            data={'title': board.title, 'participants': participants},
+            format='json',
+        )
+
+    def test_sync_participants(self, auto_login_user, owner, board, board_participant_factory, user_factory):
+        """
+        Участники добавляются, меняют роль и удаляются, владелец не затрагивается
+        """
+        changed = board_participant_factory.create(board=board, role=BoardParticipant.Role.reader)
+        removed = board_participant_factory.create(board=board, role=BoardParticipant.Role.reader)
+        added = user_factory.create()
+
+        response = self.put(auto_login_user, board, [
+            {'user': changed.user.username, 'role': BoardParticipant.Role.writer},
+            {'user': added.username, 'role': BoardParticipant.Role.reader},
+        ])
+
+        assert response.status_code == 200
+        roles = dict(BoardParticipant.objects.filter(board=board).values_list('user_id', 'role'))
+        assert roles == {
+            owner.user_id: BoardParticipant.Role.owner,
+            changed.user_id: BoardParticipant.Role.writer,
+            added.id: BoardParticipant.Role.reader,
+        }
+        assert removed.user_id not in roles
+
+    def test_sync_queries_constant(self, auto_login_user, owner, board, user_factory, django_assert_max_num_queries):
+        """
+        Количество запросов не зависит от количества участников
+        (включая повторную загрузку участников для ETag ответа)
+        """
+        users = user_factory.create_batch(30)
+        with django_assert_max_num_queries(11):
+            response = self.put(auto_login_user, board, [
+                {'user': user.username, 'role': BoardParticipant.Role.reader} for user in users
+            ])
+        assert response.status_code == 200
+        assert BoardParticipant.objects.filter(board=board).count() == 31
+
+    def test_unknown_username(self, auto_login_user, owner, board, user_factory):
+        """
+        Несуществующий пользователь дает ошибку валидации для своего элемента
+        """
+        known = user_factory.create()
+        response = self.put(auto_login_user, board, [
+            {'user': known.username, 'role': BoardParticipant.Role.reader},
+            {'user': 'unknown_user', 'role': BoardParticipant.Role.reader},
+        ])
+
+        assert response.status_code == 400
+        assert response.data['participants'][0] == {}
+        assert 'user' in response.data['participants'][1]
+        assert not BoardParticipant.objects.filter(board=board, user=known).exists()
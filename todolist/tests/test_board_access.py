@@ -0,0 +1,45 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.board_access import WRITE_ROLES, has_board_access, reset_board_roles
+
+
+@pytest.fixture
+def drf_request(user) -> Request:
+    request = APIRequestFactory().get('/')
+    force_authenticate(request, user)
+    drf_request = Request(request)
+    drf_request.user = user
+    return drf_request
+
+
+@pytest.mark.django_db
+class TestBoardAccess:
+
+    def test_roles_loaded_once_per_request(self, drf_request, board_participant, django_assert_num_queries):
+        """
+        Все проверки доступа в рамках запроса используют одну выборку ролей
+        """
+        with django_assert_num_queries(1):
+            assert has_board_access(drf_request, board_participant.board_id)
+            has_board_access(drf_request, board_participant.board_id, WRITE_ROLES)
+            assert not has_board_access(drf_request, board_participant.board_id + 1)
+
+    @pytest.mark.parametrize('role', [1, 2, 3])
+    def test_write_roles(self, drf_request, board_participant, role):
+        """
+        Запись разрешена только владельцу и редактору
+        """
+        board_participant.role = role
+        board_participant.save(update_fields=['role'])
+        assert has_board_access(drf_request, board_participant.board_id, WRITE_ROLES) is (role in (1, 2))
+
+    def test_reset_board_roles(self, drf_request, board_participant, django_assert_num_queries):
+        """
+        После сброса роли загружаются заново
+        """
+        has_board_access(drf_request, board_participant.board_id)
+        reset_board_roles(drf_request)
+        with django_assert_num_queries(1):
+            has_board_access(drf_request, board_participant.board_id)
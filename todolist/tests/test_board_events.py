@@ -0,0 +1,321 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals import events
+from goals.checks import board_events_backend_check
+from goals.events import RESYNC, Broadcaster, PostgresEventBackend
+from goals.models import BoardParticipant, Goal
+from goals.views.events import AsyncBoardEventsView, BoardEventsView
+
+
+def parse(chunk: bytes) -> list[dict]:
+    """
+    События из части потока SSE (комментарии и retry пропускаются)
+    """
+    return [
+        json.loads(line[len(b'data: '):]) for line in chunk.split(b'\n') if line.startswith(b'data: ')
+    ]
+
+
+class TestBroadcaster:
+    def test_dispatch(self):
+        broadcaster = Broadcaster()
+        first, second = broadcaster.subscribe(1, 10), broadcaster.subscribe(1, 11)
+        other = broadcaster.subscribe(2, 10)
+
+        broadcaster.dispatch({'type': 'goal.created', 'board': 1, 'id': 5})
+        broadcaster.unsubscribe(second)
+        broadcaster.dispatch({'type': 'goal.updated', 'board': 1, 'id': 5})
+
+        assert [event['type'] for event in first.get(0)] == ['goal.created', 'goal.updated']
+        assert [event['type'] for event in second.get(0)] == ['goal.created']
+        assert other.get(0) is None
+
+    def test_buffer_overflow(self, monkeypatch):
+        """
+        Переполненный буфер сбрасывается, подписка завершается событием resync
+        """
+        monkeypatch.setattr(Broadcaster, 'buffer_size', 3)
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe(1, 10)
+
+        for i in range(5):
+            broadcaster.dispatch({'type': 'goal.updated', 'board': 1, 'id': i})
+
+        assert subscription.get(0) == [RESYNC]
+        assert subscription.closed
+        assert subscription.get(0) is None
+
+    def test_async(self):
+        broadcaster = Broadcaster()
+
+        async def receive():
+            subscription = broadcaster.subscribe(1, 10, asyncio.get_running_loop())
+            assert await subscription.aget(0.01) is None
+            asyncio.get_running_loop().call_later(0.01, broadcaster.dispatch, {'type': 'board.updated', 'board': 1})
+            return await subscription.aget(5)
+
+        assert async_to_sync(receive)() == [{'type': 'board.updated', 'board': 1}]
+
+
+@pytest.mark.django_db
+class TestPublish:
+    @pytest.fixture
+    def subscription(self, board):
+        subscription = events.broadcaster.subscribe(board.id, 0)
+        yield subscription
+        events.broadcaster.unsubscribe(subscription)
+
+    def received(self, subscription: events.Subscription) -> list[tuple]:
+        return [(event['type'], event['id']) for event in subscription.get(0) or []]
+
+    def test_after_commit(self, subscription, goal_category, goal_factory, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            goal = goal_factory.create(category=goal_category, status=Goal.Status.to_do)
+            assert self.received(subscription) == []
+
+        for callback in callbacks:
+            callback()
+        assert self.received(subscription) == [('goal.created', goal.id)]
+
+    def test_rollback(self, subscription, goal_category, goal_factory, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(ValueError), transaction.atomic():
+                goal_factory.create(category=goal_category, status=Goal.Status.to_do)
+                raise ValueError
+
+        assert self.received(subscription) == []
+
+    def test_changes(self, auto_login_user, user, board, board_participant, goal_category, goal_factory,
+                     goal_comment_factory, board_participant_factory, subscription,
+                     django_capture_on_commit_callbacks):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        goal = goal_factory.create(category=goal_category, status=Goal.Status.to_do)
+        subscription.get(0)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auto_login_user.post(reverse('goals:create-comment'), {'goal': goal.id, 'text': 'Комментарий'})
+            comment_id = response.json()['id']
+            auto_login_user.patch(reverse('goals:goal-detail', kwargs={'pk': goal.id}), {'title': 'Новая'})
+            auto_login_user.delete(reverse('goals:goal-detail', kwargs={'pk': goal.id}))
+            participant = board_participant_factory.create(board=board)
+            participant_id = participant.id
+            participant.delete()
+            auto_login_user.delete(reverse('goals:category-details', kwargs={'pk': goal_category.id}))
+
+        assert self.received(subscription) == [
+            ('comment.created', comment_id),
+            ('goal.updated', goal.id),
+            ('goal.archived', goal.id),
+            ('participant.added', participant_id),
+            ('participant.removed', participant_id),
+            ('category.archived', goal_category.id),
+        ]
+
+    def test_bulk(self, auto_login_user, board, board_participant, goal_category, subscription,
+                  django_capture_on_commit_callbacks):
+        """
+        Массовое создание целей - одно событие board.changed
+        """
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        goals = [{'title': f'Цель {i}', 'category': goal_category.id} for i in range(3)]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auto_login_user.post(reverse('goals:goal-bulk'), goals, format='json')
+
+        assert response.status_code == 201
+        assert subscription.get(0) == [{'type': 'board.changed', 'board': board.id, 'id': None, 'source': 'goal'}]
+
+    def test_board_participants(self, auto_login_user, board, board_participant, board_participant_factory,
+                                user_factory, subscription, django_capture_on_commit_callbacks):
+        """
+        Участники, добавленные и измененные при обновлении доски (bulk_create/bulk_update), тоже дают события
+        """
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        changed = board_participant_factory.create(board=board, role=BoardParticipant.Role.reader)
+        removed = board_participant_factory.create(board=board, role=BoardParticipant.Role.reader)
+        added = user_factory.create()
+        subscription.get(0)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auto_login_user.put(reverse('goals:board-details', kwargs={'pk': board.id}), {
+                'title': board.title,
+                'participants': [
+                    {'user': changed.user.username, 'role': BoardParticipant.Role.writer},
+                    {'user': added.username, 'role': BoardParticipant.Role.reader},
+                ],
+            }, format='json')
+
+        assert response.status_code == 200
+        received = {(event['type'], event['user']) for event in subscription.get(0) if event['type'] != 'board.updated'}
+        assert received == {
+            ('participant.removed', removed.user_id),
+            ('participant.updated', changed.user_id),
+            ('participant.added', added.id),
+        }
+
+    def test_goal_moved(self, auto_login_user, board, board_participant, goal_category, goal_category_factory,
+                        board_participant_factory, goal_factory, subscription, django_capture_on_commit_callbacks):
+        """
+        При переносе цели на другую доску прежняя доска получает goal.moved
+        """
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        other_category = goal_category_factory.create()
+        board_participant_factory.create(
+            board=other_category.board, user=board_participant.user, role=BoardParticipant.Role.owner,
+        )
+        goal = goal_factory.create(category=goal_category, status=Goal.Status.to_do)
+        other = events.broadcaster.subscribe(other_category.board_id, 0)
+        subscription.get(0)
+
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = auto_login_user.patch(
+                    reverse('goals:goal-detail', kwargs={'pk': goal.id}), {'category': other_category.id},
+                )
+            assert response.status_code == 200
+            assert self.received(subscription) == [('goal.moved', goal.id)]
+            assert self.received(other) == [('goal.updated', goal.id)]
+        finally:
+            events.broadcaster.unsubscribe(other)
+
+    def test_participant_user(self, board, board_participant, subscription, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            board_participant.delete()
+
+        event = subscription.get(0)[0]
+        assert event['type'] == 'participant.removed'
+        assert event['user'] == board_participant.user_id
+
+
+class TestBoardEventsBackendCheck:
+    @pytest.mark.parametrize('backend, debug, errors', [
+        ('local', False, ['goals.E002']),
+        ('local', True, []),
+        ('postgres', False, []),
+    ])
+    def test_check(self, settings, backend, debug, errors):
+        settings.BOARD_EVENTS_BACKEND = backend
+        settings.DEBUG = debug
+
+        assert [error.id for error in board_events_backend_check(None)] == errors
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostgresBackend:
+    def test_notify(self, monkeypatch):
+        """
+        Событие доходит до подписчика через NOTIFY/LISTEN
+        """
+        monkeypatch.setattr(PostgresEventBackend, 'poll_timeout', 0.1)
+        broadcaster = Broadcaster()
+        backend = PostgresEventBackend(broadcaster)
+        subscription = broadcaster.subscribe(1, 10)
+        backend.start()
+        try:
+            # Поток начинает слушать канал не сразу
+            for _ in range(50):
+                backend.publish({'type': 'goal.created', 'board': 1, 'id': 5})
+                if received := subscription.get(0.1):
+                    break
+        finally:
+            backend.stop()
+
+        assert received[0] == {'type': 'goal.created', 'board': 1, 'id': 5}
+
+
+@pytest.mark.django_db
+class TestBoardEventsView:
+    factory = APIRequestFactory()
+
+    @pytest.fixture(autouse=True)
+    def fast_heartbeat(self, monkeypatch):
+        monkeypatch.setattr(BoardEventsView, 'heartbeat', 0.01)
+
+    def request(self, user, board_id: int):
+        request = self.factory.get(reverse('goals:board-events', kwargs={'pk': board_id}))
+        force_authenticate(request, user)
+        return request
+
+    def stream(self, user, board_id: int, send=None) -> tuple:
+        """
+        Ответ AsyncBoardEventsView и части потока: первые две, затем после send() - до закрытия потока
+        """
+        async def receive():
+            response = await AsyncBoardEventsView.as_view()(self.request(user, board_id), pk=board_id)
+            if response.status_code != 200:
+                return response, []
+            stream = aiter(response.streaming_content)
+            chunks = [await anext(stream), await anext(stream)]
+            if send:
+                send()
+            chunks += [part async for part in stream]
+            return response, chunks
+
+        return async_to_sync(receive)()
+
+    def test_stream(self, user, board, board_participant):
+        def send():
+            events.broadcaster.dispatch({'type': 'goal.created', 'board': board.id, 'id': 1})
+            events.broadcaster.dispatch({'type': 'goal.created', 'board': board.id + 1, 'id': 2})
+            events.broadcaster.dispatch({'type': 'participant.removed', 'board': board.id, 'id': 3, 'user': user.id})
+
+        response, chunks = self.stream(user, board.id, send)
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/event-stream'
+        assert response['Cache-Control'] == 'no-cache'
+        assert chunks[:2] == [b'retry: 3000\n\n', b': heartbeat\n\n']
+        received = b''.join(chunks[2:])
+        expected = b'event: goal.created\ndata: {"type":"goal.created","board":%d,"id":1}\n\n' % board.id
+        assert received.startswith(expected)
+        assert [event['type'] for event in parse(received)] == ['goal.created', 'participant.removed']
+        assert events.broadcaster._subscribers == {}
+
+    def test_board_archived(self, user, board, board_participant):
+        def send():
+            events.broadcaster.dispatch({'type': 'goal.updated', 'board': board.id, 'id': 1})
+            events.broadcaster.dispatch({'type': 'board.archived', 'board': board.id, 'id': board.id})
+
+        _, chunks = self.stream(user, board.id, send)
+
+        assert [event['type'] for event in parse(b''.join(chunks[2:]))] == ['goal.updated', 'board.archived']
+        assert events.broadcaster._subscribers == {}
+
+    def test_lifetime(self, user, board, board_participant, monkeypatch):
+        monkeypatch.setattr(BoardEventsView, 'lifetime', 0.05)
+        _, chunks = self.stream(user, board.id)
+
+        assert b''.join(chunks).startswith(b'retry: 3000\n\n: heartbeat\n\n')
+
+    def test_not_participant(self, user, board_factory):
+        board = board_factory.create()
+        response, _ = self.stream(user, board.id)
+
+        assert response.status_code == 404
+        assert events.broadcaster._subscribers == {}
+
+    def test_sync_unavailable(self, user, board, board_participant):
+        """
+        Под WSGI поток не отдается: соединение занимало бы поток воркера
+        """
+        response = BoardEventsView.as_view()(self.request(user, board.id), pk=board.id)
+
+        assert response.status_code == 501
+        assert events.broadcaster._subscribers == {}
+
+    def test_error_as_event(self, client, board):
+        response = client.get(reverse('goals:board-events', kwargs={'pk': board.id}), HTTP_ACCEPT='text/event-stream')
+
+        assert response.status_code == 403
+        assert response.content.startswith(b'event: error\ndata: {"detail":')
@@ -0,0 +1,75 @@
+import pytest
+from django.urls import reverse
+
+from goals.models import BoardParticipant, Goal
+from goals.stats import board_stats
+
+
+@pytest.mark.django_db
+class TestBoardStats:
+
+    @pytest.fixture
+    def goals(self, board, board_participant, goal_category, goal_category_factory, goal_factory) -> list[Goal]:
+        other_category = goal_category_factory.create(board=board, title='Б')
+        goal_category.title = 'А'
+        goal_category.save()
+        return [
+            goal_factory.create(category=goal_category, status=1, priority=1),
+            goal_factory.create(category=goal_category, status=1, priority=2),
+            goal_factory.create(category=other_category, status=3, priority=2),
+        ]
+
+    def test_stats(self, auto_login_user, board, goals, board_participant_factory):
+        board_participant_factory.create(board=board, role=BoardParticipant.Role.reader)
+
+        response = auto_login_user.get(reverse('goals:board-stats', kwargs={'pk': board.id}))
+
+        assert response.status_code == 200
+        assert response.data['members_count'] == 2
+        assert response.data['goals'] == 3
+        assert response.data['by_status'] == {1: 2, 2: 0, 3: 1, 4: 0}
+        assert response.data['by_priority'] == {1: 1, 2: 2, 3: 0, 4: 0}
+        assert [(category['title'], category['goals']) for category in response.data['by_category']] == [
+            ('А', 2), ('Б', 1),
+        ]
+
+    def test_not_participant(self, auto_login_user, board_factory):
+        board = board_factory.create()
+        assert auto_login_user.get(reverse('goals:board-stats', kwargs={'pk': board.id})).status_code == 404
+
+    def test_counters_follow_changes(self, board, goals, goal_category_factory):
+        """
+        Счетчики, которые ведет триггер, совпадают с подсчетом целей после любых изменений
+        """
+        goals[0].status = Goal.Status.done
+        goals[0].save()
+        goals[1].category = goal_category_factory.create(board=board)
+        goals[1].save()
+        goals[2].title = 'Без изменения счетчиков'
+        goals[2].save()
+        Goal.objects.filter(pk=goals[2].pk).update(priority=Goal.Priority.critical)
+        goals[0].delete()
+
+        assert board_stats(board.id, use_counters=True) == board_stats(board.id, use_counters=False)
+        assert board_stats(board.id)['goals'] == 2
+
+    def test_deleted_category_excluded(self, board, goals):
+        goals[0].category.is_deleted = True
+        goals[0].category.save()
+
+        assert board_stats(board.id)['goals'] == 1
+
+
+@pytest.mark.django_db
+class TestBoardListStats:
+
+    def test_members_and_role(self, auto_login_user, board, board_participant, board_participant_factory):
+        board_participant.role = BoardParticipant.Role.writer
+        board_participant.save(update_fields=['role'])
+        board_participant_factory.create_batch(2, board=board, role=BoardParticipant.Role.reader)
+
+        response = auto_login_user.get(reverse('goals:board-list'))
+
+        assert [(item['members_count'], item['role']) for item in response.data] == [
+            (3, BoardParticipant.Role.writer),
+        ]
@@ -0,0 +1,434 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from bot.goals_list import GOALS_PAGE_SIZE
+from bot.handlers import BotHandler
+from bot.inbox import drain_batch, pending_updates
+from bot.management.commands import runbot
+from bot.models import TgUpdate, TgUser
+from bot.outbox import MESSAGE_LIMIT, Outbox, TokenBucket, merge_texts
+from bot.runner import AsyncBotRunner
+from bot.tg.schemas import Chat, GetUpdatesResponse, Message, UpdateObj
+from bot.tg_users import TgUserCache
+from goals.models import Goal
+
+
+def make_message(chat_id: int, text: str, message_id: int = 1) -> Message:
+    return Message(message_id=message_id, chat=Chat(id=chat_id), text=text)
+
+
+@pytest.mark.django_db
+class TestBotHandler:
+
+    @pytest.fixture
+    def tg_user(self, user):
+        return TgUser.objects.create(chat_id=100, user=user)
+
+    def send(self, handler: BotHandler, text: str) -> list[str]:
+        return async_to_sync(handler.handle_message)(make_message(100, text))
+
+    def test_unverified_user_gets_code(self):
+        replies = self.send(BotHandler(), '/goals')
+
+        tg_user = TgUser.objects.get(chat_id=100)
+        assert replies == [f'Ваш код верификации: {tg_user.verification_code}']
+
+    def test_goals(self, tg_user, board_participant, goal_factory, goal_category):
+        goal = goal_factory.create(category=goal_category, status=1)
+
+        replies = self.send(BotHandler(), '/goals')
+
+        assert replies[1] == f'{goal.id} - {goal.title}'
+
+    def test_create_goal(self, tg_user, board_participant, goal_category):
+        handler = BotHandler()
+
+        self.send(handler, '/create')
+        assert self.send(handler, str(goal_category.id))[-1] == 'Введите название цели'
+        assert self.send(handler, 'Новая цель')[-1] == 'Цель сохранена'
+
+        assert Goal.objects.filter(category=goal_category, title='Новая цель', user=tg_user.user).exists()
+
+    def test_verified_user_cached(self, tg_user, django_assert_num_queries):
+        """
+        Для верифицированного чата пользователь берется из кеша без запросов к базе
+        """
+        handler = BotHandler()
+        self.send(handler, '/cancel')
+
+        with django_assert_num_queries(0):
+            self.send(handler, '/cancel')
+
+    def test_verification_invalidates_cache(self, user, auto_login_user):
+        """
+        После верификации на сайте бот сразу видит привязанного пользователя
+        """
+        handler = BotHandler()
+        self.send(handler, '/goals')
+        tg_user = TgUser.objects.get(chat_id=100)
+
+        response = auto_login_user.patch(
+            reverse('bot:verify'), {'verification_code': tg_user.verification_code}, format='json'
+        )
+
+        assert response.status_code == 200
+        assert self.send(handler, '/goals')[-1] == 'Нет целей'
+
+
+@pytest.mark.django_db
+class TestTgUserCache:
+    def test_invalidate_from_other_process(self, user, user_factory):
+        """
+        Перепривязка в веб-процессе сбрасывает запись в кеше процесса бота
+        """
+        bot_users, web_users = TgUserCache(), TgUserCache()
+        tg_user = TgUser.objects.create(chat_id=100, user=user)
+        assert async_to_sync(bot_users.resolve)(100).user_id == user.id
+
+        tg_user.user = user_factory.create()
+        tg_user.save()
+        web_users.invalidate(100)
+
+        assert async_to_sync(bot_users.resolve)(100).user_id == tg_user.user_id
+
+
+@pytest.mark.django_db
+class TestBotGoalsList:
+
+    @pytest.fixture
+    def goals(self, user, board_participant, goal_factory, goal_category) -> list[Goal]:
+        TgUser.objects.create(chat_id=100, user=user)
+        return goal_factory.create_batch(GOALS_PAGE_SIZE + 2, category=goal_category, status=1)
+
+    def send(self, text: str) -> str:
+        return async_to_sync(BotHandler().handle_message)(make_message(100, text))[-1]
+
+    def test_pages(self, goals):
+        """
+        Цели выводятся страницами с командами перехода на соседние страницы
+        """
+        first_page = self.send('/goals').split('\n')
+        assert first_page[:GOALS_PAGE_SIZE] == [f'{goal.id} - {goal.title}' for goal in goals[:GOALS_PAGE_SIZE]]
+        assert first_page[-1] == f'Дальше: /goals_next_{goals[GOALS_PAGE_SIZE - 1].id}'
+
+        second_page = self.send(f'/goals_next_{goals[GOALS_PAGE_SIZE - 1].id}').split('\n')
+        assert second_page[:2] == [f'{goal.id} - {goal.title}' for goal in goals[GOALS_PAGE_SIZE:]]
+        assert second_page[-1] == f'Назад: /goals_prev_{goals[GOALS_PAGE_SIZE].id}'
+
+        assert self.send(f'/goals_prev_{goals[GOALS_PAGE_SIZE].id}').split('\n') == first_page
+
+    def test_cache_invalidation(self, goals, django_assert_num_queries):
+        """
+        Повторный запрос страницы берется из кеша, изменение цели сбрасывает кеш
+        """
+        self.send('/goals')
+        with django_assert_num_queries(0):
+            self.send('/goals')
+
+        goals[0].title = 'Новое название'
+        goals[0].save()
+
+        assert f'{goals[0].id} - Новое название' in self.send('/goals')
+
+    def test_move_invalidates_old_board(self, goals, goal_category_factory):
+        """
+        Цель, перенесенная на доску без пользователя, пропадает из его списка
+        """
+        self.send('/goals')
+
+        goals[0].category = goal_category_factory.create()
+        goals[0].save()
+
+        assert f'{goals[0].id} - {goals[0].title}' not in self.send('/goals')
+
+
+class FakeClient:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id: int, text: str):
+        self.sent.append((chat_id, text))
+
+
+class SlowHandler:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def handle_message(self, msg: Message) -> list[str]:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01 if msg.message_id % 2 else 0.001)
+        self.active -= 1
+        return [msg.text]
+
+
+class UnlimitedOutbox(Outbox):
+    chat_rate = 1000
+    chat_burst = 1000
+
+
+class TestAsyncBotRunner:
+
+    def run(self, messages: list[Message], max_in_flight: int):
+        handler = SlowHandler()
+        client = FakeClient()
+        runner = AsyncBotRunner(client, handler, max_in_flight=max_in_flight, outbox=UnlimitedOutbox(client))
+
+        async def main():
+            for msg in messages:
+                await runner.dispatch(msg)
+            while runner.workers:
+                await asyncio.gather(*runner.workers)
+            await runner.outbox.join()
+
+        asyncio.run(main())
+        return client, handler
+
+    def test_order_within_chat_and_concurrency(self):
+        """
+        Сообщения разных чатов обрабатываются параллельно, одного чата - по порядку
+        """
+        messages = [make_message(chat_id, f'{chat_id}:{i}', i) for i in range(5) for chat_id in range(4)]
+
+        client, handler = self.run(messages, max_in_flight=100)
+
+        for chat_id in range(4):
+            texts = [text for sent_chat, text in client.sent if sent_chat == chat_id]
+            assert texts == [f'{chat_id}:{i}' for i in range(5)]
+        assert handler.max_active == 4
+
+    def test_max_in_flight(self):
+        """
+        Количество одновременно обрабатываемых обновлений ограничено
+        """
+        messages = [make_message(chat_id, str(chat_id)) for chat_id in range(10)]
+
+        client, handler = self.run(messages, max_in_flight=3)
+
+        assert len(client.sent) == 10
+        assert handler.max_active <= 3
+
+
+class TestOutbox:
+
+    def test_merge_texts(self):
+        """
+        Ответы склеиваются в одно сообщение и делятся по лимиту Telegram
+        """
+        assert merge_texts(['menu', 'reply']) == ['menu\n\nreply']
+        assert merge_texts(['', None]) == []
+
+        lines = [f'{i} - ' + 'x' * 100 for i in range(100)]
+        messages = merge_texts(['\n'.join(lines)])
+        assert len(messages) > 1
+        assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+        assert '\n'.join(messages).split('\n') == lines
+
+        assert [len(message) for message in merge_texts(['y' * (MESSAGE_LIMIT + 10)])] == [MESSAGE_LIMIT, 10]
+
+    def test_token_bucket(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr('bot.outbox.time.monotonic', lambda: now[0])
+        bucket = TokenBucket(rate=2, capacity=2)
+
+        bucket.consume()
+        bucket.consume()
+        assert bucket.wait_time() == 0.5
+        now[0] = 0.5
+        assert bucket.wait_time() == 0
+
+    def test_send_in_order_per_chat(self):
+        """
+        Каждое обновление - одно сообщение, порядок внутри чата сохраняется
+        """
+        client = FakeClient()
+        outbox = UnlimitedOutbox(client)
+
+        async def main():
+            for i in range(5):
+                for chat_id in (1, 2):
+                    outbox.send(chat_id, [f'menu {i}', f'reply {i}'])
+            await outbox.join()
+
+        asyncio.run(main())
+
+        for chat_id in (1, 2):
+            assert [text for sent_chat, text in client.sent if sent_chat == chat_id] == [
+                f'menu {i}\n\nreply {i}' for i in range(5)
+            ]
+
+    def test_chat_rate_limit(self):
+        """
+        Сообщения сверх лимита чата откладываются, другие чаты не ждут
+        """
+        class LimitedOutbox(Outbox):
+            chat_rate = 20
+            chat_burst = 1
+
+        client = FakeClient()
+        outbox = LimitedOutbox(client)
+        loop_time = []
+
+        async def send_message(chat_id: int, text: str):
+            loop_time.append((chat_id, asyncio.get_running_loop().time()))
+
+        client.send_message = send_message
+
+        async def main():
+            for _ in range(3):
+                outbox.send(1, ['text'])
+            outbox.send(2, ['text'])
+            await outbox.join()
+
+        asyncio.run(main())
+
+        chat_times = [sent_at for chat_id, sent_at in loop_time if chat_id == 1]
+        assert chat_times[2] - chat_times[0] >= 2 / LimitedOutbox.chat_rate * 0.9
+        assert [chat_id for chat_id, _ in loop_time].index(2) < 2
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {'update_id': update_id, 'message': {'message_id': update_id, 'chat': {'id': chat_id}, 'text': text}}
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, chat_id: int, texts: list[str]):
+        self.sent.append((chat_id, texts))
+
+    def join(self, timeout: float):
+        self.joined = timeout
+
+
+@pytest.mark.django_db
+class TestWebhook:
+    url = reverse('bot:webhook')
+
+    @pytest.fixture(autouse=True)
+    def secret(self, settings):
+        settings.BOT_WEBHOOK_SECRET = 'secret'
+
+    def post(self, client, data: dict, secret: str = 'secret'):
+        return client.post(self.url, data, format='json', HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+
+    def test_wrong_secret(self, client):
+        response = self.post(client, make_update(1, 100, 'text'), secret='wrong')
+
+        assert response.status_code == 403
+        assert not TgUpdate.objects.exists()
+
+    def test_store_update_once(self, client):
+        """
+        Обновление сохраняется в inbox, повторная доставка не создает дубликат
+        """
+        for _ in range(2):
+            assert self.post(client, make_update(1, 100, 'text')).status_code == 200
+
+        update = TgUpdate.objects.get()
+        assert update.chat_id == 100
+        assert update.data['message']['text'] == 'text'
+        assert update.processed is None
+
+    def test_skip_other_updates(self, client):
+        response = self.post(client, {'update_id': 2, 'edited_message': {'message_id': 1}})
+
+        assert response.status_code == 200
+        assert not TgUpdate.objects.exists()
+
+
+@pytest.mark.django_db
+class TestInbox:
+
+    def test_drain_batch(self, django_capture_on_commit_callbacks):
+        """
+        Обновления обрабатываются пачками по порядку и помечаются обработанными
+        """
+        for update_id in (3, 1, 2):
+            TgUpdate.objects.create(update_id=update_id, chat_id=100, data=make_update(update_id, 100, '/goals'))
+        outbox = FakeOutbox()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert drain_batch(BotHandler(), outbox, batch_size=2) == 2
+            assert drain_batch(BotHandler(), outbox, batch_size=2) == 1
+            assert drain_batch(BotHandler(), outbox, batch_size=2) == 0
+
+        assert [chat_id for chat_id, _ in outbox.sent] == [100, 100, 100]
+        assert not TgUpdate.objects.filter(processed__isnull=True).exists()
+
+    def test_invalid_update_does_not_block(self, django_capture_on_commit_callbacks):
+        TgUpdate.objects.create(update_id=1, chat_id=100, data={'update_id': 1})
+        TgUpdate.objects.create(update_id=2, chat_id=100, data=make_update(2, 100, '/goals'))
+        outbox = FakeOutbox()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert drain_batch(BotHandler(), outbox) == 2
+        assert len(outbox.sent) == 1
+
+    def test_database_error_does_not_block(self, django_capture_on_commit_callbacks):
+        """
+        Ошибка базы в обработчике откатывает только свое обновление, остальные ответы отправляются
+        """
+        class FailingHandler(BotHandler):
+            async def handle_message(self, msg: Message) -> list[str]:
+                if msg.text == 'boom':
+                    await Goal.objects.acreate(title='x' * 300)
+                return [msg.text]
+
+        for update_id, text in enumerate(['first', 'boom', 'last'], start=1):
+            TgUpdate.objects.create(update_id=update_id, chat_id=100, data=make_update(update_id, 100, text))
+        outbox = FakeOutbox()
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            assert drain_batch(FailingHandler(), outbox) == 3
+            assert outbox.sent == []
+        for callback in callbacks:
+            callback()
+
+        assert outbox.sent == [(100, ['first']), (100, ['last'])]
+        assert not TgUpdate.objects.filter(processed__isnull=True).exists()
+        assert not Goal.objects.exists()
+
+    def test_shards(self):
+        """
+        Чаты распределяются по шардам без пересечений, включая групповые
+        """
+        for update_id, chat_id in enumerate([1, 2, 3, -4, -5, 6], start=1):
+            TgUpdate.objects.create(update_id=update_id, chat_id=chat_id, data=make_update(update_id, chat_id, 'x'))
+
+        shards = [set(pending_updates(shard, 2).values_list('chat_id', flat=True)) for shard in range(2)]
+
+        assert shards == [{2, -4, 6}, {1, 3, -5}]
+
+
+@pytest.mark.django_db
+class TestRunBot:
+
+    def test_stop_flushes_outbox(self, monkeypatch):
+        """
+        При остановке (SIGTERM, Ctrl-C) ответы на уже подтвержденные обновления отправляются до выхода
+        """
+        class StoppingClient:
+            def __init__(self):
+                self.calls = 0
+
+            def get_updates(self, offset: int = 0) -> GetUpdatesResponse:
+                self.calls += 1
+                if self.calls > 1:
+                    raise KeyboardInterrupt
+                return GetUpdatesResponse(ok=True, result=[UpdateObj(update_id=1, message=make_message(100, '/goals'))])
+
+        monkeypatch.setattr(runbot.signal, 'signal', lambda *args: None)
+        command = runbot.Command()
+        command.tg_client = StoppingClient()
+        command.outbox = FakeOutbox()
+
+        command.handle(use_async=False, max_in_flight=100)
+
+        assert [chat_id for chat_id, _ in command.outbox.sent] == [100]
+        assert command.outbox.joined == command.shutdown_timeout
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from bot.handlers import BotHandler
+from bot.models import BotState, TgUser
+from bot.state import DbStateStore, MemoryStateStore
+from goals.models import Goal
+from tests.test_bot import make_message
+
+
+@pytest.fixture(params=[MemoryStateStore, DbStateStore])
+def store(request):
+    return request.param()
+
+
+@pytest.mark.django_db
+class TestStateStore:
+
+    def test_set_get_pop(self, store):
+        async_to_sync(store.set)(1, {'stage': 1})
+
+        assert async_to_sync(store.get)(1) == {'stage': 1}
+        assert async_to_sync(store.pop)(1, stage=2) is None
+        assert async_to_sync(store.pop)(1, stage=1) == {'stage': 1}
+        assert async_to_sync(store.get)(1) is None
+
+    def test_transition_once(self, store):
+        """
+        Переход между этапами выполняется только из ожидаемого этапа
+        """
+        async_to_sync(store.set)(1, {'stage': 1})
+
+        assert async_to_sync(store.transition)(1, 1, {'stage': 2, 'category_id': '5'})
+        assert not async_to_sync(store.transition)(1, 1, {'stage': 2, 'category_id': '6'})
+        assert async_to_sync(store.get)(1) == {'stage': 2, 'category_id': '5'}
+        assert not async_to_sync(store.transition)(2, 1, {'stage': 2})
+
+    def test_ttl(self, store):
+        store.ttl = 0.01
+        async_to_sync(store.set)(1, {'stage': 1})
+        time.sleep(0.02)
+
+        assert async_to_sync(store.get)(1) is None
+        async_to_sync(store.purge)()
+        assert not BotState.objects.exists()
+
+
+class TestMemoryStateStore:
+
+    def test_lru_limit(self):
+        store = MemoryStateStore()
+        store.max_entries = 2
+        async_to_sync(store.set)(1, {'stage': 1})
+        async_to_sync(store.set)(2, {'stage': 1})
+        async_to_sync(store.get)(1)
+        async_to_sync(store.set)(3, {'stage': 1})
+
+        assert async_to_sync(store.get)(2) is None
+        assert async_to_sync(store.get)(1) is not None
+
+
+@pytest.mark.django_db
+class TestSharedState:
+
+    def test_create_goal_across_workers(self, user, board_participant, goal_category):
+        """
+        С общим хранилищем этапы диалога могут обрабатываться разными воркерами
+        """
+        TgUser.objects.create(chat_id=100, user=user)
+        workers = [BotHandler(DbStateStore()), BotHandler(DbStateStore())]
+
+        def send(worker: BotHandler, text: str) -> list[str]:
+            return async_to_sync(worker.handle_message)(make_message(100, text))
+
+        send(workers[0], '/create')
+        assert send(workers[1], str(goal_category.id))[-1] == 'Введите название цели'
+        assert send(workers[0], 'Цель')[-1] == 'Цель сохранена'
+        send(workers[1], 'Цель')
+
+        assert Goal.objects.filter(title='Цель').count() == 1
+        assert not BotState.objects.exists()
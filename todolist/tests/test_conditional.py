@@ -0,0 +1,136 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+class TestConditionalDetail:
+
+    @pytest.fixture
+    def goal(self, board_participant, goal_factory, goal_category):
+        board_participant.role = 1
+        board_participant.save(update_fields=['role'])
+        return goal_factory.create(category=goal_category, status=1)
+
+    def url(self, goal) -> str:
+        return reverse('goals:goal-detail', kwargs={'pk': goal.pk})
+
+    def test_not_modified(self, auto_login_user, goal):
+        """
+        Повторный GET с ETag или Last-Modified получает 304 без тела
+        """
+        response = auto_login_user.get(self.url(goal))
+        assert response.status_code == 200
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = auto_login_user.get(self.url(goal), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert not response.content
+
+        assert auto_login_user.get(self.url(goal), HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    def test_if_match(self, auto_login_user, goal):
+        """
+        Изменение с устаревшим If-Match отклоняется, с актуальным - проходит и возвращает новый ETag
+        """
+        etag = auto_login_user.get(self.url(goal))['ETag']
+
+        response = auto_login_user.patch(self.url(goal), {'title': 'first'}, format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+        response = auto_login_user.patch(self.url(goal), {'title': 'second'}, format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+        goal.refresh_from_db()
+        assert goal.title == 'first'
+
+        assert auto_login_user.get(self.url(goal), HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_profile_change(self, auto_login_user, goal):
+        """
+        Изменение профиля автора меняет ETag, вход пользователя (last_login) - нет
+        """
+        etag = auto_login_user.get(self.url(goal))['ETag']
+
+        goal.user.last_login = timezone.now()
+        goal.user.save(update_fields=['last_login'])
+        assert auto_login_user.get(self.url(goal), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        goal.user.first_name = 'Новое имя'
+        goal.user.save()
+        response = auto_login_user.get(self.url(goal), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data['user']['first_name'] == 'Новое имя'
+
+    def test_etag_survives_cache_reset(self, auto_login_user, goal):
+        """
+        ETag строится по данным из базы, поэтому не меняется после перезапуска или очистки кеша
+        """
+        etag = auto_login_user.get(self.url(goal))['ETag']
+        cache.clear()
+
+        assert auto_login_user.get(self.url(goal), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_board_participant_profile(self, auto_login_user, board_participant, board):
+        url = reverse('goals:board-details', kwargs={'pk': board.pk})
+        etag = auto_login_user.get(url)['ETag']
+
+        response = auto_login_user.patch(reverse('profile'), {'username': 'renamed'}, format='json')
+        assert response.status_code == 200
+
+        response = auto_login_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data['participants'][0]['user'] == 'renamed'
+
+
+@pytest.mark.django_db
+class TestConditionalList:
+    url = reverse('goals:goal-list')
+
+    def test_not_modified(self, auto_login_user, board_participant, goal_factory, goal_category,
+                          django_assert_num_queries):
+        """
+        Список проверяется одним агрегирующим запросом, изменения в выборке меняют ETag
+        """
+        goals = goal_factory.create_batch(3, category=goal_category, status=1)
+        etag = auto_login_user.get(self.url)['ETag']
+
+        with django_assert_num_queries(1):
+            response = auto_login_user.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        assert auto_login_user.get(self.url, {'ordering': '-title'}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+        goals[0].status = 4
+        goals[0].save()
+        response = auto_login_user.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(response.data['results']) == 2
+
+    def test_archive_category_bumps_updated(self, auto_login_user, board_participant, goal_factory, goal_category):
+        board_participant.role = 1
+        board_participant.save(update_fields=['role'])
+        goal = goal_factory.create(category=goal_category, status=1)
+
+        response = auto_login_user.delete(reverse('goals:category-details', kwargs={'pk': goal_category.pk}))
+
+        assert response.status_code == 204
+        goal.refresh_from_db()
+        assert goal.status == 4
+        assert goal.updated > goal.created
+
+    def test_profile_change(self, auto_login_user, board_participant, goal_factory, goal_category, user_factory):
+        """
+        Изменение профиля автора меняет ETag списка, даже если автор уже не участник доски
+        """
+        goal = goal_factory.create(category=goal_category, user=user_factory.create(), status=1)
+        etag = auto_login_user.get(self.url)['ETag']
+
+        goal.user.email = 'new@example.com'
+        goal.user.save()
+        response = auto_login_user.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data['results'][0]['user']['email'] == 'new@example.com'
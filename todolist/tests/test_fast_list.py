@@ -0,0 +1,123 @@
+import datetime
+import decimal
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+from core.row_plan import RowPlan
+from goals.cache import CachedListMixin
+from goals.models import Goal
+from goals.views.category import GoalCategoryListView
+from goals.views.comment import GoalCommentListView
+from goals.views.goals import GoalListView
+
+
+@pytest.mark.django_db
+class TestFastList:
+    """
+    Быстрое чтение списков отдает те же байты, что и сериализатор с JSONRenderer
+    """
+
+    @pytest.fixture
+    def goal(self, board_participant, goal_category, goal_factory, goal_comment_factory):
+        due_date = datetime.datetime(2023, 7, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        goal_factory.create(category=goal_category, title='Выучить английский', due_date=due_date, status=1)
+        goal_factory.create(category=goal_category, title='Английский язык\x07 \u2028 "кавычки" \\ 🙂', status=2)
+        goal = goal_factory.create(category=goal_category, description='английский</script>', status=3)
+        goal_comment_factory.create(goal=goal, text='Строка  с\nпереносом\t и \x1f')
+        goal_comment_factory.create(goal=goal)
+        return goal
+
+    def get(self, client, url: str, slow: bool, monkeypatch):
+        """
+        Ответ списка: быстрый или через обычный ListModelMixin.list и JSONRenderer, без кеша ответов
+        """
+        with monkeypatch.context() as patch:
+            patch.setattr(CachedListMixin, 'list_cache_timeout', 0)
+            if slow:
+                for view in (GoalListView, GoalCategoryListView, GoalCommentListView):
+                    patch.setattr(view, 'get_list_data', CachedListMixin.get_list_data)
+                    patch.setattr(view, 'renderer_classes', [JSONRenderer])
+            response = client.get(url)
+        assert response.status_code == 200
+        return response
+
+    @pytest.mark.parametrize('url', [
+        reverse('goals:goal-list'),
+        reverse('goals:goal-list') + '?limit=2',
+        reverse('goals:goal-list') + '?limit=2&ordering=-due_date',
+        reverse('goals:goal-list') + '?limit=1&offset=1',
+        reverse('goals:goal-list') + '?search=английский',
+        reverse('goals:goal-list') + '?search=английский&limit=1',
+        reverse('goals:categories-list') + '?limit=5',
+        reverse('goals:comments-list'),
+        reverse('goals:comments-list') + '?limit=1',
+    ])
+    def test_same_bytes(self, auto_login_user, goal, monkeypatch, url):
+        expected = self.get(auto_login_user, url, True, monkeypatch)
+        response = self.get(auto_login_user, url, False, monkeypatch)
+
+        assert response.content == expected.content
+        assert response['Content-Type'] == expected['Content-Type']
+        assert response['ETag'] == expected['ETag']
+
+    def test_next_page(self, auto_login_user, goal, monkeypatch):
+        """
+        Курсор строится по строке values() так же, как по модели
+        """
+        url = reverse('goals:goal-list') + '?limit=1&ordering=-due_date'
+        next_url = self.get(auto_login_user, url, False, monkeypatch).json()['next']
+        assert next_url == self.get(auto_login_user, url, True, monkeypatch).json()['next']
+
+        expected = self.get(auto_login_user, next_url, True, monkeypatch)
+        assert self.get(auto_login_user, next_url, False, monkeypatch).content == expected.content
+
+    def test_other_timezone(self, auto_login_user, goal, monkeypatch, settings):
+        """
+        Вне UTC даты форматируются самим полем DRF
+        """
+        settings.TIME_ZONE = 'Europe/Moscow'
+        RowPlan.for_serializer.cache_clear()
+        url = reverse('goals:goal-list')
+        try:
+            with timezone.override('Europe/Moscow'):
+                expected = self.get(auto_login_user, url, True, monkeypatch)
+                response = self.get(auto_login_user, url, False, monkeypatch)
+        finally:
+            RowPlan.for_serializer.cache_clear()
+
+        assert '+03:00' in response.json()['results'][0]['created']
+        assert response.content == expected.content
+
+
+class TestRowPlan:
+    def test_unsupported_field(self):
+        class Serializer(serializers.ModelSerializer):
+            title = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Goal
+                fields = ('id', 'title')
+
+        with pytest.raises(ImproperlyConfigured):
+            RowPlan(Serializer())
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize('data', [
+        {'text': 'Юникод \u2028 \u2029 \x00 \x1f "\\/', 'emoji': '🙂', 'n': [1, 2.5, None, True]},
+        [{'id': 1, 'created': datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)}],
+        {'date': datetime.date(2023, 1, 2), 'decimal': decimal.Decimal('1.50')},
+    ])
+    def test_same_as_json_renderer(self, data):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent(self):
+        data = {'a': [1]}
+        media_type = 'application/json; indent=2'
+        assert ORJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
@@ -0,0 +1,62 @@
+import pytest
+from django.urls import reverse
+
+from goals.models import Goal, GoalComments
+
+
+@pytest.mark.django_db
+class TestGoalBoard:
+
+    def boards(self, goal: Goal) -> tuple[int, set[int]]:
+        goal.refresh_from_db()
+        return goal.board_id, set(GoalComments.objects.filter(goal=goal).values_list('board_id', flat=True))
+
+    def test_filled_on_create(self, goal_category, goal_factory, goal_comment_factory):
+        goal = goal_factory.create(category=goal_category)
+        goal_comment_factory.create(goal=goal)
+        assert self.boards(goal) == (goal_category.board_id, {goal_category.board_id})
+
+    def test_filled_on_bulk_create(self, user, goal_category, goal_factory):
+        Goal.objects.bulk_create(goal_factory.build_batch(3, user=user, category=goal_category))
+        assert set(Goal.objects.values_list('board_id', flat=True)) == {goal_category.board_id}
+
+    def test_goal_moved_to_other_board(self, goal, goal_comment_factory, goal_category_factory):
+        goal_comment_factory.create_batch(2, goal=goal)
+        category = goal_category_factory.create()
+
+        goal.category = category
+        goal.save()
+
+        assert self.boards(goal) == (category.board_id, {category.board_id})
+
+    def test_category_moved_to_other_board(self, goal, goal_comment_factory, board_factory):
+        goal_comment_factory.create(goal=goal)
+        board = board_factory.create()
+
+        goal.category.board = board
+        goal.category.save()
+
+        assert self.boards(goal) == (board.id, {board.id})
+
+    def test_board_not_writable(self, auto_login_user, board_participant, goal_category, goal_factory, board_factory):
+        board_participant.role = 1
+        board_participant.save(update_fields=['role'])
+        goal = goal_factory.create(category=goal_category)
+        other = board_factory.create()
+
+        response = auto_login_user.patch(
+            reverse('goals:goal-detail', kwargs={'pk': goal.id}), data={'board': other.id}, format='json'
+        )
+
+        assert response.status_code == 200
+        assert 'board' not in response.data
+        assert self.boards(goal)[0] == goal_category.board_id
+
+    def test_comments_scoped_by_board(self, auto_login_user, board_participant, goal_category, goal_factory,
+                                      goal_comment_factory):
+        own = goal_comment_factory.create(goal=goal_factory.create(category=goal_category))
+        goal_comment_factory.create()
+
+        response = auto_login_user.get(reverse('goals:comments-list'))
+
+        assert [comment['id'] for comment in response.data['results']] == [own.id]
@@ -0,0 +1,111 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from goals.models import BoardParticipant, Goal
+
+
+@pytest.mark.django_db
+class TestGoalBulk:
+    url = reverse('goals:goal-bulk')
+
+    @pytest.fixture
+    def writer(self, board_participant):
+        board_participant.role = BoardParticipant.Role.writer
+        board_participant.save(update_fields=['role'])
+        return board_participant
+
+    def test_create(self, auto_login_user, writer, goal_category, goal_category_factory, board,
+                    django_assert_max_num_queries):
+        """
+        Цели создаются пакетом, количество запросов не зависит от размера пакета
+        """
+        categories = [goal_category, goal_category_factory.create(board=board)]
+        data = [{'title': f'goal {i}', 'category': categories[i % 2].id} for i in range(20)]
+
+        with django_assert_max_num_queries(8):
+            response = auto_login_user.post(self.url, data, format='json')
+
+        assert response.status_code == 201
+        assert [goal['title'] for goal in response.data] == [item['title'] for item in data]
+        assert Goal.objects.filter(user=writer.user).count() == 20
+
+    def test_errors_per_item(self, auto_login_user, writer, goal_category, goal_category_factory):
+        """
+        Ошибки возвращаются по элементам, при ошибке ничего не создается
+        """
+        foreign_category = goal_category_factory.create()
+        data = [
+            {'title': 'ok', 'category': goal_category.id},
+            {'title': 'foreign', 'category': foreign_category.id},
+            {'category': goal_category.id},
+            {'title': 'missing', 'category': 0},
+        ]
+
+        response = auto_login_user.post(self.url, data, format='json')
+
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert list(response.data[1]) == ['category']
+        assert list(response.data[2]) == ['title']
+        assert list(response.data[3]) == ['category']
+        assert not Goal.objects.exists()
+
+    def test_batch_limit(self, auto_login_user, writer, goal_category):
+        data = [{'title': 'goal', 'category': goal_category.id}] * 101
+
+        assert auto_login_user.post(self.url, data, format='json').status_code == 400
+        assert auto_login_user.post(self.url, [], format='json').status_code == 400
+
+    def test_update(self, auto_login_user, writer, goal_category, goal_factory, django_assert_max_num_queries):
+        goals = goal_factory.create_batch(10, category=goal_category, status=1, priority=1)
+        data = [{'id': goal.id, 'priority': 4} for goal in goals]
+
+        with django_assert_max_num_queries(8):
+            response = auto_login_user.patch(self.url, data, format='json')
+
+        assert response.status_code == 200
+        assert set(Goal.objects.values_list('priority', flat=True)) == {4}
+        assert set(Goal.objects.values_list('title', flat=True)) == {goal.title for goal in goals}
+
+    def test_update_errors(self, auto_login_user, writer, goal_category, goal_factory):
+        goal = goal_factory.create(category=goal_category, status=1)
+        foreign_goal = goal_factory.create(status=1)
+        data = [{'id': goal.id, 'title': 'new'}, {'id': foreign_goal.id, 'title': 'new'}, {'title': 'new'}]
+
+        response = auto_login_user.patch(self.url, data, format='json')
+
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert list(response.data[1]) == ['id']
+        assert list(response.data[2]) == ['id']
+        goal.refresh_from_db()
+        assert goal.title != 'new'
+
+    def test_update_id_coercion(self, auto_login_user, writer, goal_category, goal_factory):
+        """
+        id приводится к числу так же, как в сериализаторе: строка с числом допустима, true - нет
+        """
+        goal = goal_factory.create(category=goal_category, status=1, priority=1)
+        # true не должен превратиться в id 1
+        if not Goal.objects.filter(id=1).exists():
+            goal_factory.create(id=1, category=goal_category, status=1, priority=1, created=timezone.now())
+
+        response = auto_login_user.patch(self.url, [{'id': str(goal.id), 'priority': 4}], format='json')
+        assert response.status_code == 200
+        goal.refresh_from_db()
+        assert goal.priority == 4
+
+        response = auto_login_user.patch(self.url, [{'id': True, 'priority': 2}], format='json')
+        assert response.status_code == 400
+        assert list(response.data[0]) == ['id']
+        assert not Goal.objects.filter(priority=2).exists()
+
+    def test_invalidates_list_cache(self, auto_login_user, writer, goal_category, goal_factory):
+        goal = goal_factory.create(category=goal_category, status=1)
+        list_url = reverse('goals:goal-list')
+        auto_login_user.get(list_url)
+
+        auto_login_user.patch(self.url, [{'id': goal.id, 'title': 'Новое'}], format='json')
+
+        assert auto_login_user.get(list_url).data['results'][0]['title'] == 'Новое'
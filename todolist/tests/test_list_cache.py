@@ -0,0 +1,128 @@
+import threading
+
+import environ
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from goals.cache import bump_board_versions, get_board_versions, get_or_build
+from goals.checks import shared_cache_check
+from goals.models import BoardParticipant
+
+
+@pytest.mark.django_db
+class TestListCache:
+
+    @pytest.fixture
+    def owner(self, board_participant):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        return board_participant
+
+    @pytest.mark.parametrize('url_name', [
+        'goals:board-list', 'goals:categories-list', 'goals:goal-list', 'goals:comments-list',
+    ])
+    def test_cache_hit(self, auto_login_user, owner, goal_factory, goal_category, goal_comment_factory,
+                       django_assert_num_queries, url_name):
+        """
+        Повторный запрос отдается из кеша, обращаясь к базе только за ролями пользователя
+        """
+        goal_comment_factory.create(goal=goal_factory.create(category=goal_category, status=1))
+        url = reverse(url_name)
+        response = auto_login_user.get(url)
+
+        with django_assert_num_queries(1):
+            cached = auto_login_user.get(url)
+
+        assert cached.data == response.data
+        assert cached['ETag'] == response['ETag']
+
+    def test_write_invalidates(self, auto_login_user, owner, goal_factory, goal_category):
+        url = reverse('goals:goal-list')
+        goal = goal_factory.create(category=goal_category, status=1)
+        auto_login_user.get(url)
+
+        response = auto_login_user.patch(
+            reverse('goals:goal-detail', kwargs={'pk': goal.pk}), {'title': 'Новое'}, format='json'
+        )
+        assert response.status_code == 200
+
+        assert auto_login_user.get(url).data['results'][0]['title'] == 'Новое'
+
+    def test_archive_category_invalidates(self, auto_login_user, owner, goal_factory, goal_category):
+        url = reverse('goals:goal-list')
+        goal_factory.create(category=goal_category, status=1)
+        assert len(auto_login_user.get(url).data['results']) == 1
+
+        auto_login_user.delete(reverse('goals:category-details', kwargs={'pk': goal_category.pk}))
+
+        assert auto_login_user.get(url).data['results'] == []
+
+    def test_move_invalidates_old_board(self, auto_login_user, user, owner, board, goal_factory, goal_category,
+                                        goal_category_factory, board_participant_factory):
+        """
+        Перенос цели на другую доску сбрасывает кеш и прежней доски
+        """
+        other = goal_category_factory.create()
+        board_participant_factory.create(board=other.board, user=user, role=BoardParticipant.Role.owner)
+        goal = goal_factory.create(category=goal_category, status=1)
+        versions = get_board_versions([board.id, other.board_id])
+
+        response = auto_login_user.patch(
+            reverse('goals:goal-detail', kwargs={'pk': goal.pk}), {'category': other.id}, format='json'
+        )
+        assert response.status_code == 200
+
+        new_versions = get_board_versions([board.id, other.board_id])
+        assert new_versions[board.id] != versions[board.id]
+        assert new_versions[other.board_id] != versions[other.board_id]
+
+    def test_other_board_not_invalidated(self, board, board_factory):
+        other = board_factory.create()
+        versions = get_board_versions([board.id, other.id])
+
+        bump_board_versions([other.id])
+
+        new_versions = get_board_versions([board.id, other.id])
+        assert new_versions[board.id] == versions[board.id]
+        assert new_versions[other.id] != versions[other.id]
+
+
+class TestSharedCacheCheck:
+    @pytest.mark.parametrize('cache_url, debug, errors', [
+        ('locmemcache://', False, ['goals.E001']),
+        ('locmemcache://', True, []),
+        ('dbcache://django_cache', False, []),
+    ])
+    def test_check(self, settings, cache_url, debug, errors):
+        settings.CACHES = {'default': environ.Env.cache_url_config(cache_url)}
+        settings.DEBUG = debug
+
+        assert [error.id for error in shared_cache_check(None)] == errors
+
+
+class TestSingleFlight:
+
+    def test_build_once(self):
+        """
+        Параллельные промахи по одному ключу строят значение один раз
+        """
+        cache.delete('test:single-flight')
+        calls = []
+        started = threading.Event()
+
+        def build():
+            calls.append(1)
+            started.set()
+            threading.Event().wait(0.2)
+            return 'value'
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(get_or_build('test:single-flight', build, 60)))
+        first.start()
+        started.wait()
+        results.append(get_or_build('test:single-flight', build, 60))
+        first.join()
+
+        assert results == ['value', 'value']
+        assert len(calls) == 1
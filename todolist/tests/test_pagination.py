@@ -0,0 +1,82 @@
+import pytest
+from django.urls import reverse
+
+from goals.pagination import KeysetPagination
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    url = reverse('goals:goal-list')
+
+    @pytest.fixture
+    def goals(self, board_participant, goal_category, goal_factory):
+        """
+        Цели с повторяющимися названиями, чтобы проверить ключ (title, id)
+        """
+        return [
+            goal_factory.create(category=goal_category, title=f'Goal {i % 3}', status=1)
+            for i in range(7)
+        ]
+
+    def walk(self, client, url):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            pages.append(response.data)
+            url = response.data['next']
+        return pages
+
+    def test_pages_cover_all_goals_in_order(self, auto_login_user, goals):
+        """
+        Проход по страницам возвращает все цели ровно один раз в порядке (title, id)
+        """
+        pages = self.walk(auto_login_user, f'{self.url}?limit=3')
+        ids = [goal['id'] for page in pages for goal in page['results']]
+
+        expected = sorted(goals, key=lambda goal: (goal.title, goal.id))
+        assert ids == [goal.id for goal in expected]
+        assert [len(page['results']) for page in pages] == [3, 3, 1]
+        assert pages[0]['previous'] is None
+
+    def test_previous_page(self, auto_login_user, goals):
+        """
+        Ссылка previous возвращает предыдущую страницу
+        """
+        first = auto_login_user.get(f'{self.url}?limit=3').data
+        second = auto_login_user.get(first['next']).data
+        back = auto_login_user.get(second['previous']).data
+
+        assert [goal['id'] for goal in back['results']] == [goal['id'] for goal in first['results']]
+
+    def test_descending_ordering(self, auto_login_user, goals):
+        """
+        Ключ учитывает направление сортировки
+        """
+        pages = self.walk(auto_login_user, f'{self.url}?limit=2&ordering=-title')
+        ids = [goal['id'] for page in pages for goal in page['results']]
+
+        expected = sorted(goals, key=lambda goal: (goal.title, goal.id), reverse=True)
+        assert ids == [goal.id for goal in expected]
+
+    def test_page_size_limit(self, auto_login_user, goals, monkeypatch):
+        """
+        Размер страницы ограничен на сервере, в том числе без параметра limit
+        """
+        monkeypatch.setattr(KeysetPagination, 'page_size', 4)
+        monkeypatch.setattr(KeysetPagination, 'max_page_size', 5)
+
+        assert len(auto_login_user.get(self.url).data['results']) == 4
+        assert len(auto_login_user.get(f'{self.url}?limit=100').data['results']) == 5
+
+    def test_invalid_cursor(self, auto_login_user, goals):
+        response = auto_login_user.get(f'{self.url}?cursor=broken')
+        assert response.status_code == 404
+
+    def test_legacy_offset(self, auto_login_user, goals):
+        """
+        Клиенты с limit/offset продолжают получать count и results
+        """
+        response = auto_login_user.get(f'{self.url}?limit=3&offset=3')
+        assert response.data['count'] == 7
+        assert len(response.data['results']) == 3
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from goals.models import BoardParticipant
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """
+    Количество запросов к базе не зависит от количества объектов в ответе
+    """
+
+    @pytest.fixture
+    def owner(self, board_participant):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        return board_participant
+
+    @pytest.fixture
+    def populate(self, owner, board, goal_category_factory, goal_factory, goal_comment_factory,
+                 board_participant_factory):
+        def _populate(count: int):
+            for _ in range(count):
+                category = goal_category_factory.create(board=board)
+                goal = goal_factory.create(category=category, status=1)
+                goal_comment_factory.create(goal=goal)
+                board_participant_factory.create(board=board, role=BoardParticipant.Role.reader)
+            return goal
+        return _populate
+
+    def count_queries(self, client, url) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context)
+
+    # Без кеша ответа: роли пользователя для ключа кеша, агрегат для ETag и сама страница
+    @pytest.mark.parametrize('url_name, budget', [
+        ('goals:board-list', 3),
+        ('goals:categories-list', 3),
+        ('goals:goal-list', 3),
+        ('goals:comments-list', 3),
+    ])
+    def test_list(self, auto_login_user, populate, url_name, budget):
+        url = reverse(url_name)
+        populate(2)
+        queries = self.count_queries(auto_login_user, url)
+        populate(5)
+
+        assert self.count_queries(auto_login_user, url) == queries
+        assert queries <= budget
+
+    @pytest.mark.parametrize('url_name, lookup, budget', [
+        ('goals:board-details', lambda goal: goal.category.board_id, 3),
+        ('goals:category-details', lambda goal: goal.category_id, 2),
+        ('goals:goal-detail', lambda goal: goal.id, 2),
+        ('goals:comment-detail', lambda goal: goal.goalcomments_set.get().id, 1),
+    ])
+    def test_detail(self, auto_login_user, populate, url_name, lookup, budget):
+        url = reverse(url_name, kwargs={'pk': lookup(populate(2))})
+        queries = self.count_queries(auto_login_user, url)
+        populate(5)
+
+        assert self.count_queries(auto_login_user, url) == queries
+        assert queries <= budget
@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestGoalSearch:
+    url = reverse('goals:goal-list')
+
+    @pytest.fixture
+    def goals(self, board_participant, goal_category, goal_factory):
+        return {
+            'title': goal_factory.create(category=goal_category, status=1, title='Выучить английский',
+                                         description='Каждый день'),
+            'description': goal_factory.create(category=goal_category, status=1, title='Поездка',
+                                               description='Практиковать английский язык'),
+            'other': goal_factory.create(category=goal_category, status=1, title='Купить молоко',
+                                         description='В магазине'),
+        }
+
+    def search(self, client, term, **params):
+        response = client.get(self.url, data={'search': term, **params})
+        assert response.status_code == 200
+        return [goal['id'] for goal in response.data['results']]
+
+    def test_search_ranked(self, auto_login_user, goals):
+        """
+        Совпадение в названии выше совпадения в описании
+        """
+        assert self.search(auto_login_user, 'английский') == [goals['title'].id, goals['description'].id]
+
+    def test_search_stemming(self, auto_login_user, goals):
+        """
+        Поиск учитывает словоформы
+        """
+        assert self.search(auto_login_user, 'магазинах') == [goals['other'].id]
+
+    def test_search_explicit_ordering(self, auto_login_user, goals):
+        """
+        Явный параметр ordering важнее релевантности
+        """
+        ids = self.search(auto_login_user, 'английский', ordering='-title')
+        assert ids == [goals['description'].id, goals['title'].id]
+
+    def test_search_vector_updated(self, auto_login_user, goals):
+        """
+        Поисковый вектор обновляется при изменении цели
+        """
+        goals['other'].title = 'Купить хлеб'
+        goals['other'].save()
+        assert self.search(auto_login_user, 'хлеб') == [goals['other'].id]
+        assert self.search(auto_login_user, 'молоко') == []
+
+    def test_search_paginated(self, auto_login_user, goals):
+        response = auto_login_user.get(self.url, data={'search': 'английский', 'limit': 1})
+        assert [goal['id'] for goal in response.data['results']] == [goals['title'].id]
+        response = auto_login_user.get(response.data['next'])
+        assert [goal['id'] for goal in response.data['results']] == [goals['description'].id]
+        assert response.data['next'] is None
+
+    def test_search_comments(self, auto_login_user, goals, goal_comment_factory):
+        """
+        Поиск по комментариям включается параметром search_comments
+        """
+        goal_comment_factory.create(goal=goals['other'], text='Обезжиренное')
+        assert self.search(auto_login_user, 'обезжиренное') == []
+        assert self.search(auto_login_user, 'обезжиренное', search_comments='true') == [goals['other'].id]
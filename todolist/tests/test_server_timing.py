@@ -0,0 +1,113 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.serializers import Serializer
+from rest_framework.views import APIView
+
+from core import timing
+
+
+def parse(header: str) -> dict[str, float]:
+    return {name: float(duration) for name, duration in re.findall(r'(\w+);dur=([\d.]+)', header)}
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+    @pytest.fixture(autouse=True)
+    def enabled(self, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        timing.instrument()
+        yield
+        timing.uninstrument()
+
+    @pytest.fixture
+    def goals(self, board_participant, goal_category, goal_factory):
+        return [goal_factory.create(category=goal_category, status=1) for _ in range(20)]
+
+    def test_header(self, auto_login_user, goals, caplog):
+        with caplog.at_level(logging.INFO, logger='core.timing'), CaptureQueriesContext(connection) as queries:
+            response = auto_login_user.get(reverse('goals:goal-list'))
+
+        assert response.status_code == 200
+        durations = parse(response['Server-Timing'])
+        assert list(durations) == ['db', 'perm', 'ser', 'render', 'total']
+        assert all(durations[name] > 0 for name in ('db', 'ser', 'render'))
+        assert max(durations.values()) == durations['total']
+        assert f'desc="Database ({len(queries)} queries)"' in response['Server-Timing']
+
+        record, = caplog.records
+        assert record.timing['queries'] == len(queries)
+        assert record.getMessage().startswith(f'method=GET path={reverse("goals:goal-list")} status=200 ')
+
+    def test_permissions(self, auto_login_user, goals):
+        response = auto_login_user.get(reverse('goals:goal-detail', kwargs={'pk': goals[0].id}))
+
+        assert parse(response['Server-Timing'])['perm'] > 0
+
+    def test_errors(self, client):
+        response = client.get(reverse('goals:goal-list'))
+
+        assert response.status_code == 403
+        assert 'total;dur=' in response['Server-Timing']
+
+    @pytest.mark.parametrize('rate, value, sampled', [(0, 0.0, False), (0.5, 0.7, False), (0.5, 0.3, True)])
+    def test_sampling(self, auto_login_user, board_participant, settings, monkeypatch, caplog, rate, value, sampled):
+        settings.SERVER_TIMING_SAMPLE_RATE = rate
+        monkeypatch.setattr(timing.random, 'random', lambda: value)
+
+        with caplog.at_level(logging.INFO, logger='core.timing'):
+            response = auto_login_user.get(reverse('goals:goal-list'))
+
+        assert response.has_header('Server-Timing') == sampled
+        assert bool(caplog.records) == sampled
+
+    def test_not_sampled_queries(self, auto_login_user, goals, settings):
+        """
+        Вне выборки обертка запросов ничего не считает
+        """
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        assert timing.query_timer in connection.execute_wrappers
+
+        auto_login_user.get(reverse('goals:goal-list'))
+
+        assert timing._current.get() is None
+
+    def test_async(self, user, goals):
+        """
+        Под ASGI запросы к базе выполняются в потоке, но учитываются в замерах запроса
+        """
+        client = AsyncClient()
+        client.force_login(user)
+
+        async def get():
+            return await client.get(reverse('goals:goal-list'))
+        response = async_to_sync(get)()
+
+        assert response.status_code == 200
+        assert parse(response['Server-Timing'])['db'] > 0
+        assert re.search(r'Database \([1-9]\d* queries\)', response['Server-Timing'])
+
+
+@pytest.mark.django_db
+class TestInstrument:
+    def test_uninstrument(self):
+        """
+        Замеры снимаются полностью: методы DRF и соединения возвращаются к исходным
+        """
+        check_permissions, data = APIView.check_permissions, Serializer.data
+        connection.ensure_connection()
+
+        timing.instrument()
+        assert APIView.check_permissions is not check_permissions
+        assert timing.query_timer in connection.execute_wrappers
+        timing.uninstrument()
+
+        assert APIView.check_permissions is check_permissions
+        assert Serializer.data is data
+        assert timing.query_timer not in connection.execute_wrappers
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.models import Goal, GoalComments
+from goals.serializers import GoalCommentSerializer, GoalSerializer
+from goals.views.comment import AsyncGoalCommentListView, GoalCommentListView
+from goals.views.goals import AsyncGoalListView, GoalListView
+
+
+@pytest.mark.django_db
+class TestStreamingList:
+    factory = APIRequestFactory()
+
+    @pytest.fixture
+    def goals(self, board_participant, goal_category, goal_factory, goal_comment_factory):
+        goals = [goal_factory.create(category=goal_category, title=f'Goal {i % 3}', status=1) for i in range(7)]
+        goal_factory.create(category=goal_category, status=Goal.Status.archived)
+        goal_factory.create()
+        for goal in goals[:3]:
+            goal_comment_factory.create(goal=goal)
+        return goals
+
+    def call(self, view_class, user, url: str, headers=None):
+        request = self.factory.get(url, **(headers or {}))
+        force_authenticate(request, user)
+        view = view_class.as_view()
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        return view(request)
+
+    @staticmethod
+    def content(response) -> bytes:
+        if not response.is_async:
+            return b''.join(response.streaming_content)
+
+        async def join():
+            return b''.join([part async for part in response.streaming_content])
+        return async_to_sync(join)()
+
+    @pytest.mark.parametrize('view', [GoalListView, AsyncGoalListView])
+    @pytest.mark.parametrize('chunk_size', [2, 2000])
+    def test_goals(self, user, goals, view, chunk_size, monkeypatch):
+        """
+        Поток совпадает с сериализацией всего списка и идет частями по stream_chunk_size строк
+        """
+        monkeypatch.setattr(view, 'stream_chunk_size', chunk_size)
+        response = self.call(view, user, reverse('goals:goal-list') + '?stream=true&ordering=-title')
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/json'
+        assert response.is_async == (view is AsyncGoalListView)
+        expected = sorted(goals, key=lambda goal: (goal.title, goal.id), reverse=True)
+        assert self.content(response) == JSONRenderer().render(GoalSerializer(expected, many=True).data)
+
+    @pytest.mark.parametrize('view', [GoalCommentListView, AsyncGoalCommentListView])
+    def test_comments(self, user, goals, view):
+        response = self.call(view, user, reverse('goals:comments-list') + f'?stream=1&goal={goals[0].id}')
+
+        expected = GoalComments.objects.filter(goal=goals[0]).order_by('-created', '-id')
+        assert self.content(response) == JSONRenderer().render(GoalCommentSerializer(expected, many=True).data)
+
+    def test_search_ranked(self, auto_login_user, goals):
+        """
+        Поток сохраняет сортировку по релевантности
+        """
+        url = reverse('goals:goal-list')
+        paged = auto_login_user.get(url, {'search': 'Goal'}).json()['results']
+        response = auto_login_user.get(url, {'search': 'Goal', 'stream': 'true'})
+
+        streamed = json.loads(self.content(response))
+        assert [goal['id'] for goal in streamed] == [goal['id'] for goal in paged]
+
+    def test_same_order_as_pages(self, auto_login_user, goals):
+        """
+        При равных значениях поля сортировки поток идет в порядке страниц
+        """
+        url = reverse('goals:goal-list')
+        paged, next_url = [], f'{url}?limit=2&ordering=-title'
+        while next_url:
+            page = auto_login_user.get(next_url).json()
+            paged.extend(goal['id'] for goal in page['results'])
+            next_url = page['next']
+        response = auto_login_user.get(url, {'ordering': '-title', 'stream': 'true'})
+
+        assert [goal['id'] for goal in json.loads(self.content(response))] == paged
+
+    def test_empty(self, auto_login_user, board_participant):
+        response = auto_login_user.get(reverse('goals:goal-list'), {'stream': 'true'})
+        assert self.content(response) == b'[]'
+
+    def test_not_modified(self, user, goals):
+        url = reverse('goals:goal-list') + '?stream=true'
+        etag = self.call(GoalListView, user, url)['ETag']
+
+        response = self.call(GoalListView, user, url, headers={'HTTP_IF_NONE_MATCH': etag})
+
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_not_authenticated(self, client):
+        response = client.get(reverse('goals:goal-list'), {'stream': 'true'})
+        assert response.status_code == 403
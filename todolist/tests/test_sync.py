@@ -0,0 +1,212 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from goals import sync
+from goals.models import BoardParticipant, Goal, GoalComments, Tombstone
+
+
+@pytest.mark.django_db
+class TestSync:
+    url = reverse('goals:sync')
+
+    @pytest.fixture(autouse=True)
+    def no_overlap(self, monkeypatch):
+        """
+        Без запаса по времени, чтобы в ответ попадали только изменения после курсора
+        """
+        monkeypatch.setattr(sync, 'CURSOR_OVERLAP', timedelta(0))
+
+    @pytest.fixture
+    def goal(self, board_participant, goal_category, goal_factory, goal_comment_factory):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save(update_fields=['role'])
+        goal = goal_factory.create(category=goal_category, status=Goal.Status.to_do)
+        goal_comment_factory.create(goal=goal)
+        return goal
+
+    def get_changes(self, client, cursor: str | None = None) -> dict:
+        response = client.get(self.url, {'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        return response.json()
+
+    @staticmethod
+    def ids(data: dict) -> dict:
+        return {
+            name: [row['id'] for row in data[name]] for name in ('boards', 'categories', 'goals', 'comments')
+        }
+
+    def test_full(self, auto_login_user, goal, goal_factory, goal_category_factory, board):
+        goal_factory.create(category=goal.category, status=Goal.Status.archived)
+        goal_factory.create(category=goal_category_factory.create(board=board, is_deleted=True))
+        goal_factory.create()
+
+        data = self.get_changes(auto_login_user)
+
+        assert data['full'] is True
+        assert self.ids(data) == {
+            'boards': [board.id],
+            'categories': [goal.category_id],
+            'goals': [goal.id],
+            'comments': [goal.goalcomments_set.get().id],
+        }
+        assert data['boards'][0]['role'] == BoardParticipant.Role.owner
+        assert data['deleted'] == {'boards': [], 'categories': [], 'goals': [], 'comments': []}
+
+    def test_same_representation(self, auto_login_user, goal):
+        """
+        Объекты в том же виде, что и в списках
+        """
+        data = self.get_changes(auto_login_user)
+
+        assert data['goals'] == auto_login_user.get(reverse('goals:goal-list')).json()['results']
+        assert data['comments'] == auto_login_user.get(reverse('goals:comments-list')).json()['results']
+        assert data['categories'] == auto_login_user.get(reverse('goals:categories-list')).json()['results']
+
+    def test_only_changes(self, auto_login_user, goal, goal_factory):
+        other = goal_factory.create(category=goal.category, status=Goal.Status.to_do)
+        cursor = self.get_changes(auto_login_user)['cursor']
+
+        response = auto_login_user.patch(reverse('goals:goal-detail', kwargs={'pk': goal.id}), {'title': 'Новая'})
+        assert response.status_code == 200
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert data['full'] is False
+        assert self.ids(data) == {'boards': [], 'categories': [], 'goals': [goal.id], 'comments': []}
+        assert data['goals'][0]['title'] == 'Новая'
+        assert self.ids(self.get_changes(auto_login_user, data['cursor'])) == {
+            'boards': [], 'categories': [], 'goals': [], 'comments': [],
+        }
+        assert other.id not in data['goals']
+
+    def test_queryset_update_touches_updated(self, auto_login_user, goal):
+        """
+        Изменение в обход save() тоже меняет дату обновления (триггер в базе)
+        """
+        cursor = self.get_changes(auto_login_user)['cursor']
+        Goal.objects.filter(id=goal.id).update(priority=Goal.Priority.high)
+
+        assert self.ids(self.get_changes(auto_login_user, cursor))['goals'] == [goal.id]
+
+    def test_save_update_fields_touches_updated(self, goal):
+        updated = goal.updated
+        goal.priority = Goal.Priority.high
+        goal.save(update_fields=['priority'])
+        goal.refresh_from_db()
+
+        assert goal.updated > updated
+
+    def test_deleted(self, auto_login_user, user, goal, goal_factory, goal_category_factory, goal_comment_factory,
+                     board):
+        archived = goal_factory.create(category=goal.category, status=Goal.Status.to_do)
+        category = goal_category_factory.create(board=board)
+        orphan = goal_factory.create(category=category, status=Goal.Status.to_do)
+        comment = goal_comment_factory.create(goal=goal, user=user)
+        cursor = self.get_changes(auto_login_user)['cursor']
+
+        for url_name, pk in (
+            ('goals:goal-detail', archived.id), ('goals:category-details', category.id),
+            ('goals:comment-detail', comment.id),
+        ):
+            assert auto_login_user.delete(reverse(url_name, kwargs={'pk': pk})).status_code == 204
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert data['deleted'] == {
+            'boards': [],
+            'categories': [category.id],
+            'goals': sorted([archived.id, orphan.id]),
+            'comments': [comment.id],
+        }
+        assert self.ids(data)['goals'] == []
+
+    def test_goals_of_category_deleted_in_background(self, auto_login_user, goal, settings):
+        """
+        Цель удаленной категории, измененная до фоновой архивации, приходит в deleted, а не среди измененных
+        """
+        settings.GOALS_ARCHIVE_IN_BACKGROUND = True
+        cursor = self.get_changes(auto_login_user)['cursor']
+
+        response = auto_login_user.delete(reverse('goals:category-details', kwargs={'pk': goal.category_id}))
+        assert response.status_code == 202
+        Goal.objects.filter(id=goal.id).update(title='Изменена до архивации')
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert data['deleted']['categories'] == [goal.category_id]
+        assert data['deleted']['goals'] == [goal.id]
+
+    def test_deleted_board(self, auto_login_user, goal, board):
+        cursor = self.get_changes(auto_login_user)['cursor']
+        assert auto_login_user.delete(reverse('goals:board-details', kwargs={'pk': board.id})).status_code == 204
+
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert data['deleted']['boards'] == [board.id]
+        assert self.ids(data) == {'boards': [], 'categories': [], 'goals': [], 'comments': []}
+
+    def test_membership(self, auto_login_user, user, goal, board_factory, goal_category_factory, goal_factory,
+                        board_participant_factory):
+        """
+        Доска, в которую пользователь добавлен, приходит целиком, а доска, из которой исключен, - в deleted
+        """
+        other_board = board_factory.create()
+        other_goal = goal_factory.create(category=goal_category_factory.create(board=other_board), status=1)
+        cursor = self.get_changes(auto_login_user)['cursor']
+
+        participant = board_participant_factory.create(board=other_board, user=user, role=3)
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert self.ids(data)['boards'] == [other_board.id]
+        assert self.ids(data)['goals'] == [other_goal.id]
+        assert data['boards'][0]['role'] == 3
+
+        participant.delete()
+        data = self.get_changes(auto_login_user, data['cursor'])
+
+        assert data['deleted']['boards'] == [other_board.id]
+        assert self.ids(data)['boards'] == []
+
+    def test_goal_moved_to_other_board(self, auto_login_user, goal, goal_category_factory):
+        """
+        Цель и ее комментарии, перенесенные на недоступную пользователю доску, приходят в deleted
+        """
+        comment = goal.goalcomments_set.get()
+        cursor = self.get_changes(auto_login_user)['cursor']
+
+        Goal.objects.filter(id=goal.id).update(category=goal_category_factory.create())
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert data['deleted']['goals'] == [goal.id]
+        assert data['deleted']['comments'] == [comment.id]
+        assert Tombstone.objects.filter(kind=Tombstone.Kind.comment, object_id=comment.id).exists()
+
+    def test_deleted_and_restored(self, auto_login_user, goal, goal_comment_factory):
+        """
+        Объект не попадает в deleted, если он снова есть среди измененных
+        """
+        cursor = self.get_changes(auto_login_user)['cursor']
+        comment = goal.goalcomments_set.get()
+        GoalComments.objects.filter(id=comment.id).delete()
+        goal_comment_factory.create(goal=goal, id=comment.id, created=timezone.now())
+
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert self.ids(data)['comments'] == [comment.id]
+        assert data['deleted']['comments'] == []
+
+    def test_expired_cursor(self, auto_login_user, goal, settings):
+        cursor = sync.encode_cursor(timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1))
+
+        data = self.get_changes(auto_login_user, cursor)
+
+        assert data['full'] is True
+        assert self.ids(data)['goals'] == [goal.id]
+
+    @pytest.mark.parametrize('cursor', ['bad', sync.encode_cursor(timezone.now()).replace('W', 'A', 1) + 'x'])
+    def test_invalid_cursor(self, auto_login_user, cursor):
+        response = auto_login_user.get(self.url, {'cursor': cursor})
+        assert response.status_code == 400
+
+    def test_not_authenticated(self, client):
+        assert client.get(self.url).status_code == 403
@@ -0,0 +1,152 @@
+import json
+
+from http.client import RemoteDisconnected
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NameResolutionError, NewConnectionError, ProtocolError
+
+from bot.tg import client as tg_client_module
+from bot.tg.client import TgClient
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode()
+
+
+class FakeSession:
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append({'url': url, 'params': params, 'timeout': timeout})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def connection_error(reason: Exception) -> requests.ConnectionError:
+    """
+    Ошибка соединения в том виде, в каком ее выбрасывает requests после неудачного подключения urllib3
+    """
+    return requests.ConnectionError(MaxRetryError(None, '/sendMessage', reason))
+
+
+MESSAGE = {'ok': True, 'result': {'message_id': 1, 'chat': {'id': 1}, 'text': 'text'}}
+
+
+class TestTgClient:
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch) -> list:
+        sleeps = []
+        monkeypatch.setattr(tg_client_module.time, 'sleep', sleeps.append)
+        return sleeps
+
+    def make_client(self, responses: list) -> TgClient:
+        client = TgClient(token='token')
+        client._session = FakeSession(responses)
+        return client
+
+    def test_send_message_timeouts(self, sleeps):
+        """
+        Таймауты передаются как сетевые, а не как параметр Telegram
+        """
+        client = self.make_client([FakeResponse(200, MESSAGE)])
+
+        assert client.send_message(chat_id=1, text='text').ok
+        call = client._session.calls[0]
+        assert 'timeout' not in call['params']
+        assert call['timeout'] == (client.connect_timeout, client.read_timeout)
+
+    def test_get_updates_read_timeout(self, sleeps):
+        client = self.make_client([FakeResponse(200, {'ok': True, 'result': []})])
+
+        client.get_updates(offset=5, timeout=60)
+
+        call = client._session.calls[0]
+        assert call['params']['timeout'] == 60
+        assert call['timeout'] == (client.connect_timeout, 60 + client.read_timeout)
+
+    def test_retry_after(self, sleeps):
+        """
+        При 429 запрос повторяется через retry_after секунд
+        """
+        client = self.make_client([
+            FakeResponse(429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 3}}),
+            FakeResponse(502, {'ok': False}),
+            requests.ReadTimeout('timeout'),
+            FakeResponse(200, {'ok': True, 'result': []}),
+        ])
+
+        assert client.get_updates().ok
+        assert sleeps == [3, client.backoff * 2, client.backoff * 4]
+
+    @pytest.mark.parametrize('error', [
+        requests.ConnectTimeout('timeout'),
+        connection_error(NewConnectionError(None, 'refused')),
+        connection_error(NameResolutionError('api.telegram.org', None, OSError('unknown host'))),
+    ])
+    def test_send_message_retry_not_reached(self, sleeps, error):
+        """
+        sendMessage повторяется, если запрос не дошел до Telegram, и при 429
+        """
+        client = self.make_client([
+            error,
+            FakeResponse(429, {'ok': False, 'parameters': {'retry_after': 1}}),
+            FakeResponse(200, MESSAGE),
+        ])
+
+        assert client.send_message(chat_id=1, text='text').ok
+        assert len(client._session.calls) == 3
+
+    @pytest.mark.parametrize('response', [
+        requests.ReadTimeout('timeout'),
+        FakeResponse(502, {'ok': False}),
+        requests.ConnectionError(ProtocolError('Connection aborted.', RemoteDisconnected('closed'))),
+    ])
+    def test_send_message_not_retried(self, sleeps, response):
+        """
+        После таймаута чтения, 5xx или обрыва соединения сообщение могло быть доставлено,
+        повтор отправил бы его дважды
+        """
+        client = self.make_client([response, FakeResponse(200, MESSAGE)])
+
+        assert client.send_message(chat_id=1, text='text') is None
+        assert len(client._session.calls) == 1
+        assert sleeps == []
+
+    def test_retry_budget(self, sleeps):
+        """
+        После исчерпания повторов возвращается ошибка, клиентские ошибки не повторяются
+        """
+        attempts = TgClient.max_retries + 1
+        client = self.make_client([FakeResponse(500, {'ok': False})] * attempts)
+        assert not client.get_updates().ok
+        assert len(client._session.calls) == attempts
+
+        client = self.make_client([FakeResponse(400, {'ok': False})])
+        assert not client.get_updates().ok
+        assert len(client._session.calls) == 1
+
+    def test_web_client_limits(self, sleeps):
+        """
+        Клиент веб-запросов делает не больше одного повтора
+        """
+        assert tg_client_module.get_tg_client().read_timeout == tg_client_module.WEB_CLIENT_LIMITS['read_timeout']
+        client = TgClient(token='token', **tg_client_module.WEB_CLIENT_LIMITS)
+        client._session = FakeSession([requests.ConnectTimeout('timeout')] * 3)
+
+        assert client.send_message(chat_id=1, text='text') is None
+        assert len(client._session.calls) == 2
+
+    def test_retry_after_too_long(self, sleeps):
+        client = self.make_client([
+            FakeResponse(429, {'ok': False, 'parameters': {'retry_after': TgClient.max_retry_delay + 1}}),
+        ])
+        assert client.send_message(chat_id=1, text='text') is None
+        assert sleeps == []
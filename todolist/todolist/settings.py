@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'social_django',
     'environ',
@@ -55,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -174,7 +176,38 @@ LOGGING = {
             'level': 'DEBUG',  # change debug level as appropiate
             'propagate': False,
         },
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
     },
 }
 
+# Асинхронные версии представлений чтения и верификации бота для развертывания под ASGI (uvicorn todolist.asgi)
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
+
+# Доля запросов с разбивкой времени (заголовок Server-Timing и лог core.timing): 0 - выключено, 1 - все запросы
+SERVER_TIMING_SAMPLE_RATE = env.float('SERVER_TIMING_SAMPLE_RATE', default=0.0)
+
+# Общий кеш (dbcache://django_cache после createcachetable или rediscache://): веб, бот и фоновые команды
+# видят одни и те же сбросы кеша. Кеш в памяти процесса допустим только при DEBUG (проверка goals.E001)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Удаление досок и категорий: цели архивируются в фоне воркером archivegoals, а не в запросе
+GOALS_ARCHIVE_IN_BACKGROUND = env.bool('GOALS_ARCHIVE_IN_BACKGROUND', default=False)
+
+# Синхронизация клиентов (goals/sync): сколько дней хранятся записи об удалениях.
+# Курсор старше этого срока получает полный снимок
+SYNC_TOMBSTONE_DAYS = env.int('SYNC_TOMBSTONE_DAYS', default=30)
+# Доставка событий досок (goals/board/<pk>/events): postgres (NOTIFY/LISTEN, между воркерами и фоновыми командами)
+# или local (в пределах процесса, только при DEBUG - проверка goals.E002)
+BOARD_EVENTS_BACKEND = env.str('BOARD_EVENTS_BACKEND', default='local')
+
 BOT_TOKEN = env.str('BOT_TOKEN')
+# Адрес Bot API: api.telegram.org или собственный сервер telegram-bot-api
+BOT_API_URL = env.str('BOT_API_URL', default='https://api.telegram.org')
+BOT_WEBHOOK_SECRET = env.str('BOT_WEBHOOK_SECRET', default='')
+# Хранилище состояния диалогов бота: memory (LRU/TTL в процессе) или db (общее для воркеров)
+BOT_STATE_STORE = env.str('BOT_STATE_STORE', default='memory')